@@ -1,67 +1,121 @@
 import streamlit as st
 import pandas as pd
-import pyodbc
-from io import BytesIO
+import re
+from exportar import exportar
+from tallas import orden_tallas
+from medicion import conectar_medido, leer_sql
+from conexiones import conectar_sqlserver
+from carga_diferida import precargar
 
 # Función para conectar a la base de datos
 def conectar_bd():
-    conn = pyodbc.connect(
-        "driver={odbc driver 17 for sql server};"
-        "server=" + st.secrets["server"] + ";"
-        "database=" + st.secrets["database"] + ";"
-        "uid=" + st.secrets["username"] + ";"
-        "pwd=" + st.secrets["password"] + ";"
-    )
+    conn = conectar_sqlserver()
     return conn
 
 
+# Pedidos por consulta en el modo por lotes (SQL Server admite hasta 2100 parámetros)
+TAMANO_LOTE = 200
 
-
-# Función para ejecutar la consulta
-def ejecutar_consulta(pedido):
-    conn = conectar_bd()
-    query = """
+QUERY_PEDIDOS = """
     SELECT e.CoddocOrdenVenta AS PEDIDO, a.coddocordenproduccion as OP,
-           c.nommaecombo as COMBO, d.nommaetalla as TALLA, 
+           c.nommaecombo as COMBO, d.nommaetalla as TALLA,
            b.dcantidadrequerido as UNID, b.dcantidadprogramado AS UNID_PROG
     FROM docOrdenProduccion a
     INNER JOIN docOrdenVenta e ON a.IdDocumento_Referencia = e.IdDocumento_OrdenVenta
     INNER JOIN docOrdenProduccionItem b ON b.IdDocumento_OrdenProduccion = a.IdDocumento_OrdenProduccion
     INNER JOIN maecombo c ON b.idmaecombo = c.idmaecombo
     INNER JOIN maetalla d ON d.idmaetalla = b.idmaetalla
-    WHERE e.CoddocOrdenVenta = ?
-    """
-    df = pd.read_sql(query, conn, params=[pedido])
+    WHERE e.CoddocOrdenVenta IN ({})
+"""
+
+
+# Función para ejecutar la consulta
+def ejecutar_consulta(pedido):
+    conn, t_conexion = conectar_medido(conectar_bd)
+    df = leer_sql("GTpedidoopcombotalla.ejecutar_consulta", QUERY_PEDIDOS.format('?'), conn,
+                  params=[pedido], t_conexion=t_conexion)
     conn.close()
     return df
 
-# Función para generar el archivo Excel
-def to_excel(df):
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df.to_excel(writer, index=False, sheet_name='Sheet1')
-    processed_data = output.getvalue()
-    return processed_data
+# Función para ejecutar la consulta de muchos pedidos en lotes parametrizados
+def ejecutar_consulta_lote(pedidos, tamano=TAMANO_LOTE):
+    pedidos = list(dict.fromkeys(pedidos))  # sin duplicados, respetando el orden
+    # Todos los lotes usan el mismo texto SQL (el último se completa repitiendo un pedido)
+    query = QUERY_PEDIDOS.format(','.join('?' * tamano))
+    conn, t_conexion = conectar_medido(conectar_bd)
+    partes = []
+    for i in range(0, len(pedidos), tamano):
+        lote = pedidos[i:i + tamano]
+        lote = lote + [lote[-1]] * (tamano - len(lote))
+        partes.append(leer_sql("GTpedidoopcombotalla.ejecutar_consulta_lote", query, conn,
+                               params=lote, t_conexion=t_conexion))
+        t_conexion = None  # la conexión se cuenta solo en el primer lote
+    conn.close()
+    return pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()
+
+# Función para separar los códigos de pedido ingresados (comas, espacios o saltos de línea)
+def leer_pedidos(texto):
+    return [p for p in re.split(r'[\s,;]+', texto) if p]
+
+# Tabla PEDIDO/OP/COMBO x TALLA para una columna de cantidades
+def tabla_tallas(df, valores):
+    tabla = df.pivot_table(index=['PEDIDO', 'OP', 'COMBO'], columns='TALLA', values=valores,
+                           aggfunc='sum', fill_value=0)
+    tabla = tabla[orden_tallas(tabla.columns)]
+    tabla['TOTAL'] = tabla.sum(axis=1)
+    tabla.columns.name = None
+    return tabla.reset_index()
 
 # Aplicación Streamlit
 st.title('Consulta de Pedidos')
 
-pedido = st.text_input('Ingrese el número de PEDIDO:')
-
-if st.button('Consultar'):
-    if pedido:
-        df = ejecutar_consulta(pedido)
-        if not df.empty:
-            st.write(df)
-            
-            excel_file = to_excel(df)
-            st.download_button(
-                label="Descargar resultados como Excel",
-                data=excel_file,
-                file_name=f'resultado_pedido_{pedido}.xlsx',
-                mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
+modo = st.radio('Modo', ['Un pedido', 'Varios pedidos'], horizontal=True)
+
+if modo == 'Un pedido':
+    pedido = st.text_input('Ingrese el número de PEDIDO:')
+
+    if st.button('Consultar'):
+        if pedido:
+            df = ejecutar_consulta(pedido)
+            if not df.empty:
+                st.write(df)
+
+                excel_file = exportar(df, 'xlsx')
+                st.download_button(
+                    label="Descargar resultados como Excel",
+                    data=excel_file,
+                    file_name=f'resultado_pedido_{pedido}.xlsx',
+                    mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+                )
+            else:
+                st.write('No se encontraron resultados para este pedido.')
         else:
-            st.write('No se encontraron resultados para este pedido.')
-    else:
-        st.write('Por favor, ingrese un número de pedido.')
+            st.write('Por favor, ingrese un número de pedido.')
+else:
+    texto_pedidos = st.text_area('Ingrese los números de PEDIDO (separados por coma, espacio o línea):')
+
+    if st.button('Consultar lote'):
+        pedidos = leer_pedidos(texto_pedidos)
+        if pedidos:
+            df = ejecutar_consulta_lote(pedidos)
+            if not df.empty:
+                st.write(f"Pedidos consultados: {len(pedidos)}, con datos: {df['PEDIDO'].nunique()}, filas: {len(df)}")
+
+                excel_file = exportar({
+                    'UNID': tabla_tallas(df, 'UNID'),
+                    'UNID_PROG': tabla_tallas(df, 'UNID_PROG'),
+                    'DETALLE': df,
+                })
+                st.download_button(
+                    label="Descargar matrices combo x talla (Excel)",
+                    data=excel_file,
+                    file_name='pedidos_combo_talla.xlsx',
+                    mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+                )
+            else:
+                st.write('No se encontraron resultados para estos pedidos.')
+        else:
+            st.write('Por favor, ingrese al menos un número de pedido.')
+
+# Después de la primera pintura, cargar en segundo plano los módulos diferidos
+precargar()
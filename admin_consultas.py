@@ -0,0 +1,43 @@
+import streamlit as st
+import pandas as pd
+from medicion import leer_mediciones, resumen_por_consulta
+
+st.set_page_config(page_title="Tiempos de consultas", layout="wide")
+
+st.title("Tiempos de consultas SQL")
+
+dias = st.sidebar.number_input("Días a revisar", min_value=1, max_value=90, value=7)
+cantidad_lentas = st.sidebar.number_input("Consultas más lentas a mostrar", min_value=5, max_value=200, value=20)
+
+df = leer_mediciones(dias)
+if df.empty:
+    st.info("No hay mediciones registradas en el periodo.")
+    st.stop()
+
+backends = sorted(df['BACKEND'].dropna().unique())
+seleccion = st.sidebar.multiselect("Motor", backends, default=backends)
+df = df[df['BACKEND'].isin(seleccion)]
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Llamadas", len(df))
+col2.metric("Errores", int(df['ERROR'].notna().sum()))
+col3.metric("P50 total (s)", f"{df['T_TOTAL'].quantile(0.5):.3f}")
+col4.metric("P90 total (s)", f"{df['T_TOTAL'].quantile(0.9):.3f}")
+
+st.header("Percentiles por consulta")
+st.caption("Tiempos en segundos. PROM_* es el promedio de cada fase: conexión, ejecución en el servidor, "
+           "lectura de filas y armado del DataFrame.")
+st.dataframe(resumen_por_consulta(df), hide_index=True)
+
+st.header("Consultas más lentas")
+lentas = df.nlargest(int(cantidad_lentas), 'T_TOTAL')
+st.dataframe(lentas, hide_index=True)
+
+st.header("Tiempo total por hora")
+por_hora = df.set_index('FECHA').groupby([pd.Grouper(freq='h'), 'NOMBRE'])['T_TOTAL'].sum().unstack(fill_value=0)
+st.bar_chart(por_hora)
+
+errores = df[df['ERROR'].notna()]
+if not errores.empty:
+    st.header("Errores")
+    st.dataframe(errores[['FECHA', 'NOMBRE', 'BACKEND', 'HASH_PARAMS', 'ERROR']], hide_index=True)
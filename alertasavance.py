@@ -0,0 +1,88 @@
+"""Alertas periódicas del avance de procesos por pedido.
+
+Evalúa las reglas de reglas_avance.py sobre los pedidos con entrega en la ventana indicada,
+compara con la corrida anterior y deja en la base local solo los procesos que entraron en
+alerta (VENCIDO, CRITICO, ATRASADO) o cambiaron de estado.
+
+Uso: python alertasavance.py --intervalo 60 [--dias 60] [--csv alertas_avance.csv]
+"""
+from datetime import datetime, timedelta
+
+import pandas as pd
+import streamlit as st
+
+import motor_alertas
+from carga_diferida import diferido
+from consultas_avance import QUERY_AVANCE, query_plan
+from medicion import leer_sql
+from reglas_avance import ESTADOS_ALERTA, cargar_reglas, evaluar
+
+pyodbc = diferido("pyodbc")
+psycopg2 = diferido("psycopg2")
+
+# Días hacia atrás de la fecha de entrega que se siguen revisando (pedidos atrasados)
+DIAS_ATRAS = 30
+# Nombre del motor en la tabla local de corridas
+MOTOR = 'avance'
+
+
+def connect_db(db_type='mssql'):
+    if db_type == 'mssql':
+        return pyodbc.connect(
+            "driver={ODBC Driver 17 for SQL Server};"
+            "server=" + st.secrets["sqlserver"]["server"] + ";"
+            "database=" + st.secrets["sqlserver"]["database"] + ";"
+            "uid=" + st.secrets["sqlserver"]["username"] + ";"
+            "pwd=" + st.secrets["sqlserver"]["password"] + ";"
+        )
+    return psycopg2.connect(
+        host=st.secrets["postgres"]["host"],
+        port=st.secrets["postgres"]["port"],
+        database=st.secrets["postgres"]["database"],
+        user=st.secrets["postgres"]["user"],
+        password=st.secrets["postgres"]["password"]
+    )
+
+
+def leer_datos(dias):
+    """Avance real y plan de los pedidos con entrega entre hace DIAS_ATRAS días y dentro de `dias`."""
+    hoy = datetime.now().date()
+    params = ((hoy - timedelta(days=DIAS_ATRAS)).strftime('%Y-%m-%d'),
+              (hoy + timedelta(days=dias)).strftime('%Y-%m-%d'), '%')
+    conn = connect_db('mssql')
+    try:
+        df_avance = leer_sql("alertasavance.avance", QUERY_AVANCE, conn, params=params)
+    finally:
+        conn.close()
+    if df_avance.empty:
+        return df_avance, pd.DataFrame()
+
+    pedidos = df_avance['PEDIDO'].tolist()
+    conn = connect_db('postgres')
+    try:
+        df_plan = leer_sql("alertasavance.plan", query_plan(pedidos), conn, params=tuple(pedidos))
+    finally:
+        conn.close()
+    return df_avance, df_plan
+
+
+def ejecutar_corrida(dias=60, archivo_csv=None):
+    """Una corrida: consulta, evalúa las reglas, compara con la anterior y guarda las alertas."""
+    df_avance, df_plan = leer_datos(dias)
+    salud = evaluar(df_avance, df_plan, cargar_reglas()) if not df_plan.empty else pd.DataFrame(
+        columns=['PEDIDO', 'PROCESO', 'ESTADO'])
+    actuales = salud[salud['ESTADO'].isin(ESTADOS_ALERTA)]
+    return motor_alertas.guardar_corrida(MOTOR, actuales, ['PEDIDO', 'PROCESO'], 'ESTADO',
+                                         'avance_vigente', 'alertas_avance', archivo_csv)
+
+
+def main():
+    parser = motor_alertas.argumentos("Alertas periódicas del avance de procesos por pedido", intervalo=60)
+    parser.add_argument('--dias', type=int, default=60, help="días hacia adelante de fecha de entrega")
+    args = parser.parse_args()
+    motor_alertas.repetir(lambda: ejecutar_corrida(args.dias, archivo_csv=args.csv), args.intervalo, args.una_vez,
+                          "procesos en alerta: {}, nuevos o cambiados: {}")
+
+
+if __name__ == "__main__":
+    main()
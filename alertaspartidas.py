@@ -0,0 +1,92 @@
+"""Motor de alertas de envejecimiento de partidas.
+
+Ejecuta periódicamente la clasificación de seguipartida.py, compara con la corrida
+anterior y deja en la base local solo las partidas vencidas nuevas o que cambiaron.
+
+Uso: python alertaspartidas.py --intervalo 30 [--csv alertas.csv]
+"""
+import pandas as pd
+import streamlit as st
+
+import motor_alertas
+from carga_diferida import diferido
+from clasificapartidas import (
+    COLUMNAS_SIN_TENIDO,
+    COLUMNAS_SIN_APROB,
+    leer_partidas,
+    partidas_sin_tenido,
+    partidas_con_tenido_sin_aprob_tela,
+    partidas_con_tenido_sin_aprob_tela_estamp,
+)
+
+pyodbc = diferido("pyodbc")
+
+# Umbrales de días por lista (los mismos valores por defecto del tablero)
+UMBRALES = {
+    'SIN_TENIDO': 8,
+    'TENIDO_SIN_APROB': 5,
+    'TENIDO_SIN_APROB_ESTAMP': 20,
+}
+# Columnas que, si cambian, vuelven a generar la alerta de una partida (DIAS crece cada día y no cuenta)
+COLUMNAS_HUELLA = ['KG', 'REF', 'COLOR', 'F_TENIDO', 'ESTADO']
+# Nombre del motor en la tabla local de corridas
+MOTOR = 'partidas'
+
+
+def connect_to_db():
+    conn = pyodbc.connect(
+        "driver={odbc driver 17 for sql server};"
+        "server=" + st.secrets["sqlserver"]["server"] + ";"
+        "database=" + st.secrets["sqlserver"]["database"] + ";"
+        "uid=" + st.secrets["sqlserver"]["username"] + ";"
+        "pwd=" + st.secrets["sqlserver"]["password"] + ";"
+    )
+    return conn
+
+
+def clasificar(df, umbrales=UMBRALES):
+    """Devuelve en un solo DataFrame las partidas vencidas de las tres listas, con la columna LISTA."""
+    listas = {
+        'SIN_TENIDO': partidas_sin_tenido(df, umbrales['SIN_TENIDO']),
+        'TENIDO_SIN_APROB': partidas_con_tenido_sin_aprob_tela(df, umbrales['TENIDO_SIN_APROB']),
+        'TENIDO_SIN_APROB_ESTAMP': partidas_con_tenido_sin_aprob_tela_estamp(df, umbrales['TENIDO_SIN_APROB_ESTAMP']),
+    }
+    vencidas = pd.concat([d.assign(LISTA=lista) for lista, d in listas.items()], ignore_index=True)
+    columnas = [c for c in COLUMNAS_HUELLA if c in vencidas.columns]
+    vencidas['HUELLA'] = pd.util.hash_pandas_object(vencidas[columnas].astype(str), index=False).astype(str)
+    return vencidas
+
+
+def leer_alertas_vigentes(lista=None):
+    """Partidas vencidas de la última corrida (para el tablero), opcionalmente de una sola lista.
+    Con `lista` siempre devuelve las columnas del tablero, aunque el motor no haya corrido."""
+    df = motor_alertas.leer_vigentes('alertas_vigentes', ['LISTA', 'PARTIDA', 'HUELLA', 'CORRIDA'])
+    if lista is not None:
+        columnas = COLUMNAS_SIN_TENIDO if lista == 'SIN_TENIDO' else COLUMNAS_SIN_APROB
+        df = df.loc[df['LISTA'] == lista].reindex(columns=columnas).reset_index(drop=True)
+    return df
+
+
+def ultima_corrida():
+    """Fecha y hora de la última corrida del motor, o None si todavía no corrió."""
+    return motor_alertas.ultima_corrida(MOTOR)
+
+
+def ejecutar_corrida(umbrales=UMBRALES, archivo_csv=None):
+    """Una corrida: consulta, clasifica, compara con la anterior y guarda las alertas nuevas."""
+    conn = connect_to_db()
+    df = leer_partidas(conn)
+    conn.close()
+
+    return motor_alertas.guardar_corrida(MOTOR, clasificar(df, umbrales), ['LISTA', 'PARTIDA'], 'HUELLA',
+                                         'alertas_vigentes', 'alertas_partidas', archivo_csv)
+
+
+def main():
+    args = motor_alertas.argumentos("Alertas periódicas de partidas vencidas", intervalo=30).parse_args()
+    motor_alertas.repetir(lambda: ejecutar_corrida(archivo_csv=args.csv), args.intervalo, args.una_vez,
+                          "vencidas: {}, alertas nuevas o cambiadas: {}")
+
+
+if __name__ == "__main__":
+    main()
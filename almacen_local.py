@@ -0,0 +1,41 @@
+import os
+import sqlite3
+
+import pandas as pd
+
+# Carpeta donde se guardan los datos locales (historiales, marcas de agua, caches)
+CARPETA_LOCAL = os.environ.get("DATOS_LOCALES", "datos_locales")
+
+
+def ruta_local(nombre):
+    """Devuelve la ruta de un archivo dentro de la carpeta local, creándola si no existe."""
+    os.makedirs(CARPETA_LOCAL, exist_ok=True)
+    return os.path.join(CARPETA_LOCAL, nombre)
+
+
+def conectar_local(nombre="local.db"):
+    """Conecta a la base SQLite local (compartida entre procesos de Streamlit)."""
+    conn = sqlite3.connect(ruta_local(nombre), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def fechas_a_texto(df, columnas):
+    """Convierte columnas de fecha a texto ISO para guardarlas en SQLite (NULL si no hay fecha)."""
+    df = df.copy()
+    for col in columnas:
+        fechas = pd.to_datetime(df[col], errors="coerce")
+        df[col] = fechas.dt.strftime("%Y-%m-%d %H:%M:%S").where(fechas.notna(), None)
+    return df
+
+
+def upsert(conn, tabla, df):
+    """Inserta o reemplaza las filas del DataFrame en la tabla local (según su clave primaria)."""
+    if df.empty:
+        return 0
+    columnas = ", ".join(f'"{col}"' for col in df.columns)
+    marcadores = ", ".join("?" for _ in df.columns)
+    filas = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+    conn.executemany(f'INSERT OR REPLACE INTO "{tabla}" ({columnas}) VALUES ({marcadores})', filas)
+    conn.commit()
+    return len(df)
@@ -0,0 +1,17 @@
+import streamlit as st
+
+from carga_diferida import precargar
+from paginas import SECCIONES
+
+# Aplicación única: streamlit run app.py sirve todas las páginas de pages/ en un solo proceso
+st.set_page_config(page_title="Producción", layout="wide")
+
+st.title("Aplicaciones de producción")
+
+for seccion, paginas in SECCIONES.items():
+    st.subheader(seccion)
+    for archivo, titulo in paginas:
+        st.page_link(f"pages/{archivo}", label=titulo)
+
+# Mientras se elige una página, importar en segundo plano los módulos pesados que comparten
+precargar("pyodbc", "psycopg2", "sqlalchemy", "pyarrow", "plotly.express", "plotly.graph_objects")
@@ -1,11 +1,7 @@
 import streamlit as st
-import pandas as pd
-import re
-
-# Function to extract the graphic code
-def extract_graphic_code(observation):
-    match = re.search(r'GRAPHIC:\s*(\d{6})', str(observation))
-    return match.group(1) if match else None
+from codigografico import extraer_codigos
+from exportar import boton_descarga
+from ingesta import leer_excel
 
 # Streamlit app
 st.title("Extracción de Código Gráfico")
@@ -14,28 +10,18 @@ st.title("Extracción de Código Gráfico")
 uploaded_file = st.file_uploader("Sube tu archivo Excel", type="xlsx")
 if uploaded_file:
     # Read the uploaded Excel file
-    df = pd.read_excel(uploaded_file)
+    df = leer_excel(uploaded_file)
     
     # Check for the required column
     if 'nt Observacion' in df.columns:
-        # Extract the graphic code
-        df['Graphic Code'] = df['nt Observacion'].apply(extract_graphic_code)
+        # Extract the graphic code (toda la columna de una vez; 'Graphic Codes' lista todos los códigos)
+        df[['Graphic Code', 'Graphic Codes']] = extraer_codigos(df['nt Observacion'])
         
         # Show the updated DataFrame
         st.write("Datos con la columna 'Graphic Code' añadida:")
         st.write(df)
         
-        # Provide download option
-        output_file = 'Updated_GRAF.xlsx'
-        df.to_excel(output_file, index=False)
-        
-        # Download link
-        with open(output_file, "rb") as file:
-            btn = st.download_button(
-                label="Descargar archivo con código gráfico",
-                data=file,
-                file_name="Updated_GRAF.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+        # Download link (archivo generado en memoria, sin escribir en el directorio de trabajo)
+        boton_descarga(df, "Updated_GRAF.xlsx", "Descargar archivo con código gráfico")
     else:
         st.error("El archivo no tiene una columna llamada 'nt Observacion'.")
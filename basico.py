@@ -1,18 +1,19 @@
 # Importar las librerias necesarias
 import streamlit as st
-import pandas as pd
-import pyodbc
 from datetime import datetime, timedelta
+from medicion import leer_sql
+from carga_diferida import diferido, precargar
+pyodbc = diferido("pyodbc")
 # Función para conectarse a BD y ejecutar una consulta
 def execute_query(query):
  conn = pyodbc.connect(
  "DRIVER={ODBC Driver 17 for SQL Server};"
- "SERVER=" + st.secrets["server"] + ";"
- "DATABASE=" + st.secrets["database"] + ";"
- "UID=" + st.secrets["username"] + ";"
- "PWD=" + st.secrets["password"] + ";"
+ "SERVER=" + st.secrets["sqlserver"]["server"] + ";"
+ "DATABASE=" + st.secrets["sqlserver"]["database"] + ";"
+ "UID=" + st.secrets["sqlserver"]["username"] + ";"
+ "PWD=" + st.secrets["sqlserver"]["password"] + ";"
  )
- df = pd.read_sql(query, conn)
+ df = leer_sql("basico.execute_query", query, conn)
  conn.close()
  return df
 
@@ -32,4 +33,7 @@ df = execute_query(query)
 # Mostrar el número de registros
 st.write(f"Número de registros: {len(df)}")
 # Mostrar el resultado en formato de tabla
-st.dataframe(df, hide_index=True) 
+st.dataframe(df, hide_index=True)
+
+# Después de la primera pintura, cargar en segundo plano los módulos diferidos
+precargar()
@@ -0,0 +1,49 @@
+"""Benchmark de la extracción de códigos gráficos de appgrafico.py.
+
+Uso: python bench_codigografico.py [filas]   (por defecto 1000000)
+
+Compara el .apply fila por fila anterior con la extracción vectorizada de codigografico.py.
+"""
+import sys
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from codigografico import extract_graphic_code, extraer_codigos
+
+
+def observaciones_prueba(filas):
+    """Observaciones sintéticas: sin código, con un código y con dos códigos."""
+    rng = np.random.default_rng(0)
+    codigos = rng.integers(100000, 999999, (filas, 2)).astype(str)
+    plantillas = np.array([
+        'SIN GRAFICO, ENTREGA PARCIAL',
+        'PRENDA CON GRAPHIC: {0} EN PECHO',
+        'GRAPHIC: {0} DELANTERO / GRAPHIC:{1} ESPALDA',
+    ])
+    tipo = rng.integers(0, 3, filas)
+    textos = [plantillas[t].format(a, b) for t, (a, b) in zip(tipo, codigos)]
+    return pd.Series(textos, name='nt Observacion')
+
+
+def medir(nombre, funcion, serie):
+    inicio = perf_counter()
+    funcion(serie)
+    return {'METODO': nombre, 'SEGUNDOS': round(perf_counter() - inicio, 2)}
+
+
+def main():
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    serie = observaciones_prueba(filas)
+    resultados = [
+        medir('apply(extract_graphic_code) (anterior)', lambda s: s.apply(extract_graphic_code), serie),
+        medir('str.extract (solo el primer código)', lambda s: s.str.extract(r'GRAPHIC:\s*(\d{6})', expand=False), serie),
+        medir('extraer_codigos (primero y todos)', extraer_codigos, serie),
+    ]
+    print(f"Filas: {filas}")
+    print(pd.DataFrame(resultados).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark de exportar.py contra las formas de exportación anteriores.
+
+Uso: python bench_exportar.py [filas]   (por defecto 500000)
+
+Mide tiempo, tamaño del archivo y pico de memoria de Python (tracemalloc) por método.
+"""
+import io
+import sys
+import tracemalloc
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from exportar import exportar
+
+
+def datos_prueba(filas):
+    """DataFrame sintético con el tipo de columnas de los reportes (códigos, textos, cantidades, fechas)."""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'PEDIDO': rng.integers(1000, 9999, filas).astype(str),
+        'OP': rng.integers(100000, 999999, filas),
+        'COMBO': rng.choice(['BLANCO', 'NEGRO', 'AZUL MARINO', 'ROJO'], filas),
+        'TALLA': rng.choice(['XS', 'S', 'M', 'L', 'XL'], filas),
+        'UNID': rng.integers(0, 500, filas),
+        'KG': rng.random(filas) * 100,
+        'FECHA': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 365, filas), unit='D'),
+    })
+
+
+def pandas_openpyxl(df):
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False)
+    return output.getvalue()
+
+
+def pandas_xlsxwriter(df):
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        df.to_excel(writer, index=False, sheet_name='Sheet1')
+    return output.getvalue()
+
+
+def medir(nombre, funcion, df):
+    tracemalloc.start()
+    inicio = perf_counter()
+    contenido = funcion(df)
+    segundos = perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'METODO': nombre, 'SEGUNDOS': round(segundos, 2),
+            'MB_ARCHIVO': round(len(contenido) / 2**20, 1), 'MB_PICO': round(pico / 2**20, 1)}
+
+
+def main():
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    df = datos_prueba(filas)
+    metodos = [
+        ('xlsx pandas + openpyxl (anterior)', pandas_openpyxl),
+        ('xlsx pandas + xlsxwriter (anterior)', pandas_xlsxwriter),
+        ('xlsx exportar (constant_memory)', lambda d: exportar(d, 'xlsx')),
+        ('csv exportar', lambda d: exportar(d, 'csv')),
+        ('parquet exportar', lambda d: exportar(d, 'parquet')),
+    ]
+    resultados = [medir(nombre, funcion, df) for nombre, funcion in metodos]
+    print(f"Filas: {filas}")
+    print(pd.DataFrame(resultados).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""Benchmark del tiempo de importación de cada app (python -X importtime).
+
+Uso: python bench_importacion.py [app.py ...] [--base REVISION]   (por defecto todas las apps)
+
+De cada app se toman las importaciones de primer nivel (y las declaraciones de carga_diferida)
+y se ejecutan en un proceso nuevo con -X importtime, REPETICIONES veces. Es lo que la app hace
+antes de pintar su primer elemento. Se informa la mediana del total y los módulos más pesados.
+
+Con --base se mide también cada app como estaba en otra revisión de git (por ejemplo HEAD~1),
+para ver cuánto se ganó o perdió.
+"""
+import ast
+import glob
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+REPETICIONES = 5
+MODULOS_MOSTRADOS = 3
+# Scripts que no son apps de Streamlit
+NO_APPS = ('bench_', 'alertas', 'datos_sinteticos')
+
+
+def es_app(ruta):
+    """Las apps pintan algo al cargarse: título, configuración de página o encabezado."""
+    if os.path.basename(ruta).startswith(NO_APPS):
+        return False
+    with open(ruta, encoding='utf-8') as f:
+        fuente = f.read()
+    return any(llamada in fuente for llamada in ('st.title(', 'st.set_page_config(', 'st.header('))
+
+
+def codigo_importaciones(fuente):
+    """Sentencias de primer nivel que se ejecutan antes de la interfaz: import, from ... import
+    y asignaciones con diferido(...)."""
+    arbol = ast.parse(fuente)
+    sentencias = [
+        nodo for nodo in arbol.body
+        if isinstance(nodo, (ast.Import, ast.ImportFrom))
+        or (isinstance(nodo, ast.Assign) and isinstance(nodo.value, ast.Call)
+            and getattr(nodo.value.func, 'id', None) == 'diferido')
+    ]
+    return ast.unparse(ast.Module(body=sentencias, type_ignores=[]))
+
+
+def medir_importacion(codigo):
+    """Devuelve (milisegundos totales, {módulo de primer nivel: milisegundos}) de una ejecución."""
+    salida = subprocess.run([sys.executable, '-X', 'importtime', '-c', codigo],
+                            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if salida.returncode != 0:
+        raise RuntimeError(salida.stderr.strip().splitlines()[-1])
+    modulos = {}
+    for linea in salida.stderr.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        _, acumulado, nombre = linea.split('|')
+        # Los módulos importados por otros aparecen con sangría; solo se suman los de primer nivel
+        if not nombre[1:].startswith(' '):
+            modulos[nombre.strip()] = int(acumulado) / 1000
+    return sum(modulos.values()), modulos
+
+
+def medir_fuente(fuente, arranque=()):
+    """Mediana del total y módulos más pesados (de la corrida mediana) para el código de una app.
+    No se cuentan los módulos de `arranque` (los que el intérprete importa siempre)."""
+    codigo = codigo_importaciones(fuente)
+    corridas = []
+    for _ in range(REPETICIONES):
+        _, modulos = medir_importacion(codigo)
+        modulos = {nombre: ms for nombre, ms in modulos.items() if nombre not in arranque}
+        corridas.append((sum(modulos.values()), modulos))
+    total, modulos = sorted(corridas, key=lambda c: c[0])[len(corridas) // 2]
+    pesados = sorted(modulos.items(), key=lambda m: m[1], reverse=True)[:MODULOS_MOSTRADOS]
+    return total, ', '.join(f"{nombre} {ms:.0f}" for nombre, ms in pesados)
+
+
+def fuente_en_revision(ruta, revision):
+    salida = subprocess.run(['git', 'show', f'{revision}:{ruta}'], capture_output=True, text=True)
+    return salida.stdout if salida.returncode == 0 else None
+
+
+def main():
+    argumentos = sys.argv[1:]
+    base = None
+    if '--base' in argumentos:
+        i = argumentos.index('--base')
+        base = argumentos[i + 1]
+        del argumentos[i:i + 2]
+    apps = argumentos or sorted(ruta for ruta in glob.glob('*.py') if es_app(ruta))
+    arranque = set(medir_importacion('pass')[1])
+
+    filas = []
+    for app in apps:
+        with open(app, encoding='utf-8') as f:
+            fila = {'APP': app}
+            try:
+                fila['MS'], fila['MAS_PESADOS'] = medir_fuente(f.read(), arranque)
+            except RuntimeError as e:
+                print(f"{app}: no se pudo medir ({e})")
+                continue
+        if base:
+            fuente = fuente_en_revision(app, base)
+            try:
+                fila['MS_BASE'] = medir_fuente(fuente, arranque)[0] if fuente else None
+            except RuntimeError:
+                fila['MS_BASE'] = None
+        filas.append(fila)
+        print(f"  {app}: {fila['MS']:.0f} ms")
+
+    resultados = pd.DataFrame(filas)
+    if base and not resultados.empty:
+        resultados['MS_BASE'] = pd.to_numeric(resultados['MS_BASE'])
+        resultados['AHORRO_%'] = (1 - resultados['MS'] / resultados['MS_BASE']) * 100
+        resultados = resultados[['APP', 'MS_BASE', 'MS', 'AHORRO_%', 'MAS_PESADOS']]
+    print(f"Mediana de {REPETICIONES} procesos nuevos, en milisegundos"
+          + (f" (base: {base})" if base else ""))
+    print(resultados.round(1).to_string(index=False))
+    if base and not resultados.empty:
+        print(f"Total: {resultados['MS_BASE'].sum():.0f} ms -> {resultados['MS'].sum():.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark de lectura: pd.read_sql sobre una conexión DB-API contra lectura_arrow.leer_arrow.
+
+Uso: python bench_lectura.py [filas] [columnas]   (por defecto 300000 filas y 30 columnas)
+
+Usa una tabla ancha sintética en SQLite (textos, enteros, decimales y fechas, como un SELECT *
+de la tabla del plan) y mide tiempo, pico de memoria de Python (tracemalloc) y memoria del
+DataFrame resultante.
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+os.environ["MEDIR_CONSULTAS"] = "0"
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+from lectura_arrow import leer_arrow
+
+
+def tabla_ancha(filas, columnas):
+    rng = np.random.default_rng(0)
+    datos = {}
+    for i in range(columnas):
+        tipo = i % 4
+        if tipo == 0:
+            datos[f"texto_{i}"] = rng.choice(['ARMADO', 'TEÑIDO', 'CORTE', 'COSTURA', None], filas)
+        elif tipo == 1:
+            datos[f"entero_{i}"] = rng.integers(0, 100000, filas)
+        elif tipo == 2:
+            datos[f"decimal_{i}"] = rng.random(filas) * 1000
+        else:
+            datos[f"fecha_{i}"] = (pd.Timestamp('2025-01-01')
+                                   + pd.to_timedelta(rng.integers(0, 365, filas), unit='D')).strftime('%Y-%m-%d')
+    return pd.DataFrame(datos)
+
+
+def medir(nombre, funcion):
+    tracemalloc.start()
+    inicio = perf_counter()
+    df = funcion()
+    segundos = perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'METODO': nombre, 'SEGUNDOS': round(segundos, 2), 'MB_PICO': round(pico / 2**20, 1),
+            'MB_DATAFRAME': round(df.memory_usage(deep=True).sum() / 2**20, 1)}
+
+
+def main():
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    columnas = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, 'ancha.db')
+        conn = sqlite3.connect(ruta)
+        tabla_ancha(filas, columnas).to_sql('plan', conn, index=False, chunksize=50_000)
+        conn.close()
+
+        query = 'SELECT * FROM plan'
+        engine = create_engine(f'sqlite:///{ruta}')
+
+        def con_read_sql():
+            conn = sqlite3.connect(ruta)
+            df = pd.read_sql(query, conn)
+            conn.close()
+            return df
+
+        resultados = [
+            medir('pd.read_sql (DB-API, anterior)', con_read_sql),
+            medir('leer_arrow (bloques + Arrow)', lambda: leer_arrow('bench', query, engine)),
+        ]
+        engine.dispose()
+    print(f"Filas: {filas}, columnas: {columnas}")
+    print(pd.DataFrame(resultados).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
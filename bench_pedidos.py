@@ -0,0 +1,141 @@
+"""Benchmark sin conexión de los reportes de avance de pedidos (borrador.py y gantt2BD.py).
+
+Uso: python bench_pedidos.py [pedidos ...]   (por defecto 10 1000 100000)
+
+Genera datos sintéticos en dos bases SQLite temporales (una en lugar de SQL Server y otra en
+lugar del plan en PostgreSQL) y mide por separado cada fase del flujo:
+  - lectura: consulta + armado del DataFrame (con medicion.leer_sql, como las apps)
+  - conversion: fechas de texto a datetime, como las entrega el driver en producción
+  - resumen: borrador.add_summary_row para las dos fuentes
+  - grafico: borrador.create_gantt_chart y gantt2BD.crear_gantt (un pedido)
+
+Los resultados se agregan a datos_locales/bench_pedidos.csv. Si una fase tarda más de
+TOLERANCIA_REGRESION veces la mediana de las corridas anteriores, se informa y el proceso
+termina con código 1, para poder usarlo antes de publicar cambios.
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime
+from time import perf_counter
+
+# Las corridas de prueba no se registran en las métricas de producción
+os.environ["MEDIR_CONSULTAS"] = "0"
+
+import pandas as pd
+
+import datos_sinteticos
+from almacen_local import ruta_local
+from medicion import leer_sql
+
+ESCALAS = [10, 1_000, 100_000]
+TOLERANCIA_REGRESION = 1.5
+# Por debajo de este tiempo las diferencias son ruido
+SEGUNDOS_MINIMOS = 0.05
+ARCHIVO_HISTORIAL = "bench_pedidos.csv"
+
+COLUMNAS_FECHA_ERP = ['F_EMISION', 'F_ENTREGA', 'FMINARM', 'FMAXARM', 'FMINTENID', 'FMAXTENID',
+                      'FMINTELAPROB', 'FMAXTELAPROB', 'FMINCORTE', 'FMAXCORTE', 'FMINCOSIDO', 'FMAXCOSIDO']
+COLUMNAS_FECHA_PLAN = ['Fecha_Colocacion', 'Fecha_Entrega'] + [
+    f"{prefijo}_{proceso}" for prefijo in ('star', 'finish') for proceso in datos_sinteticos.PROCESOS_PLAN]
+
+
+def a_fechas(df, columnas):
+    for col in columnas:
+        df[col] = pd.to_datetime(df[col])
+    return df
+
+
+class Cronometro:
+    """Acumula (flujo, fase, segundos) de cada bloque medido."""
+
+    def __init__(self):
+        self.tiempos = []
+
+    def medir(self, flujo, fase, funcion, *args):
+        inicio = perf_counter()
+        resultado = funcion(*args)
+        self.tiempos.append((flujo, fase, perf_counter() - inicio))
+        return resultado
+
+
+def correr_escala(pedidos, borrador, gantt2BD):
+    crono = Cronometro()
+    with tempfile.TemporaryDirectory() as carpeta:
+        conn_erp = sqlite3.connect(os.path.join(carpeta, "erp.db"))
+        conn_plan = sqlite3.connect(os.path.join(carpeta, "plan.db"))
+        inicio = perf_counter()
+        codigos = datos_sinteticos.cargar(conn_erp, conn_plan, pedidos)
+        print(f"  datos generados en {perf_counter() - inicio:.1f} s")
+
+        # borrador.py: todos los pedidos consolidados
+        datos_sinteticos.preparar_pedidos(conn_erp, codigos)
+        datos_sinteticos.preparar_pedidos(conn_plan, codigos)
+        df = crono.medir('borrador', 'lectura', leer_sql, 'bench.consolidado', datos_sinteticos.QUERY_CONSOLIDADO, conn_erp)
+        df_plan = crono.medir('borrador', 'lectura', leer_sql, 'bench.plan', datos_sinteticos.QUERY_PLAN, conn_plan)
+        df = crono.medir('borrador', 'conversion', a_fechas, df, COLUMNAS_FECHA_ERP)
+        df_plan = crono.medir('borrador', 'conversion', a_fechas, df_plan, COLUMNAS_FECHA_PLAN)
+        df = crono.medir('borrador', 'resumen', borrador.add_summary_row, df, 'mssql')
+        df_plan = crono.medir('borrador', 'resumen', borrador.add_summary_row, df_plan, 'postgres')
+        crono.medir('borrador', 'grafico', borrador.create_gantt_chart, df, df_plan)
+
+        # gantt2BD.py: un pedido sobre las tablas completas
+        datos_sinteticos.preparar_pedidos(conn_erp, codigos[:1])
+        datos_sinteticos.preparar_pedidos(conn_plan, codigos[:1])
+        df = crono.medir('gantt2BD', 'lectura', leer_sql, 'bench.consolidado', datos_sinteticos.QUERY_CONSOLIDADO, conn_erp)
+        df_plan = crono.medir('gantt2BD', 'lectura', leer_sql, 'bench.plan', datos_sinteticos.QUERY_PLAN, conn_plan)
+        df = crono.medir('gantt2BD', 'conversion', a_fechas, df, COLUMNAS_FECHA_ERP)
+        df_plan = crono.medir('gantt2BD', 'conversion', a_fechas, df_plan, COLUMNAS_FECHA_PLAN)
+        crono.medir('gantt2BD', 'grafico', gantt2BD.crear_gantt, df, df_plan)
+
+        conn_erp.close()
+        conn_plan.close()
+
+    resultado = pd.DataFrame(crono.tiempos, columns=['FLUJO', 'FASE', 'SEGUNDOS'])
+    resultado = resultado.groupby(['FLUJO', 'FASE'], sort=False, as_index=False)['SEGUNDOS'].sum()
+    resultado.insert(0, 'PEDIDOS', pedidos)
+    return resultado
+
+
+def comparar(resultados, historial):
+    """Marca las fases que superan la tolerancia frente a la mediana de las corridas anteriores."""
+    if historial.empty:
+        resultados['REFERENCIA'] = None
+        resultados['REGRESION'] = False
+        return resultados
+    referencia = historial.groupby(['PEDIDOS', 'FLUJO', 'FASE'])['SEGUNDOS'].median().rename('REFERENCIA')
+    resultados = resultados.join(referencia, on=['PEDIDOS', 'FLUJO', 'FASE'])
+    resultados['REGRESION'] = ((resultados['SEGUNDOS'] > resultados['REFERENCIA'] * TOLERANCIA_REGRESION)
+                               & (resultados['SEGUNDOS'] > SEGUNDOS_MINIMOS))
+    return resultados
+
+
+def main():
+    escalas = [int(x) for x in sys.argv[1:]] or ESCALAS
+    # Las apps se importan sin servidor de Streamlit (modo "bare"): la interfaz no hace nada
+    import borrador
+    import gantt2BD
+
+    partes = []
+    for pedidos in escalas:
+        print(f"Pedidos: {pedidos}")
+        partes.append(correr_escala(pedidos, borrador, gantt2BD))
+    resultados = pd.concat(partes, ignore_index=True)
+
+    archivo = ruta_local(ARCHIVO_HISTORIAL)
+    historial = pd.read_csv(archivo) if os.path.exists(archivo) else pd.DataFrame()
+    resultados = comparar(resultados, historial)
+    print(resultados.round(4).to_string(index=False))
+
+    nuevos = resultados[['PEDIDOS', 'FLUJO', 'FASE', 'SEGUNDOS']].copy()
+    nuevos.insert(0, 'FECHA', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    nuevos.to_csv(archivo, mode='a', header=not os.path.exists(archivo), index=False)
+
+    if resultados['REGRESION'].any():
+        print(f"Regresión: fases más de {TOLERANCIA_REGRESION}x más lentas que la mediana anterior")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,34 +1,21 @@
 import streamlit as st
-import pyodbc
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import psycopg2
+from conexiones import conectar_postgres, conectar_sqlserver
+from medicion import conectar_medido, leer_sql
+from carga_diferida import diferido, precargar
+px = diferido("plotly.express")
+go = diferido("plotly.graph_objects")
 
 st.set_page_config(layout="wide")
 
 # Configurar la conexión a la base de datos utilizando las credenciales almacenadas en secrets
 def connect_db():
-    connection = pyodbc.connect(
-        "driver={odbc driver 17 for sql server};"
-        "server=" + st.secrets["msserver"] + ";"
-        "database=" + st.secrets["msdatabase"] + ";"
-        "uid=" + st.secrets["msusername"] + ";"
-        "pwd=" + st.secrets["mspassword"] + ";"
-    )
-    return connection
+    return conectar_sqlserver()
 
 # New PostgreSQL connection function
 def connect_postgres():
-    connection = psycopg2.connect(
-        host=st.secrets["host"],
-        port=st.secrets["port"],
-        database=st.secrets["database"],
-        user=st.secrets["user"],
-        password=st.secrets["password"]
-    )
-    return connection
+    return conectar_postgres()
 
 # Agregar estas funciones después de connect_postgres():
 
@@ -107,7 +94,7 @@ def add_summary_row_postgres(df):
 
 # Función para ejecutar la consulta SQL
 def run_query(pedidos):
-    conn = connect_db()
+    conn, t_conexion = conectar_medido(connect_db)
     query = """SELECT gg.PEDIDO, --gg.IdDocumento_OrdenVenta, 
     	gg.F_EMISION, gg.F_ENTREGA, gg.DIAS, gg.CLIENTE, gg.PO, gg.KG_REQ, 
        gg.KG_ARMP, gg.KG_TENIDP, gg.KG_TELAPROBP, gg.UNID, gg.PROGP, gg.CORTADOP, gg.COSIDOP, 
@@ -334,13 +321,13 @@ WHERE x.CoddocOrdenVenta IS NOT NULL
 ON gg.IdDocumento_OrdenVenta = ff.IdDocumento_OrdenVenta
 WHERE gg.PEDIDO IN ({})""".format(','.join(['?' for _ in pedidos])) 
 
-    df = pd.read_sql(query, conn, params=tuple(pedidos))
+    df = leer_sql("borra.run_query", query, conn, params=tuple(pedidos), t_conexion=t_conexion)
     conn.close()
     return df
 
 # New PostgreSQL query function
 def run_postgres_query(pedido):
-    conn = connect_postgres()
+    conn, t_conexion = conectar_medido(connect_postgres)
     placeholders = ','.join(['%s' for _ in pedidos])
     # Modify this query to get the specific dates and information you want
     query = '''
@@ -363,7 +350,7 @@ def run_postgres_query(pedido):
     WHERE "IdDocumento_OrdenVenta" IN ({})
     '''.format(placeholders)
     
-    df = pd.read_sql(query, conn, params=tuple(pedidos))
+    df = leer_sql("borra.run_postgres_query", query, conn, params=tuple(pedidos), t_conexion=t_conexion)
     conn.close()
     return df
 
@@ -602,3 +589,6 @@ if st.button("Ejecutar Consulta"):
             st.error(f"Error al ejecutar la consulta: {e}")
     else:
         st.warning("Por favor ingresa un número de pedido.")
+
+# Después de la primera pintura, cargar en segundo plano los módulos diferidos
+precargar()
@@ -1,34 +1,26 @@
 import streamlit as st
-import pyodbc
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import psycopg2
+from datetime import datetime
+from conexiones import conectar_postgres, conectar_sqlserver
+from medicion import conectar_medido, leer_sql
+from paralelo import TIMEOUTS, en_paralelo, mostrar_tiempos
+from consultas_avance import query_versiones_pedidos, query_versiones_plan
+from refresco import refrescar
+from graficos_pedido import create_gantt_chart
+from carga_diferida import precargar
 
 # Configuración de la página
 st.set_page_config(layout="wide")
 st.title("Progreso de Pedidos Consolidado")
 
 # Funciones de conexión a la base de datos
-def connect_db(db_type='mssql'):
-    """Conecta a la base de datos especificada."""
+def connect_db(db_type='mssql', timeout=None):
+    """Conecta a la base de datos especificada (conexión del pool compartido). Con `timeout`
+    (segundos) el servidor cancela las consultas que tarden más."""
     if db_type == 'mssql':
-        return pyodbc.connect(
-            "driver={ODBC Driver 17 for SQL Server};"
-            "server=" + st.secrets["msserver"] + ";"
-            "database=" + st.secrets["msdatabase"] + ";"
-            "uid=" + st.secrets["msusername"] + ";"
-            "pwd=" + st.secrets["mspassword"] + ";"
-        )
+        return conectar_sqlserver(timeout)
     elif db_type == 'postgres':
-        return psycopg2.connect(
-            host=st.secrets["host"],
-            port=st.secrets["port"],
-            database=st.secrets["database"],
-            user=st.secrets["user"],
-            password=st.secrets["password"]
-        )
+        return conectar_postgres(timeout)
     else:
         raise ValueError("Tipo de base de datos no soportado.")
 
@@ -91,11 +83,9 @@ def add_summary_row(df, db_type='mssql'):
     df_with_summary = pd.concat([df, pd.DataFrame([summary])], ignore_index=True)
     return df_with_summary
 
-# Función para ejecutar consultas (usando st.cache_data)
-@st.cache_data
-def run_query(pedidos, db_type='mssql'):
-    """Ejecuta una consulta en la base de datos especificada."""
-    conn = connect_db(db_type)
+# Función para armar la consulta de una lista de pedidos
+def query_pedidos(pedidos, db_type='mssql'):
+    """Devuelve la consulta del motor especificado para la lista de pedidos."""
     if db_type == 'mssql':
         query = """
         SELECT gg.PEDIDO, gg.F_EMISION, gg.F_ENTREGA, gg.DIAS, gg.CLIENTE, gg.PO, gg.KG_REQ, 
@@ -339,178 +329,41 @@ def run_query(pedidos, db_type='mssql'):
         """.format(','.join(['%s' for _ in pedidos]))
     else:
         raise ValueError("Tipo de base de datos no soportado.")
-    
-    df = pd.read_sql(query, conn, params=tuple(pedidos))
-    conn.close()
-    return df
-
-# Función para crear el gráfico de Gantt
-def create_gantt_chart(df, df_postgres):
-    """Crea un gráfico de Gantt con los datos proporcionados."""
-    n = len(df) - 1  # Índice de la fila de resumen
-    
-    # Fechas de inicio y fin
-    start_armado = pd.to_datetime(df_postgres['star_armado'].iloc[n])
-    finish_armado = pd.to_datetime(df_postgres['finish_armado'].iloc[n])
-    start_tenido = pd.to_datetime(df_postgres['star_tenido'].iloc[n])
-    finish_tenido = pd.to_datetime(df_postgres['finish_tenido'].iloc[n])
-    start_telaprob = pd.to_datetime(df_postgres['star_telaprob'].iloc[n])
-    finish_telaprob = pd.to_datetime(df_postgres['finish_telaprob'].iloc[n])
-    start_corte = pd.to_datetime(df_postgres['star_corte'].iloc[n])
-    finish_corte = pd.to_datetime(df_postgres['finish_corte'].iloc[n])
-    start_costura = pd.to_datetime(df_postgres['star_costura'].iloc[n])
-    finish_costura = pd.to_datetime(df_postgres['finish_costura'].iloc[n])
-    
+    return query
 
-    
-    # Crear DataFrame para el gráfico de Gantt
-    df_gantt = pd.DataFrame({
-        'Proceso': ['ARMADO', 'TEÑIDO', 'TELA_APROB', 'CORTE', 'COSTURA'],
-        'Start': [start_armado, start_tenido, start_telaprob, start_corte, start_costura],
-        'Finish': [finish_armado, finish_tenido, finish_telaprob, finish_corte, finish_costura],
-        'Start Real': [pd.to_datetime(df['FMINARM'].iloc[n]), pd.to_datetime(df['FMINTENID'].iloc[n]), 
-                       pd.to_datetime(df['FMINTELAPROB'].iloc[n]), pd.to_datetime(df['FMINCORTE'].iloc[n]), 
-                       pd.to_datetime(df['FMINCOSIDO'].iloc[n])],
-        'Finish Real': [pd.to_datetime(df['FMAXARM'].iloc[n]), pd.to_datetime(df['FMAXTENID'].iloc[n]), 
-                        pd.to_datetime(df['FMAXTELAPROB'].iloc[n]), pd.to_datetime(df['FMAXCORTE'].iloc[n]), 
-                        pd.to_datetime(df['FMAXCOSIDO'].iloc[n])],
-        'Avance': [df['KG_ARMP'].iloc[n], df['KG_TENIDP'].iloc[n], df['KG_TELAPROBP'].iloc[n], 
-                   df['CORTADOP'].iloc[n], df['COSIDOP'].iloc[n]]
-    })
-    
-    # Crear el gráfico de Gantt
-    fig = px.timeline(df_gantt, x_start="Start", x_end="Finish", y="Proceso", text="Avance")
-    
-    # Agregar líneas verticales cada dos días
-    fecha_inicio = min(df_gantt['Start'].min(), df_gantt['Start Real'].min())
-    fecha_fin = max(df_gantt['Finish'].max(), df_gantt['Finish Real'].max())
-    dias_totales = (fecha_fin - fecha_inicio).days
-
-    for i in range(0, dias_totales + 1, 2):
-        fecha_linea = fecha_inicio + timedelta(days=i)
-        fig.add_shape(
-            type="line",
-            x0=fecha_linea,
-            y0=0,
-            x1=fecha_linea,
-            y1=len(df_gantt),
-            line=dict(
-                color="lightgray",
-                width=1,
-                dash="dot"
-            ),
-            layer="below"  # Esto asegura que las líneas estén detrás de las barras del Gantt
-        )
-
-    # Agregar las marcas de inicio y fin reales
-    fig.add_trace(go.Scatter(
-        x=df_gantt['Start Real'],
-        y=df_gantt['Proceso'],
-        mode='markers',
-        marker=dict(symbol='triangle-up', size=10, color='black'),
-        name='Inicio Real'
-    ))
-    fig.add_trace(go.Scatter(
-        x=df_gantt['Finish Real'],
-        y=df_gantt['Proceso'],
-        mode='markers',
-        marker=dict(symbol='triangle-down', size=10, color='red'),
-        name='Fin Real'
-    ))
-
-    # Fechas de emisión y entrega
-    fecha_emision = pd.to_datetime(df['F_EMISION'].iloc[n])
-    fecha_entrega = pd.to_datetime(df['F_ENTREGA'].iloc[n])
-
-    # Fechas de inicio y fin del pedido
-    fecha_inicio_pedido = min(df_gantt['Start'].min(), df_gantt['Start Real'].min())
-    fecha_fin_pedido = max(df_gantt['Finish'].max(), df_gantt['Finish Real'].max())
+# Función para ejecutar consultas (refresco incremental)
+def run_query(pedidos, db_type='mssql'):
+    """Devuelve (df, version) de los pedidos. Se consulta primero la versión de cada pedido y
+    solo se vuelven a leer los que cambiaron desde la consulta anterior."""
+    conn, t_conexion = conectar_medido(connect_db, db_type, TIMEOUTS.get(db_type))
+    try:
+        def versionar():
+            if db_type == 'mssql':
+                df = leer_sql("borrador.versiones.mssql", query_versiones_pedidos(pedidos), conn,
+                              params=tuple(pedidos), t_conexion=t_conexion)
+                return dict(zip(df['PEDIDO'], df['VERSION']))
+            df = leer_sql("borrador.versiones.postgres", query_versiones_plan(pedidos), conn,
+                          params=tuple(pedidos), t_conexion=t_conexion)
+            return dict(zip(df['pedido'], df['version']))
 
-    # Agregar líneas verticales para las fechas de emisión y entrega
-    fig.add_shape(
-        type="line",
-        x0=fecha_emision,
-        y0=0,
-        x1=fecha_emision,
-        y1=len(df_gantt),
-        line=dict(color="green", width=2, dash="dash"),
-        name="Fecha Emisión"
-    )
-    fig.add_annotation(
-        x=fecha_emision,
-        y=len(df_gantt)/2,
-        text="Emisión<br>" + fecha_emision.strftime('%b %d'),
-        showarrow=True,
-        arrowhead=1
-    )
-    fig.add_shape(
-        type="line",
-        x0=fecha_entrega,
-        y0=0,
-        x1=fecha_entrega,
-        y1=len(df_gantt),
-        line=dict(color="red", width=2, dash="dash"),
-        name="Fecha Entrega"
-    )
-    fig.add_annotation(
-        x=fecha_entrega,
-        y=len(df_gantt)/2,
-        text="Entrega<br>" + fecha_entrega.strftime('%b %d'),
-        showarrow=True,
-        arrowhead=1
-    )
+        def leer(cambiados):
+            cambiados = pedidos if cambiados is None else cambiados
+            return leer_sql(f"borrador.run_query.{db_type}", query_pedidos(cambiados, db_type), conn,
+                            params=tuple(cambiados))
 
-    # Agregar líneas verticales para las fechas de inicio y fin del pedido
-    fig.add_shape(
-        type="line",
-        x0=fecha_inicio_pedido,
-        y0=0,
-        x1=fecha_inicio_pedido,
-        y1=len(df_gantt),
-        line=dict(color="purple", width=2, dash="dash"),
-        name="Inicio Pedido"
-    )
-    fig.add_annotation(
-        x=fecha_inicio_pedido,
-        y=len(df_gantt)/2,
-        text="Inicio<br>" + fecha_inicio_pedido.strftime('%b %d'),
-        showarrow=True,
-        arrowhead=1
-    )
-    fig.add_shape(
-        type="line",
-        x0=fecha_fin_pedido,
-        y0=0,
-        x1=fecha_fin_pedido,
-        y1=len(df_gantt),
-        line=dict(color="orange", width=2, dash="dash"),
-        name="Fin Pedido"
-    )
-    fig.add_annotation(
-        x=fecha_fin_pedido,
-        y=len(df_gantt)/2,
-        text="Fin<br>" + fecha_fin_pedido.strftime('%b %d'),
-        showarrow=True,
-        arrowhead=1
-    )
+        columna = 'PEDIDO' if db_type == 'mssql' else 'pedido'
+        return refrescar(("borrador", db_type, tuple(pedidos)), versionar, leer, columna)
+    finally:
+        conn.close()
 
-    # Agregar una línea vertical para la fecha actual
-    fecha_actual = datetime.now().strftime('%Y-%m-%d')
-    fig.add_shape(
-        type="line",
-        x0=fecha_actual,
-        y0=0,
-        x1=fecha_actual,
-        y1=len(df_gantt),
-        line=dict(color="blue", width=2, dash="dash"),
-        name="Fecha Actual"
-    )
+# Filas de resumen y gráfico: se recalculan si cambió la versión de alguno de los resultados o
+# el día (la línea de fecha actual y los colores por estado dependen de hoy)
+@st.cache_data(max_entries=20)
+def armar_vista(version_mssql, version_postgres, hoy, _df, _df_postgres):
+    df = add_summary_row(_df, db_type='mssql')
+    df_postgres = add_summary_row(_df_postgres, db_type='postgres')
+    return df, df_postgres, create_gantt_chart(df, df_postgres)
 
-    # Ajustar el diseño del gráfico
-    fig.update_xaxes(tickmode='linear', dtick=2 * 24 * 60 * 60 * 1000, tickformat='%d\n%b\n%y')
-    fig.update_yaxes(autorange="reversed")
-    
-    return fig
 
 # Interfaz de usuario
 pedidos_input = st.text_input("Ingresa los números de pedido (separados por coma)")
@@ -520,16 +373,24 @@ if st.button("Ejecutar Consulta"):
         try:
             pedidos = [p.strip() for p in pedidos_input.split(',')]
             
-            # Ejecutar consultas
-            df = run_query(pedidos, db_type='mssql')
-            df_postgres = run_query(pedidos, db_type='postgres')
+            # Ejecutar las consultas de los dos motores en paralelo
+            resultados = en_paralelo({
+                'mssql': lambda: run_query(pedidos, db_type='mssql'),
+                'postgres': lambda: run_query(pedidos, db_type='postgres'),
+            })
+            mostrar_tiempos(resultados, {'mssql': 'SQL Server', 'postgres': 'PostgreSQL'})
+            for nombre, resultado in resultados.items():
+                if resultado['error'] is not None:
+                    raise resultado['error']
+            df, version_mssql = resultados['mssql']['valor']
+            df_postgres, version_postgres = resultados['postgres']['valor']
             
             if df.empty:
                 st.warning("No se encontraron datos para estos pedidos en SQL Server.")
             else:
-                # Agregar filas de resumen
-                df = add_summary_row(df, db_type='mssql')
-                df_postgres = add_summary_row(df_postgres, db_type='postgres')
+                # Agregar filas de resumen y armar el gráfico (o reutilizarlos si nada cambió)
+                df, df_postgres, fig = armar_vista(version_mssql, version_postgres, datetime.now().date(),
+                                                df, df_postgres)
                 
                 # Mostrar datos detallados
                 st.subheader("Detalle por Pedido")
@@ -538,10 +399,12 @@ if st.button("Ejecutar Consulta"):
                 st.subheader("Info Plan")
                 st.dataframe(df_postgres)
                 
-                # Crear y mostrar el gráfico de Gantt
-                fig = create_gantt_chart(df, df_postgres)
+                # Mostrar el gráfico de Gantt
                 st.plotly_chart(fig)
         except Exception as e:
             st.error(f"Error al ejecutar la consulta: {e}")
     else:
         st.warning("Por favor ingresa un número de pedido.")
+
+# Después de la primera pintura, cargar en segundo plano los módulos diferidos
+precargar()
@@ -0,0 +1,130 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from almacen_local import ruta_local
+
+# Carpeta de la cache dentro de los datos locales (compartida por todos los procesos)
+CARPETA_CACHE = "cache_parquet"
+# Un mes puede guardarse cuando terminó hace al menos estos días (y, si se indica
+# `es_cerrado`, cuando además sus filas ya no van a cambiar)
+DIAS_CIERRE = 7
+# Límites de la cache: se borran primero los archivos sin uso más antiguos
+MAX_MB_CACHE = 500
+MAX_DIAS_CACHE = 90
+
+
+def huella(clave):
+    """Huella corta de la identidad de la consulta (texto SQL, filtros, versión)."""
+    return hashlib.blake2b(repr(clave).encode(), digest_size=10).hexdigest()
+
+
+def periodos_mensuales(desde, hasta):
+    """Meses que cubren [desde, hasta] como pares (inicio, inicio del mes siguiente)."""
+    inicios = pd.date_range(pd.Timestamp(desde).to_period("M").to_timestamp(),
+                            pd.Timestamp(hasta), freq="MS")
+    return [(inicio, inicio + pd.offsets.MonthBegin()) for inicio in inicios]
+
+
+def _escribir(df, ruta):
+    """Escribe el Parquet en un temporal de la misma carpeta y lo mueve de una vez, así otro
+    proceso nunca lee un archivo a medio escribir."""
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(ruta), suffix=".tmp", delete=False) as tmp:
+        temporal = tmp.name
+    try:
+        df.to_parquet(temporal, index=False)
+        os.replace(temporal, ruta)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+
+def _leer(ruta):
+    """Lee un Parquet de la cache y marca su uso; devuelve None si no existe o está dañado."""
+    if not os.path.exists(ruta):
+        return None
+    try:
+        df = pd.read_parquet(ruta)
+    except Exception:
+        os.remove(ruta)
+        return None
+    os.utime(ruta)
+    return df
+
+
+def leer_por_periodos(nombre, leer_periodo, desde, hasta, columna_fecha, clave=(), dias_cierre=DIAS_CIERRE,
+                      es_cerrado=None):
+    """Devuelve las filas con `columna_fecha` entre `desde` y `hasta` (inclusive), leyendo por meses.
+
+    `leer_periodo(inicio, fin)` consulta la base para el mes [inicio, fin). Los meses cerrados
+    se guardan en Parquet la primera vez y luego se leen del disco; el mes abierto (y los
+    futuros) se consultan siempre. Con `es_cerrado(df)` un mes terminado solo se guarda si
+    sus filas lo cumplen; si no, se sigue consultando. `clave` identifica la consulta: si
+    cambia, no se reutiliza nada de lo guardado.
+    """
+    carpeta = os.path.join(ruta_local(CARPETA_CACHE), nombre, huella(clave))
+    cierre = pd.Timestamp.today().normalize() - pd.Timedelta(days=dias_cierre)
+    partes = []
+    escribio = False
+    for inicio, fin in periodos_mensuales(desde, hasta):
+        ruta = os.path.join(carpeta, f"{inicio:%Y-%m}.parquet")
+        cerrado = fin <= cierre
+        df = _leer(ruta) if cerrado else None
+        if df is None:
+            df = leer_periodo(inicio.to_pydatetime(), fin.to_pydatetime())
+            if cerrado and (es_cerrado is None or es_cerrado(df)):
+                _escribir(df, ruta)
+                escribio = True
+        partes.append(df)
+    if escribio:
+        depurar()
+
+    df = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()
+    if df.empty:
+        return df
+    fechas = pd.to_datetime(df[columna_fecha])
+    dentro = (fechas >= pd.Timestamp(desde).normalize()) & (fechas < pd.Timestamp(hasta).normalize() + pd.Timedelta(days=1))
+    return df[dentro].reset_index(drop=True)
+
+
+def depurar(max_mb=MAX_MB_CACHE, max_dias=MAX_DIAS_CACHE):
+    """Borra los archivos sin uso en `max_dias` y, si la cache supera `max_mb`, los usados
+    hace más tiempo hasta quedar bajo el límite. Devuelve la cantidad de archivos borrados."""
+    raiz = ruta_local(CARPETA_CACHE)
+    archivos = []
+    for carpeta, _, nombres in os.walk(raiz):
+        for nombre in nombres:
+            ruta = os.path.join(carpeta, nombre)
+            try:
+                info = os.stat(ruta)
+            except FileNotFoundError:
+                continue
+            archivos.append((info.st_mtime, info.st_size, ruta))
+    archivos.sort()
+
+    limite_uso = time.time() - max_dias * 86400
+    total = sum(tamano for _, tamano, _ in archivos)
+    borrados = 0
+    for uso, tamano, ruta in archivos:
+        if uso >= limite_uso and total <= max_mb * 2**20:
+            break
+        try:
+            os.remove(ruta)
+        except FileNotFoundError:
+            pass
+        total -= tamano
+        borrados += 1
+    return borrados
+
+
+def vaciar(nombre=None):
+    """Borra toda la cache, o solo la de un reporte."""
+    ruta = ruta_local(CARPETA_CACHE)
+    if nombre:
+        ruta = os.path.join(ruta, nombre)
+    shutil.rmtree(ruta, ignore_errors=True)
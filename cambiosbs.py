@@ -1,9 +1,8 @@
 import streamlit as st
-import requests
 from datetime import datetime, timedelta
-import pandas as pd
-from bs4 import BeautifulSoup
-import plotly.express as px
+from conciliatc import consultar_sbs, guardar_tc_sbs
+from carga_diferida import diferido, precargar
+px = diferido("plotly.express")
 
 # Configuración de la página
 st.set_page_config(
@@ -28,66 +27,16 @@ def obtener_tipo_cambio(fecha, moneda):
     """
     Obtiene el tipo de cambio de la SBS para una fecha y moneda específica
     """
-    url = 'https://www.sbs.gob.pe/app/stats/TC-CV-Historico.asp'
-    
-    # Formatear la fecha correctamente
-    fecha_str = fecha.strftime('%d/%m/%Y')
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Content-Type': 'application/x-www-form-urlencoded',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
-    }
-    
-    # Parámetros del formulario
-    payload = {
-        'FECHA_INICIO': fecha_str,
-        'FECHA_FIN': fecha_str,
-        'MONEDA': moneda,
-        'button1': 'Consultar'
-    }
-    
     try:
-        # Realizar la solicitud POST
-        session = requests.Session()
-        response = session.post(url, data=payload, headers=headers)
-        
-        if response.status_code != 200:
-            st.error(f"Error en la solicitud: {response.status_code}")
-            return None
-            
-        # Parsear el HTML
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Buscar la tabla específica que contiene los tipos de cambio
-        tabla = soup.find('table', {'id': 'ctl00_cphContent_rgTipoCambio_ctl00'})
-        
-        if tabla:
-            # Encontrar todas las filas de datos
-            filas = tabla.find_all('tr')[1:]  # Ignorar la fila de encabezado
-            
-            if filas:
-                # Extraer los datos de la primera fila (la más reciente)
-                fila = filas[0]
-                celdas = fila.find_all('td')
-                
-                if len(celdas) >= 3:
-                    fecha = celdas[0].text.strip()
-                    compra = float(celdas[1].text.strip())
-                    venta = float(celdas[2].text.strip())
-                    
-                    # Crear DataFrame
-                    df = pd.DataFrame({
-                        'Fecha': [fecha],
-                        'Compra': [compra],
-                        'Venta': [venta]
-                    })
-                    return df
-        
+        # La misma consulta que usa la conciliación para completar el historial
+        df = consultar_sbs(fecha, fecha, moneda)
+        if not df.empty:
+            # Datos de la primera fila (la más reciente)
+            return df.head(1)
+
         st.warning("No se encontraron datos para la fecha seleccionada")
         return None
-            
+
     except Exception as e:
         st.error(f'Error en la consulta: {str(e)}')
         return None
@@ -120,6 +69,9 @@ if st.button("Consultar", type="primary"):
         df = obtener_tipo_cambio(fecha_consulta, codigo_moneda)
         
         if df is not None and not df.empty:
+            # Guardar en el historial local para la conciliación con el ERP
+            guardar_tc_sbs(df, codigo_moneda)
+            
             # Mostrar los datos en una tabla
             st.subheader("Resultado de la consulta")
             st.dataframe(df, use_container_width=True)
@@ -150,3 +102,6 @@ with st.expander("ℹ️ Información importante"):
     - Se recomienda consultar días anteriores para obtener datos históricos
     - Fuente: Superintendencia de Banca, Seguros y AFP (SBS)
     """)
+
+# Después de la primera pintura, cargar en segundo plano los módulos diferidos
+precargar()
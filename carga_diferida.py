@@ -0,0 +1,76 @@
+"""Importación diferida de módulos pesados (plotly, drivers de bases de datos, Selenium).
+
+    px = diferido("plotly.express")                            # en lugar de import plotly.express as px
+    By = diferido("selenium.webdriver.common.by", "By")        # en lugar de from ... import By
+
+El módulo se importa recién la primera vez que se usa uno de sus atributos, así la app pinta su
+primera pantalla sin esperar módulos que quizás no use. Al final del script, precargar() los
+importa en un hilo de fondo para que ya estén listos cuando el usuario pulse un botón.
+"""
+import importlib
+import sys
+import threading
+
+# Módulos declarados como diferidos que todavía no se importaron
+_pendientes = set()
+_candado = threading.Lock()
+
+
+class ModuloDiferido:
+    """Representa un módulo (o un atributo de un módulo) que se importa al primer uso."""
+
+    def __init__(self, nombre, atributo=None):
+        self._nombre = nombre
+        self._atributo = atributo
+        self._objeto = None
+
+    def _cargar(self):
+        if self._objeto is None:
+            modulo = importlib.import_module(self._nombre)
+            self._objeto = getattr(modulo, self._atributo) if self._atributo else modulo
+            with _candado:
+                _pendientes.discard(self._nombre)
+        return self._objeto
+
+    def __getattr__(self, atributo):
+        return getattr(self._cargar(), atributo)
+
+    def __call__(self, *args, **kwargs):
+        return self._cargar()(*args, **kwargs)
+
+    def __repr__(self):
+        nombre = f"{self._nombre}.{self._atributo}" if self._atributo else self._nombre
+        estado = "cargado" if self._objeto is not None else "sin cargar"
+        return f"<diferido {nombre} ({estado})>"
+
+
+def diferido(nombre, atributo=None):
+    """Devuelve el módulo `nombre` (o su `atributo`) sin importarlo todavía. Si ya está
+    importado en el proceso se devuelve directamente."""
+    if nombre in sys.modules:
+        modulo = sys.modules[nombre]
+        return getattr(modulo, atributo) if atributo else modulo
+    with _candado:
+        _pendientes.add(nombre)
+    return ModuloDiferido(nombre, atributo)
+
+
+def precargar(*nombres):
+    """Importa en un hilo de fondo los módulos indicados (por defecto, todos los diferidos
+    pendientes). Devuelve el hilo, o None si no hay nada que importar."""
+    with _candado:
+        nombres = [n for n in (nombres or sorted(_pendientes)) if n not in sys.modules]
+    if not nombres:
+        return None
+
+    def cargar():
+        for nombre in nombres:
+            try:
+                importlib.import_module(nombre)
+            except ImportError:
+                # El error se verá al usar el módulo, en el hilo de la app
+                pass
+
+    hilo = threading.Thread(target=cargar, name="precarga", daemon=True)
+    hilo.start()
+    return hilo
@@ -0,0 +1,202 @@
+import re
+from time import perf_counter
+
+import pandas as pd
+
+from medicion import leer_sql
+
+# Tabla de configuración (en SQL Server) con las listas de clientes y partidas excluidas.
+# Se crea y puebla una sola vez con: python config_partidas.py --crear
+# Mientras no exista, las consultas usan las listas fijas de abajo.
+TABLA_CONFIG = "cfgSeguimientoPartida"
+LISTA_CLIENTES = "CLIENTE"
+LISTA_EXCLUIDAS_SIN_APROB = "EXCLUIDA_SIN_APROB"
+LISTA_EXCLUIDAS_SIN_APROB_ESTAMP = "EXCLUIDA_SIN_APROB_ESTAMP"
+# Fecha de emisión mínima de las partidas a seguir
+FECHA_MINIMA = "2025-01-01"
+
+# Valores iniciales de las listas (pueblan la tabla de configuración y se usan si no existe)
+CLIENTES = (47, 49, 91, 93, 111, 1445, 2533, 2637, 4294, 4323, 4374, 4411, 4413, 4469, 5506, 6577)
+# Partidas (IdDocumento_OrdenProduccion) excluidas de las listas de teñidas sin aprobar
+EXCLUIDAS_SIN_APROB = (461444, 452744, 459212, 463325, 471285, 471287, 471290)
+EXCLUIDAS_SIN_APROB_ESTAMP = (461444, 452744, 459212, 463325, 458803, 471285, 471287)
+
+COLUMNAS_SIN_TENIDO = ['PARTIDA', 'DIAS', 'TELA', 'F_EMISION', 'KG', 'REF', 'COLOR', 'Cliente', 'FLAG']
+COLUMNAS_SIN_APROB = ['PARTIDA', 'DIAS', 'DIAS_TEN', 'TELA', 'F_EMISION', 'F_TENIDO', 'KG', 'REF', 'COLOR', 'Cliente', 'ESTADO']
+
+# Una sola consulta con todas las partidas que pueden caer en alguna de las tres listas:
+# con alguna receta sin terminar (no teñidas) o sin aprobación de tela (teñidas sin aprobar).
+# Es un texto fijo con parámetros, así SQL Server reutiliza el plan compilado. Las listas se
+# leen de la CTE cfg: la tabla de configuración o, si no existe, las listas fijas.
+_QUERY_PARTIDAS = """
+    WITH cfg AS ({config})
+    SELECT a.IdDocumento_OrdenProduccion AS ID,
+           a.CoddocOrdenProduccion AS PARTIDA,
+           DATEDIFF(DAY, a.dtFechaEmision, GETDATE()) AS DIAS,
+           DATEDIFF(DAY, MAX(j.dtFechaHoraFin), GETDATE()) AS DIAS_TEN,  -- Última fecha de teñido
+           DATEDIFF(DAY, MIN(j.dtFechaHoraFin), GETDATE()) AS DIAS_PRIMER_TEN,  -- Primera receta terminada
+           LEFT(f.NommaeItemInventario, 35) AS TELA,
+           a.dtFechaEmision AS FECHA_EMISION,
+           MAX(j.dtFechaHoraFin) AS FECHA_TENIDO,
+           a.dCantidad AS KG,
+           a.nvDocumentoReferencia AS REF,
+           g.NommaeColor AS COLOR,
+           LEFT(h.NommaeAnexoCliente, 15) AS Cliente,
+           a.ntEstado AS ESTADO,
+           CASE WHEN a.FechaCierreAprobado IS NULL THEN 0 ELSE 1 END AS APROB_TELA,
+           CASE WHEN LOWER(k.NommaeRuta) LIKE '%mofijado%' THEN 1 ELSE 0 END AS FLAG,
+           CASE WHEN LOWER(k.NommaeRuta) LIKE '%estamp%' THEN 1 ELSE 0 END AS ESTAMP,
+           SUM(CASE WHEN j.dtFechaHoraFin IS NULL THEN 1 ELSE 0 END) AS RECETAS_SIN_FIN,
+           MAX(CASE WHEN ex.Id IS NULL THEN 0 ELSE 1 END) AS EXCLUIDA_SIN_APROB,
+           MAX(CASE WHEN exe.Id IS NULL THEN 0 ELSE 1 END) AS EXCLUIDA_SIN_APROB_ESTAMP
+    FROM docOrdenProduccion a WITH (NOLOCK)
+    INNER JOIN cfg cli ON cli.Lista = ? AND cli.Id = a.IdmaeAnexo_Cliente
+    INNER JOIN maeItemInventario f WITH (NOLOCK) ON f.IdmaeItem_Inventario = a.IdmaeItem
+    INNER JOIN maeColor g WITH (NOLOCK) ON g.IdmaeColor = a.IdmaeColor
+    INNER JOIN maeAnexoCliente h WITH (NOLOCK) ON h.IdmaeAnexo_Cliente = a.IdmaeAnexo_Cliente
+    INNER JOIN docRecetaOrdenProduccion i ON a.IdDocumento_OrdenProduccion = i.IdDocumento_OrdenProduccion
+    INNER JOIN docReceta j ON i.IdDocumento_Receta = j.IdDocumento_Receta
+    INNER JOIN maeruta k ON a.IdmaeRuta = k.IdmaeRuta
+    LEFT JOIN cfg ex ON ex.Lista = ? AND ex.Id = a.IdDocumento_OrdenProduccion
+    LEFT JOIN cfg exe ON exe.Lista = ? AND exe.Id = a.IdDocumento_OrdenProduccion
+    WHERE a.IdtdDocumentoForm = 138
+    AND j.bAnulado = 0
+    AND (j.dtFechaHoraFin IS NULL OR a.FechaCierreAprobado IS NULL)
+    AND a.dtFechaEmision > ?
+    GROUP BY a.IdDocumento_OrdenProduccion,
+             a.CoddocOrdenProduccion,
+             a.dtFechaEmision,
+             f.NommaeItemInventario,
+             a.dCantidad,
+             a.nvDocumentoReferencia,
+             g.NommaeColor,
+             h.NommaeAnexoCliente,
+             a.ntEstado,
+             a.FechaCierreAprobado,
+             k.NommaeRuta
+"""
+_FILAS_FIJAS = ", ".join(
+    f"('{lista}', {id_})"
+    for lista, ids in ((LISTA_CLIENTES, CLIENTES),
+                       (LISTA_EXCLUIDAS_SIN_APROB, EXCLUIDAS_SIN_APROB),
+                       (LISTA_EXCLUIDAS_SIN_APROB_ESTAMP, EXCLUIDAS_SIN_APROB_ESTAMP))
+    for id_ in ids
+)
+QUERY_PARTIDAS = _QUERY_PARTIDAS.format(config=f"SELECT Lista, Id FROM {TABLA_CONFIG} WITH (NOLOCK)")
+QUERY_PARTIDAS_FIJA = _QUERY_PARTIDAS.format(config=f"SELECT * FROM (VALUES {_FILAS_FIJAS}) v (Lista, Id)")
+
+QUERY_PLAN_CACHE = """
+    SELECT cp.objtype AS TIPO, cp.usecounts AS USOS, cp.size_in_bytes / 1024 AS KB
+    FROM sys.dm_exec_cached_plans cp
+    CROSS APPLY sys.dm_exec_sql_text(cp.plan_handle) t
+    WHERE t.text LIKE '%WITH cfg AS%'
+      AND t.text NOT LIKE '%dm_exec_cached_plans%'
+"""
+
+
+def parametros_partidas():
+    """Parámetros de QUERY_PARTIDAS en orden de aparición."""
+    return (
+        LISTA_CLIENTES,
+        LISTA_EXCLUIDAS_SIN_APROB,
+        LISTA_EXCLUIDAS_SIN_APROB_ESTAMP,
+        pd.Timestamp(FECHA_MINIMA).to_pydatetime(),
+    )
+
+
+def tabla_config_existe(conn):
+    """True si la tabla de configuración ya fue creada (config_partidas.py --crear)."""
+    cur = conn.cursor()
+    try:
+        return cur.execute("SELECT OBJECT_ID(?)", TABLA_CONFIG).fetchone()[0] is not None
+    finally:
+        cur.close()
+
+
+def query_partidas(conn):
+    """QUERY_PARTIDAS, o la variante con las listas fijas si la tabla de configuración no existe."""
+    return QUERY_PARTIDAS if tabla_config_existe(conn) else QUERY_PARTIDAS_FIJA
+
+
+def leer_partidas(conn):
+    """Ejecuta la consulta única y prepara las columnas de presentación."""
+    df = leer_sql("clasificapartidas.leer_partidas", query_partidas(conn), conn, params=parametros_partidas())
+    df['KG'] = df['KG'].round(1)
+    df['F_EMISION'] = pd.to_datetime(df['FECHA_EMISION']).dt.strftime('%d-%m')
+    df['F_TENIDO'] = pd.to_datetime(df['FECHA_TENIDO']).dt.strftime('%d-%m')
+    return df
+
+
+def _sumar_tiempos(patron, mensajes):
+    """Suma los tiempos (CPU y transcurrido, en ms) de los mensajes de SET STATISTICS TIME."""
+    cpu = transcurrido = 0
+    for _, texto in mensajes:
+        for ms_cpu, ms_total in re.findall(patron, texto):
+            cpu += int(ms_cpu)
+            transcurrido += int(ms_total)
+    return cpu, transcurrido
+
+
+def reporte_tiempos(conn, repeticiones=3):
+    """Ejecuta la consulta varias veces con SET STATISTICS TIME y separa el tiempo de
+    compilación del de ejecución; desde la segunda vez la compilación debería ser ~0 ms."""
+    query = query_partidas(conn)
+    cur = conn.cursor()
+    cur.execute("SET STATISTICS TIME ON")
+    filas = []
+    for n in range(1, repeticiones + 1):
+        inicio = perf_counter()
+        cur.execute(query, parametros_partidas())
+        mensajes = list(cur.messages)
+        total = len(cur.fetchall())
+        while cur.nextset():
+            mensajes += cur.messages
+        cliente_ms = (perf_counter() - inicio) * 1000
+        compila = _sumar_tiempos(r"parse and compile time:\s*CPU time = (\d+) ms,\s*elapsed time = (\d+) ms", mensajes)
+        ejecuta = _sumar_tiempos(r"Execution Times:\s*CPU time = (\d+) ms,\s*elapsed time = (\d+) ms", mensajes)
+        filas.append({
+            'EJECUCION': n,
+            'COMPILA_CPU_MS': compila[0],
+            'COMPILA_MS': compila[1],
+            'EJECUTA_CPU_MS': ejecuta[0],
+            'EJECUTA_MS': ejecuta[1],
+            'CLIENTE_MS': round(cliente_ms),
+            'FILAS': total,
+        })
+    cur.execute("SET STATISTICS TIME OFF")
+    cur.close()
+    return pd.DataFrame(filas)
+
+
+def uso_plan_cache(conn):
+    """Usos del plan cacheado de la consulta (requiere permiso VIEW SERVER STATE)."""
+    return leer_sql("clasificapartidas.uso_plan_cache", QUERY_PLAN_CACHE, conn)
+
+
+def partidas_sin_tenido(df, dias):
+    """Partidas con alguna receta sin teñir y más de `dias` desde la emisión."""
+    mask = (df['RECETAS_SIN_FIN'] > 0) & (df['DIAS'] > dias)
+    return df.loc[mask, COLUMNAS_SIN_TENIDO].reset_index(drop=True)
+
+
+def _tenidas_sin_aprobar(df, dias, estamp, columna_excluida, columna_dias):
+    mask = (
+        df['FECHA_TENIDO'].notna()
+        & (df['APROB_TELA'] == 0)
+        & (df['ESTAMP'] == estamp)
+        & (df[columna_excluida] == 0)
+        & (df[columna_dias] > dias)
+    )
+    return df.loc[mask, COLUMNAS_SIN_APROB].reset_index(drop=True)
+
+
+def partidas_con_tenido_sin_aprob_tela(df, dias):
+    """Partidas cuyo último teñido fue hace más de `dias`, sin aprobación de tela y cuya ruta no
+    lleva estampado."""
+    return _tenidas_sin_aprobar(df, dias, 0, 'EXCLUIDA_SIN_APROB', 'DIAS_TEN')
+
+
+def partidas_con_tenido_sin_aprob_tela_estamp(df, dias):
+    """Partidas con alguna receta terminada hace más de `dias` (no solo la última, como en la
+    consulta original), sin aprobación de tela y cuya ruta lleva estampado."""
+    return _tenidas_sin_aprobar(df, dias, 1, 'EXCLUIDA_SIN_APROB_ESTAMP', 'DIAS_PRIMER_TEN')
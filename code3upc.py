@@ -1,9 +1,9 @@
 import streamlit as st
-import pandas as pd
 from PyPDF2 import PdfReader, PdfWriter
 import io
 from PIL import Image
 import fitz  # PyMuPDF
+from ingesta import leer_excel
 
 def extract_labels_from_pdf(pdf_file, code):
     """Extract pages containing the specified code from PDF"""
@@ -75,7 +75,7 @@ def main():
     
     if excel_file and pdf_file:
         # Read Excel file
-        df = pd.read_excel(excel_file)
+        df = leer_excel(excel_file, columnas=['Code'])
         
         if 'Code' not in df.columns:
             st.error("El archivo Excel debe contener una columna llamada 'Code'")
@@ -0,0 +1,28 @@
+import re
+
+import pandas as pd
+
+# Código gráfico de 6 dígitos después de "GRAPHIC:" en la observación
+PATRON_GRAFICO = re.compile(r'GRAPHIC:\s*(\d{6})')
+
+
+# Function to extract the graphic code (una observación a la vez)
+def extract_graphic_code(observation):
+    match = PATRON_GRAFICO.search(str(observation))
+    return match.group(1) if match else None
+
+
+def extraer_codigos(observaciones):
+    """Extrae los códigos gráficos de toda la columna de una vez.
+
+    Devuelve un DataFrame con 'Graphic Code' (el primer código de cada observación) y
+    'Graphic Codes' (todos los códigos separados por coma, para observaciones con varios).
+    """
+    texto = observaciones.astype('string')
+    primero = texto.str.extract(PATRON_GRAFICO, expand=False)
+    todos = (
+        texto.str.extractall(PATRON_GRAFICO)[0]
+        .groupby(level=0).agg(', '.join)
+        .reindex(observaciones.index)
+    )
+    return pd.DataFrame({'Graphic Code': primero, 'Graphic Codes': todos}, index=observaciones.index)
@@ -1,16 +1,14 @@
 import streamlit as st
 import pandas as pd
-import io
 import numpy as np
+from exportar import exportar
+from ingesta import leer_excel
 
 st.set_page_config(layout="wide")
 
 # Función para descargar el dataframe filtrado como archivo Excel
 def descargar_excel(df):
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False)
-    return output.getvalue()
+    return exportar(df, 'xlsx')
 
 # Título de la aplicación
 st.title("Aplicación para selección de columnas, Cuadro 47B")
@@ -26,7 +24,7 @@ archivo_excel = st.file_uploader("Sube tu archivo Excel", type=["xlsx"])
 # Si el archivo ha sido subido
 if archivo_excel:
     # Leer el archivo Excel
-    df = pd.read_excel(archivo_excel)
+    df = leer_excel(archivo_excel)
     
     # Mostrar las primeras filas del archivo
     st.write("Vista previa de los datos:")
@@ -0,0 +1,227 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import requests
+from bs4 import BeautifulSoup
+
+from almacen_local import conectar_local, fechas_a_texto, upsert
+from medicion import leer_sql
+
+# Fecha desde la que se concilian los tipos de cambio del ERP
+FECHA_INICIO_TC = "2024-10-01"
+# IdmaeMoneda del dólar en thTipoCambio y código de moneda equivalente en la SBS
+MONEDA_ERP_DOLAR = 2
+MONEDA_SBS_DOLAR = "02"
+# Diferencia máxima aceptada entre el tipo de cambio del ERP y el de la SBS
+TOLERANCIA_TC = 0.0005
+
+COLUMNAS_FECHA_ERP = ["dtFecha", "FechaCreacion", "F_MOD"]
+
+URL_SBS = "https://www.sbs.gob.pe/app/stats/TC-CV-Historico.asp"
+CABECERAS_SBS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Content-Type": "application/x-www-form-urlencoded",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "es-ES,es;q=0.9,en;q=0.8",
+}
+# Días que se piden a la SBS en cada consulta al completar el historial
+DIAS_POR_CONSULTA_SBS = 31
+
+
+def crear_tablas(conn):
+    """Crea las tablas locales del historial ERP y SBS si no existen."""
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS tc_erp (
+            "ID" INTEGER PRIMARY KEY,
+            "AÑO" INTEGER,
+            "P_CON" INTEGER,
+            "MON" INTEGER,
+            "dtFecha" TEXT,
+            "dCompra" REAL,
+            "dVenta" REAL,
+            "USU" INTEGER,
+            "FechaCreacion" TEXT,
+            "U_MO" INTEGER,
+            "F_MOD" TEXT
+        );
+        CREATE TABLE IF NOT EXISTS tc_sbs (
+            "MONEDA" TEXT,
+            "FECHA" TEXT,
+            "COMPRA" REAL,
+            "VENTA" REAL,
+            PRIMARY KEY ("MONEDA", "FECHA")
+        );
+        -- Fechas ya pedidas a la SBS (sin publicación los fines de semana y feriados)
+        CREATE TABLE IF NOT EXISTS tc_sbs_consultado (
+            "MONEDA" TEXT,
+            "FECHA" TEXT,
+            PRIMARY KEY ("MONEDA", "FECHA")
+        );
+    """)
+
+
+def marca_agua_erp(conn):
+    """Última fecha de creación o modificación ya copiada desde thTipoCambio."""
+    valor = conn.execute(
+        'SELECT MAX(MAX(COALESCE("F_MOD", "FechaCreacion"), "FechaCreacion")) FROM tc_erp'
+    ).fetchone()[0]
+    return pd.Timestamp(valor).to_pydatetime() if valor else pd.Timestamp(FECHA_INICIO_TC).to_pydatetime()
+
+
+def sincronizar_tc_erp(conn_erp):
+    """Copia al historial local solo las filas de thTipoCambio creadas o modificadas desde la marca de agua."""
+    conn = conectar_local()
+    try:
+        crear_tablas(conn)
+        marca = marca_agua_erp(conn)
+        query = """
+        SELECT [IdthTipoCambio] AS ID,
+               [IdmaeAño] AS AÑO,
+               [IdmaePeriodoContable] as P_CON,
+               [IdmaeMoneda] AS MON,
+               [dtFecha],
+               [dCompra],
+               [dVenta],
+               [IdSistemaUsuarioCreacion] AS USU,
+               [FechaCreacion],
+               [IdSistemaUsuarioModificacion] AS U_MO,
+               [FechaUltimaModificacion] AS F_MOD
+        FROM [GarmentData].[dbo].[thTipoCambio] WITH (NOLOCK)
+        WHERE FechaCreacion > ?
+          AND (FechaCreacion > ? OR FechaUltimaModificacion > ?)
+        """
+        inicio = pd.Timestamp(FECHA_INICIO_TC).to_pydatetime()
+        nuevos = leer_sql("conciliatc.sincronizar_tc_erp", query, conn_erp, params=(inicio, marca, marca))
+        return upsert(conn, "tc_erp", fechas_a_texto(nuevos, COLUMNAS_FECHA_ERP))
+    finally:
+        conn.close()
+
+
+def guardar_tc_sbs(df, moneda):
+    """Guarda en el historial local los tipos de cambio consultados en la SBS (columnas Fecha, Compra, Venta)."""
+    registros = pd.DataFrame({
+        "MONEDA": moneda,
+        "FECHA": pd.to_datetime(df["Fecha"], dayfirst=True).dt.strftime("%Y-%m-%d"),
+        "COMPRA": df["Compra"].astype(float),
+        "VENTA": df["Venta"].astype(float),
+    })
+    conn = conectar_local()
+    try:
+        crear_tablas(conn)
+        return upsert(conn, "tc_sbs", registros)
+    finally:
+        conn.close()
+
+
+def consultar_sbs(fecha_inicio, fecha_fin, moneda):
+    """Tipos de cambio publicados por la SBS entre dos fechas (columnas Fecha, Compra, Venta).
+    Lanza requests.HTTPError si la SBS responde con error."""
+    payload = {
+        "FECHA_INICIO": fecha_inicio.strftime("%d/%m/%Y"),
+        "FECHA_FIN": fecha_fin.strftime("%d/%m/%Y"),
+        "MONEDA": moneda,
+        "button1": "Consultar",
+    }
+    respuesta = requests.post(URL_SBS, data=payload, headers=CABECERAS_SBS, timeout=30)
+    respuesta.raise_for_status()
+    tabla = BeautifulSoup(respuesta.text, "html.parser").find("table", {"id": "ctl00_cphContent_rgTipoCambio_ctl00"})
+    filas = []
+    for fila in tabla.find_all("tr")[1:] if tabla else []:
+        celdas = [celda.text.strip() for celda in fila.find_all("td")]
+        if len(celdas) >= 3:
+            filas.append((celdas[0], float(celdas[1]), float(celdas[2])))
+    return pd.DataFrame(filas, columns=["Fecha", "Compra", "Venta"])
+
+
+def completar_tc_sbs(moneda_erp=MONEDA_ERP_DOLAR, moneda_sbs=MONEDA_SBS_DOLAR):
+    """Pide a la SBS las fechas del ERP que todavía no están en el historial SBS, en bloques de
+    DIAS_POR_CONSULTA_SBS días. Las fechas ya pedidas sin publicación no se vuelven a pedir
+    (salvo la de hoy, que la SBS publica por la tarde). Devuelve las filas SBS agregadas."""
+    hoy = date.today()
+    conn = conectar_local()
+    try:
+        crear_tablas(conn)
+        pendientes = pd.read_sql(
+            'SELECT DISTINCT substr("dtFecha", 1, 10) AS FECHA FROM tc_erp '
+            'WHERE "MON" = ? AND "dtFecha" >= ? AND "dtFecha" < ? '
+            'AND substr("dtFecha", 1, 10) NOT IN (SELECT "FECHA" FROM tc_sbs WHERE "MONEDA" = ?) '
+            'AND substr("dtFecha", 1, 10) NOT IN (SELECT "FECHA" FROM tc_sbs_consultado WHERE "MONEDA" = ?) '
+            'ORDER BY 1',
+            conn, params=(moneda_erp, FECHA_INICIO_TC, (hoy + timedelta(days=1)).isoformat(), moneda_sbs, moneda_sbs),
+        )
+    finally:
+        conn.close()
+
+    fechas = pd.to_datetime(pendientes["FECHA"]).dt.date.tolist()
+    agregadas = 0
+    while fechas:
+        inicio = fechas[0]
+        fin = min(inicio + timedelta(days=DIAS_POR_CONSULTA_SBS - 1), fechas[-1])
+        df = consultar_sbs(inicio, fin, moneda_sbs)
+        if not df.empty:
+            agregadas += guardar_tc_sbs(df, moneda_sbs)
+        consultadas = pd.DataFrame({
+            "MONEDA": moneda_sbs,
+            "FECHA": [f.isoformat() for f in fechas if f <= fin and f < hoy],
+        })
+        conn = conectar_local()
+        try:
+            upsert(conn, "tc_sbs_consultado", consultadas)
+        finally:
+            conn.close()
+        fechas = [f for f in fechas if f > fin]
+    return agregadas
+
+
+def leer_tc_erp():
+    """Devuelve el historial local de thTipoCambio con las mismas columnas de la consulta original."""
+    conn = conectar_local()
+    try:
+        crear_tablas(conn)
+        df = pd.read_sql('SELECT * FROM tc_erp ORDER BY "ID"', conn)
+    finally:
+        conn.close()
+    for col in COLUMNAS_FECHA_ERP:
+        df[col] = pd.to_datetime(df[col])
+    return df
+
+
+def conciliar_tc(moneda_erp=MONEDA_ERP_DOLAR, moneda_sbs=MONEDA_SBS_DOLAR, tolerancia=TOLERANCIA_TC):
+    """Cruza por fecha el historial del ERP con el de la SBS y marca cada día como
+    OK, DIFERENCIA, SIN_SBS (solo en el ERP), SIN_PUBLICACION (solo en el ERP, pero ya se pidió
+    a la SBS y no publicó: fin de semana o feriado) o SIN_ERP (solo en la SBS)."""
+    conn = conectar_local()
+    try:
+        crear_tablas(conn)
+        erp = pd.read_sql(
+            'SELECT "dtFecha", "dCompra", "dVenta" FROM tc_erp WHERE "MON" = ? AND "dtFecha" >= ? '
+            'ORDER BY COALESCE("F_MOD", "FechaCreacion")',
+            conn, params=(moneda_erp, FECHA_INICIO_TC),
+        )
+        sbs = pd.read_sql(
+            'SELECT "FECHA", "COMPRA", "VENTA" FROM tc_sbs WHERE "MONEDA" = ? AND "FECHA" >= ?',
+            conn, params=(moneda_sbs, FECHA_INICIO_TC),
+        )
+        consultadas = pd.read_sql(
+            'SELECT "FECHA" FROM tc_sbs_consultado WHERE "MONEDA" = ?', conn, params=(moneda_sbs,),
+        )
+    finally:
+        conn.close()
+
+    erp["FECHA"] = pd.to_datetime(erp.pop("dtFecha")).dt.normalize()
+    erp = erp.drop_duplicates("FECHA", keep="last")
+    sbs["FECHA"] = pd.to_datetime(sbs["FECHA"])
+
+    df = erp.merge(sbs, on="FECHA", how="outer", indicator=True).sort_values("FECHA")
+    df["DIF_COMPRA"] = (df["dCompra"] - df["COMPRA"]).round(4)
+    df["DIF_VENTA"] = (df["dVenta"] - df["VENTA"]).round(4)
+    diferencia = (df["DIF_COMPRA"].abs() > tolerancia) | (df["DIF_VENTA"].abs() > tolerancia)
+    sin_publicacion = df["FECHA"].isin(pd.to_datetime(consultadas["FECHA"]))
+    df["ESTADO"] = np.select(
+        [(df["_merge"] == "left_only") & sin_publicacion, df["_merge"] == "left_only",
+         df["_merge"] == "right_only", diferencia],
+        ["SIN_PUBLICACION", "SIN_SBS", "SIN_ERP", "DIFERENCIA"],
+        default="OK",
+    )
+    return df.drop(columns="_merge").reset_index(drop=True)
@@ -0,0 +1,32 @@
+"""Conexiones DB-API tomadas del pool del proceso.
+
+Los engines de lectura_arrow (uno por servidor de Streamlit, con st.cache_resource) mantienen
+un pool de conexiones; estas funciones entregan una conexión del pool con la misma interfaz de
+pyodbc o psycopg2 (cursor, commit, close). close() la devuelve al pool en lugar de cerrarla,
+así las páginas no pagan el login en cada consulta.
+
+lectura_arrow (y con él pyarrow y sqlalchemy) se importa recién al pedir la primera conexión,
+así las páginas pintan sin esperar esos módulos.
+"""
+
+
+def conectar_sqlserver(timeout=None, seccion="sqlserver"):
+    """Conexión pyodbc a SQL Server con las credenciales de la sección [sqlserver] de los
+    secrets. Con `timeout` (segundos) el servidor cancela las consultas que tarden más."""
+    from lectura_arrow import motor_sqlserver
+    conn = motor_sqlserver(seccion).raw_connection()
+    # Se fija siempre: la conexión pudo volver al pool con el timeout de otra página
+    conn.driver_connection.timeout = int(timeout or 0)
+    return conn
+
+
+def conectar_postgres(timeout=None, seccion="postgres"):
+    """Conexión psycopg2 a PostgreSQL con las credenciales de la sección [postgres] de los
+    secrets. Con `timeout` (segundos) el servidor cancela las consultas que tarden más; el SET
+    se deshace con el rollback al volver al pool."""
+    from lectura_arrow import motor_postgres
+    conn = motor_postgres(seccion).raw_connection()
+    if timeout:
+        with conn.cursor() as cur:
+            cur.execute(f"SET statement_timeout = {int(timeout * 1000)}")
+    return conn
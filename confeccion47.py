@@ -1,77 +1,49 @@
 import streamlit as st
 import pandas as pd
-import pyodbc
-from datetime import datetime
+from libroconfeccion import sincronizar_notas, reconstruir_libro, totales_por_op
+from conexiones import conectar_sqlserver
+from carga_diferida import precargar
 
 st.set_page_config(page_title="Confeccion 47")
 
 
 # Configuración de la conexión a la base de datos
 def get_connection():
-    conn = pyodbc.connect(
-        "driver={odbc driver 17 for sql server};"
-        "server=" + st.secrets["server"] + ";"
-        "database=" + st.secrets["database"] + ";"
-        "uid=" + st.secrets["username"] + ";"
-        "pwd=" + st.secrets["password"] + ";"
-    )
+    conn = conectar_sqlserver()
     return conn        
 
-# Consultas SQL
-query_enviado = """
-select c.CoddocOrdenProduccion AS OP, min(A.dtFechaRegistro) as FECHA,
-    min(d.NommaeAnexoProveedor) AS PROVEEDOR, sum(b.dCantidadSal) AS UNIDADES
-from docNotaInventario a 
-inner join docNotaInventarioItem b on a.IdDocumento_NotaInventario = b.IdDocumento_NotaInventario
-inner join docOrdenProduccion c on a.IdDocumento_OrdenProduccion = c.IdDocumento_OrdenProduccion
-inner join maeAnexoProveedor d on a.IdmaeAnexo = d.IdmaeAnexo_Proveedor
-where a.IdmaeAnexo IN (248,5526, 321, 5512,60,64, 6640)
-    and a.dtFechaRegistro > '01-10-2024'
-    and a.IdtdDocumentoForm = 130
-    and a.bAnulado= 0
-    and c.IdmaeAnexo_Cliente = 2533
-    and b.dCantidadSal > 0
-    and a.IdmaeSunatCTipoComprobantePago = 10
-    and a.IdmaeTransaccionNota = 17
-GROUP BY c.CoddocOrdenProduccion
-"""
-
-query_retornado = """
-select c.CoddocOrdenProduccion AS OP, MIN(A.dtFechaRegistro) as FECHA,
-    MIN(d.NommaeAnexoProveedor) AS PROVEEDOR, SUM(b.dCantidadIng) AS TOTAL_UNIDADES
-from docNotaInventario a 
-inner join docNotaInventarioItem b on a.IdDocumento_NotaInventario = b.IdDocumento_NotaInventario
-inner join docOrdenProduccion c on a.IdDocumento_OrdenProduccion = c.IdDocumento_OrdenProduccion
-inner join maeAnexoProveedor d on a.IdmaeAnexo = d.IdmaeAnexo_Proveedor
-where a.IdmaeAnexo IN (248,5526)
-    and a.dtFechaRegistro > '01-10-2024'
-    and a.IdtdDocumentoForm = 131
-    and a.bAnulado= 0
-    and a.IdmaeSunatCTipoComprobantePago = 10
-    and c.IdmaeAnexo_Cliente = 2533
-GROUP BY c.CoddocOrdenProduccion
-"""
-
-# Función para ejecutar consultas y obtener DataFrames
-def get_dataframe(query):
+# Función para actualizar el libro local de notas y leer los totales por OP (cacheado)
+@st.cache_data(ttl=300)
+def load_data():
     conn = get_connection()
-    df = pd.read_sql(query, conn)
-    conn.close()
-    return df
-
-# Función para formatear fechas
-def format_date(date):
-    if pd.isnull(date):
-        return ''
-    return datetime.strptime(str(date), '%Y-%m-%d %H:%M:%S').strftime('%d-%b').upper()
+    try:
+        nuevos = sincronizar_notas(conn)
+    finally:
+        conn.close()
+    return totales_por_op('ENVIADO'), totales_por_op('RETORNADO'), nuevos
+
+# Función para formatear fechas (vectorizada; vacío si no hay fecha)
+def format_dates(fechas):
+    return fechas.dt.strftime('%d-%b').str.upper().fillna('')
+
+if st.sidebar.button("Actualizar"):
+    load_data.clear()
+if st.sidebar.button("Reconstruir libro completo"):
+    conn = get_connection()
+    try:
+        reconstruir_libro(conn)
+    finally:
+        conn.close()
+    load_data.clear()
 
 # Obtener DataFrames
-df_enviado = get_dataframe(query_enviado)
-df_retornado = get_dataframe(query_retornado)
+df_enviado, df_retornado, nuevos = load_data()
+df_retornado = df_retornado.rename(columns={'UNIDADES': 'TOTAL_UNIDADES'})
+st.sidebar.caption(f"Filas de notas leídas en la última sincronización: {nuevos}")
 
 # Formatear fechas
-df_enviado['FECHA'] = df_enviado['FECHA'].apply(format_date)
-df_retornado['FECHA'] = df_retornado['FECHA'].apply(format_date)
+df_enviado['FECHA'] = format_dates(df_enviado['FECHA'])
+df_retornado['FECHA'] = format_dates(df_retornado['FECHA'])
 
 # Crear tabla resumen por proveedor
 df_resumen = df_enviado.groupby('PROVEEDOR')['UNIDADES'].sum().reset_index()
@@ -127,3 +99,6 @@ st.download_button(
     file_name="detalle_op.csv",
     mime="text/csv",
 )
+
+# Después de la primera pintura, cargar en segundo plano los módulos diferidos
+precargar()
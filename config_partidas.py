@@ -0,0 +1,90 @@
+"""Alta de la tabla de configuración del seguimiento de partidas (cfgSeguimientoPartida).
+
+Se ejecuta una sola vez por un administrador, con un usuario que pueda crear tablas en la base
+del ERP. Crea la tabla y la puebla con las listas fijas de clasificapartidas.py (clientes
+seguidos y partidas excluidas). Las apps nunca crean ni modifican la tabla: si no existe,
+usan esas mismas listas fijas.
+
+Uso: python config_partidas.py --crear     (crea y puebla la tabla si no existe)
+     python config_partidas.py --listar    (muestra el contenido actual)
+
+Después de creada, las listas se mantienen con INSERT / DELETE sobre la tabla, sin desplegar
+de nuevo las apps.
+"""
+import argparse
+
+import pyodbc
+import streamlit as st
+
+from clasificapartidas import (
+    CLIENTES,
+    EXCLUIDAS_SIN_APROB,
+    EXCLUIDAS_SIN_APROB_ESTAMP,
+    LISTA_CLIENTES,
+    LISTA_EXCLUIDAS_SIN_APROB,
+    LISTA_EXCLUIDAS_SIN_APROB_ESTAMP,
+    TABLA_CONFIG,
+    tabla_config_existe,
+)
+from medicion import leer_sql
+
+
+def connect_to_db():
+    conn = pyodbc.connect(
+        "driver={odbc driver 17 for sql server};"
+        "server=" + st.secrets["sqlserver"]["server"] + ";"
+        "database=" + st.secrets["sqlserver"]["database"] + ";"
+        "uid=" + st.secrets["sqlserver"]["username"] + ";"
+        "pwd=" + st.secrets["sqlserver"]["password"] + ";"
+    )
+    return conn
+
+
+def crear_tabla_config(conn):
+    """Crea la tabla de configuración y la puebla con las listas iniciales si está vacía.
+    Devuelve la cantidad de filas insertadas."""
+    cur = conn.cursor()
+    cur.execute(f"""
+        IF OBJECT_ID('{TABLA_CONFIG}') IS NULL
+        CREATE TABLE {TABLA_CONFIG} (
+            Lista VARCHAR(40) NOT NULL,
+            Id INT NOT NULL,
+            PRIMARY KEY (Lista, Id)
+        )
+    """)
+    filas = []
+    if cur.execute(f"SELECT COUNT(*) FROM {TABLA_CONFIG}").fetchone()[0] == 0:
+        filas = (
+            [(LISTA_CLIENTES, c) for c in CLIENTES]
+            + [(LISTA_EXCLUIDAS_SIN_APROB, op) for op in EXCLUIDAS_SIN_APROB]
+            + [(LISTA_EXCLUIDAS_SIN_APROB_ESTAMP, op) for op in EXCLUIDAS_SIN_APROB_ESTAMP]
+        )
+        cur.executemany(f"INSERT INTO {TABLA_CONFIG} (Lista, Id) VALUES (?, ?)", filas)
+    conn.commit()
+    cur.close()
+    return len(filas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Alta de la tabla {TABLA_CONFIG}")
+    accion = parser.add_mutually_exclusive_group(required=True)
+    accion.add_argument('--crear', action='store_true', help="crear y poblar la tabla si no existe")
+    accion.add_argument('--listar', action='store_true', help="mostrar el contenido de la tabla")
+    args = parser.parse_args()
+
+    conn = connect_to_db()
+    try:
+        if args.crear:
+            insertadas = crear_tabla_config(conn)
+            print(f"{TABLA_CONFIG} lista; filas insertadas: {insertadas}")
+        elif not tabla_config_existe(conn):
+            print(f"{TABLA_CONFIG} no existe; las apps usan las listas fijas de clasificapartidas.py")
+        else:
+            query = f"SELECT Lista, Id FROM {TABLA_CONFIG} ORDER BY Lista, Id"
+            print(leer_sql("config_partidas.listar", query, conn).to_string(index=False))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
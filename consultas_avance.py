@@ -0,0 +1,352 @@
+"""Consultas del avance de pedidos (SQL Server) y de su plan (PostgreSQL).
+
+Las usan pruebacod.py, borrador.py (versiones) y el trabajo de alertas alertasavance.py.
+"""
+
+# Avance real por pedido: % de KG (armado, teñido, tela aprobada) y de unidades (corte,
+# costura), con las fechas reales mínima y máxima de cada proceso.
+# Parámetros: fecha de entrega desde, fecha de entrega hasta (excluida), patrón LIKE del cliente.
+QUERY_AVANCE = """
+        SELECT gg.PEDIDO, gg.F_EMISION, gg.F_ENTREGA, gg.DIAS, gg.CLIENTE, gg.PO, gg.KG_REQ, 
+               gg.KG_ARMP, gg.KG_TENIDP, gg.KG_TELAPROBP, gg.UNID, gg.PROGP, gg.CORTADOP, gg.COSIDOP, 
+               ff.FMINARM, ff.FMAXARM, ff.FMINTENID, ff.FMAXTENID, ff.FMINTELAPROB, ff.FMAXTELAPROB, ff.FMINCORTE, ff.FMAXCORTE, ff.FMINCOSIDO, ff.FMAXCOSIDO
+        FROM 
+            (SELECT
+                a.CoddocOrdenVenta AS PEDIDO, 
+                a.IdDocumento_OrdenVenta,
+                CASE WHEN ISDATE(a.dtFechaEmision) = 1 THEN CONVERT(DATE, a.dtFechaEmision) ELSE NULL END AS F_EMISION,
+                CASE WHEN ISDATE(a.dtFechaEntrega) = 1 THEN CONVERT(DATE, a.dtFechaEntrega) ELSE NULL END AS F_ENTREGA,
+                DATEDIFF(day, a.dtFechaEmision, a.dtFechaEntrega) AS DIAS,
+                SUBSTRING(b.NommaeAnexoCliente, 1, 15) AS CLIENTE,
+                a.nvDocumentoReferencia AS PO,
+                CONVERT(INT, COALESCE(d.KG, 0)) AS KG_REQ,
+                FORMAT(CASE WHEN d.KG = 0 THEN 0 ELSE (COALESCE(t.KG_ARM, 0) / d.KG) END, '0%') AS KG_ARMP,
+                FORMAT(CASE WHEN d.KG = 0 THEN 0 ELSE (COALESCE(t.KG_TEÑIDOS, 0) / d.KG) END, '0%') AS KG_TENIDP,
+                FORMAT(CASE WHEN d.KG = 0 THEN 0 ELSE (COALESCE(t.KG_PRODUC, 0) / d.KG) END, '0%') AS KG_TELAPROBP,
+                CONVERT(INT, a.dCantidad) AS UNID,
+                FORMAT(CASE WHEN a.dCantidad = 0 THEN 0 ELSE (COALESCE(programado.PROG, 0) / a.dCantidad) END, '0%') AS PROGP,
+                FORMAT(CASE WHEN a.dCantidad = 0 THEN 0 ELSE (COALESCE(cortado.CORTADO, 0) / a.dCantidad) END, '0%') AS CORTADOP,
+                FORMAT(CASE WHEN a.dCantidad = 0 THEN 0 ELSE (COALESCE(cosido.COSIDO, 0) / a.dCantidad) END, '0%') AS COSIDOP
+            FROM docOrdenVenta a
+            INNER JOIN maeAnexoCliente b ON a.IdmaeAnexo_Cliente = b.IdmaeAnexo_Cliente
+            LEFT JOIN (
+                SELECT
+                    c.IdDocumento_Referencia AS PEDIDO,
+                    SUM(c.dCantidad) AS KG
+                FROM docOrdenVentaItem c
+                WHERE c.IdDocumento_Referencia > 0
+                GROUP BY c.IdDocumento_Referencia
+            ) d ON a.IdDocumento_OrdenVenta = d.PEDIDO
+            LEFT JOIN (
+                SELECT
+                    x.IdDocumento_Referencia AS PEDIDO,
+                    SUM(y.dCantidadProgramado) AS KG_ARM,
+                    SUM(z.bcerrado * y.dCantidadRequerido) AS KG_PRODUC,
+                    SUM(s.bcerrado * y.dCantidadProgramado) AS KG_TEÑIDOS
+                FROM docOrdenProduccionItem y
+                INNER JOIN docOrdenProduccion z ON y.IdDocumento_OrdenProduccion = z.IdDocumento_OrdenProduccion
+                INNER JOIN docOrdenVentaItem x ON (z.IdDocumento_Referencia = x.IdDocumento_OrdenVenta AND y.idmaeItem = x.IdmaeItem)
+                INNER JOIN docOrdenProduccionRuta s ON y.IdDocumento_OrdenProduccion = s.IdDocumento_OrdenProduccion
+                WHERE s.IdmaeReceta > 0
+                GROUP BY x.IdDocumento_Referencia
+            ) t ON a.IdDocumento_OrdenVenta = t.PEDIDO
+            LEFT JOIN (
+                SELECT 
+                    g.IdDocumento_OrdenVenta,
+                    SUM(a.dCantidadProgramado) AS PROG
+                FROM dbo.docOrdenProduccion c WITH (NOLOCK)
+                INNER JOIN dbo.docOrdenProduccionItem a WITH (NOLOCK)
+                    ON c.IdDocumento_OrdenProduccion = a.IdDocumento_OrdenProduccion
+                INNER JOIN dbo.docOrdenVenta g WITH (NOLOCK)
+                    ON c.IdDocumento_Referencia = g.IdDocumento_OrdenVenta
+                INNER JOIN dbo.docOrdenProduccionRuta b WITH (NOLOCK)
+                    ON c.IdDocumento_OrdenProduccion = b.IdDocumento_OrdenProduccion
+                WHERE c.bAnulado = 0
+                    AND c.IdtdDocumentoForm = 127
+                    AND b.IdmaeCentroCosto = 29
+                GROUP BY g.IdDocumento_OrdenVenta
+            ) AS programado
+            ON a.IdDocumento_OrdenVenta = programado.IdDocumento_OrdenVenta
+            LEFT JOIN (
+                SELECT 
+                    g.IdDocumento_OrdenVenta,
+                    SUM(b.dCantidadIng) AS CORTADO
+                FROM dbo.docNotaInventario a WITH (NOLOCK)
+                INNER JOIN dbo.maeCentroCosto a1 WITH (NOLOCK)
+                    ON a.IdmaeCentroCosto = a1.IdmaeCentroCosto
+                    AND a1.bConOrdenProduccion = 1
+                INNER JOIN dbo.docNotaInventarioItem b WITH (NOLOCK)
+                    ON a.IdDocumento_NotaInventario = b.IdDocumento_NotaInventario
+                INNER JOIN dbo.docOrdenProduccion c WITH (NOLOCK)
+                    ON a.IdDocumento_OrdenProduccion = c.IdDocumento_OrdenProduccion
+                INNER JOIN dbo.docOrdenVenta g WITH (NOLOCK)
+                    ON c.IdDocumento_Referencia = g.IdDocumento_OrdenVenta
+                WHERE a.IdtdDocumentoForm = 131
+                    AND a.bDevolucion = 0
+                    AND a.bDesactivado = 0
+                    AND a.bAnulado = 0
+                    AND a.IdmaeCentroCosto = 29
+                GROUP BY g.IdDocumento_OrdenVenta
+            ) AS cortado
+            ON a.IdDocumento_OrdenVenta = cortado.IdDocumento_OrdenVenta
+            LEFT JOIN (
+                SELECT 
+                    g.IdDocumento_OrdenVenta,
+                    SUM(b.dCantidadIng) AS COSIDO
+                FROM dbo.docNotaInventario a WITH (NOLOCK)
+                INNER JOIN dbo.maeCentroCosto a1 WITH (NOLOCK)
+                    ON a.IdmaeCentroCosto = a1.IdmaeCentroCosto
+                    AND a1.bConOrdenProduccion = 1
+                INNER JOIN dbo.docNotaInventarioItem b WITH (NOLOCK)
+                    ON a.IdDocumento_NotaInventario = b.IdDocumento_NotaInventario
+                INNER JOIN dbo.docOrdenProduccion c WITH (NOLOCK)
+                    ON a.IdDocumento_OrdenProduccion = c.IdDocumento_OrdenProduccion
+                INNER JOIN dbo.docOrdenVenta g WITH (NOLOCK)
+                    ON c.IdDocumento_Referencia = g.IdDocumento_OrdenVenta
+                WHERE a.IdtdDocumentoForm = 131
+                    AND a.bDevolucion = 0
+                    AND a.bDesactivado = 0
+                    AND a.bAnulado = 0
+                    AND a.IdmaeCentroCosto = 47
+                GROUP BY g.IdDocumento_OrdenVenta
+            ) AS cosido
+            ON a.IdDocumento_OrdenVenta = cosido.IdDocumento_OrdenVenta
+            WHERE
+                a.IdtdDocumentoForm = 10
+                AND a.IdtdTipoVenta = 4
+                AND a.bAnulado = 0
+                AND a.dtFechaEntrega >= ?
+                AND a.dtFechaEntrega < ?
+                AND b.NommaeAnexoCliente LIKE ?
+            ) gg
+        INNER JOIN 
+            (SELECT 
+                x.IdDocumento_OrdenVenta,
+                q0.FMINARM,
+                q0.FMAXARM,
+                q1.FMINTENID,
+                q1.FMAXTENID,
+                q2.FMINTELAPROB,
+                q2.FMAXTELAPROB,
+                q3.FMINCORTE,
+                q3.FMAXCORTE,
+                q4.FMINCOSIDO,
+                q4.FMAXCOSIDO
+            FROM docOrdenVenta x
+            LEFT JOIN (
+                SELECT 
+                    x.IdDocumento_OrdenVenta, 
+                    MIN(b.dtFechaEmision) AS FMINARM,
+                    MAX(b.dtFechaEmision) AS FMAXARM
+                FROM docOrdenVentaItem a
+                INNER JOIN docOrdenProduccion b ON b.IdDocumento_Referencia = a.IdDocumento_OrdenVenta
+                INNER JOIN docOrdenVenta x ON a.IdDocumento_Referencia = x.IdDocumento_OrdenVenta
+                WHERE b.IdtdDocumentoForm = 138 
+                    AND b.IdtdDocumentoForm_Referencia = 152 
+                    AND x.CoddocOrdenVenta IS NOT NULL
+                    AND a.IdDocumento_Referencia > 0
+                GROUP BY x.IdDocumento_OrdenVenta
+            ) q0 ON x.IdDocumento_OrdenVenta = q0.IdDocumento_OrdenVenta
+            LEFT JOIN (
+                SELECT 
+                    x.IdDocumento_OrdenVenta, 
+                    MIN(e.dtFechaHoraFin) AS FMINTENID,
+                    MAX(e.dtFechaHoraFin) AS FMAXTENID
+                FROM docOrdenVentaItem a
+                INNER JOIN docOrdenProduccion b ON b.IdDocumento_Referencia = a.IdDocumento_OrdenVenta
+                INNER JOIN docOrdenVenta x ON a.IdDocumento_Referencia = x.IdDocumento_OrdenVenta
+                INNER JOIN docRecetaOrdenProduccion d ON b.IdDocumento_OrdenProduccion = d.IdDocumento_OrdenProduccion
+                INNER JOIN docReceta e ON d.IdDocumento_Receta = e.IdDocumento_Receta
+                WHERE b.IdtdDocumentoForm = 138 
+                    AND b.IdtdDocumentoForm_Referencia = 152 
+                    AND x.CoddocOrdenVenta IS NOT NULL
+                    AND a.IdDocumento_Referencia > 0
+                GROUP BY x.IdDocumento_OrdenVenta
+            ) q1 ON x.IdDocumento_OrdenVenta = q1.IdDocumento_OrdenVenta
+            LEFT JOIN (
+                SELECT 
+                    x.IdDocumento_OrdenVenta,  
+                    MIN(b.FechaCierreAprobado) AS FMINTELAPROB,
+                    MAX(b.FechaCierreAprobado) AS FMAXTELAPROB
+                FROM docOrdenVentaItem a
+                INNER JOIN docOrdenProduccion b ON b.IdDocumento_Referencia = a.IdDocumento_OrdenVenta
+                INNER JOIN docOrdenVenta x ON a.IdDocumento_Referencia = x.IdDocumento_OrdenVenta
+                INNER JOIN docOrdenProduccionRuta d ON b.IdDocumento_OrdenProduccion = d.IdDocumento_OrdenProduccion
+                WHERE b.IdtdDocumentoForm = 138 
+                    AND b.IdtdDocumentoForm_Referencia = 152 
+                    AND x.CoddocOrdenVenta IS NOT NULL
+                    AND a.IdDocumento_Referencia > 0
+                GROUP BY x.IdDocumento_OrdenVenta
+            ) q2 ON x.IdDocumento_OrdenVenta = q2.IdDocumento_OrdenVenta
+            LEFT JOIN (
+                SELECT 
+                    g.IdDocumento_OrdenVenta,  
+                    MIN(a.dtFechaRegistro) AS FMINCORTE,
+                    MAX(a.dtFechaRegistro) AS FMAXCORTE
+                FROM dbo.docNotaInventario a WITH (NOLOCK)
+                INNER JOIN dbo.maeCentroCosto a1 WITH (NOLOCK) ON a.IdmaeCentroCosto = a1.IdmaeCentroCosto AND a1.bConOrdenProduccion = 1
+                INNER JOIN dbo.docNotaInventarioItem b WITH (NOLOCK) ON a.IdDocumento_NotaInventario = b.IdDocumento_NotaInventario AND b.dCantidadIng <> 0
+                INNER JOIN dbo.docOrdenProduccion c WITH (NOLOCK) ON a.IdDocumento_OrdenProduccion = c.IdDocumento_OrdenProduccion 
+                AND c.bAnulado = 0 AND c.IdtdDocumentoForm = 127
+                INNER JOIN dbo.docOrdenVenta g WITH (NOLOCK) ON c.IdDocumento_Referencia = g.IdDocumento_OrdenVenta
+                INNER JOIN dbo.docOrdenProduccionRuta d WITH (NOLOCK) ON a.IddocOrdenProduccionRuta = d.IddocOrdenProduccionRuta
+                INNER JOIN dbo.docOrdenProduccionItem e WITH (NOLOCK) ON c.IdDocumento_OrdenProduccion = e.IdDocumento_OrdenProduccion AND b.IdmaeItem_Inventario = e.IdmaeItem
+                INNER JOIN dbo.maeItemInventario f WITH (NOLOCK) ON b.IdmaeItem_Inventario = f.IdmaeItem_Inventario AND f.IdtdItemForm = 10
+                WHERE a.IdtdDocumentoForm = 131
+                    AND a.bDevolucion = 0
+                    AND a.bDesactivado = 0
+                    AND a.bAnulado = 0
+                    AND a.IdDocumento_OrdenProduccion <> 0
+                    AND a.IdmaeCentroCosto = 29
+                GROUP BY g.IdDocumento_OrdenVenta
+            ) q3 ON x.IdDocumento_OrdenVenta = q3.IdDocumento_OrdenVenta
+            LEFT JOIN (
+                SELECT 
+                    g.IdDocumento_OrdenVenta,  
+                    MIN(a.dtFechaRegistro) AS FMINCOSIDO,
+                    MAX(a.dtFechaRegistro) AS FMAXCOSIDO
+                FROM dbo.docNotaInventario a WITH (NOLOCK)
+                INNER JOIN dbo.maeCentroCosto a1 WITH (NOLOCK) ON a.IdmaeCentroCosto = a1.IdmaeCentroCosto AND a1.bConOrdenProduccion = 1
+                INNER JOIN dbo.docNotaInventarioItem b WITH (NOLOCK) ON a.IdDocumento_NotaInventario = b.IdDocumento_NotaInventario AND b.dCantidadIng <> 0
+                INNER JOIN dbo.docOrdenProduccion c WITH (NOLOCK) ON a.IdDocumento_OrdenProduccion = c.IdDocumento_OrdenProduccion 
+                AND c.bAnulado = 0 AND c.IdtdDocumentoForm = 127
+                INNER JOIN dbo.docOrdenVenta g WITH (NOLOCK) ON c.IdDocumento_Referencia = g.IdDocumento_OrdenVenta
+                INNER JOIN dbo.docOrdenProduccionRuta d WITH (NOLOCK) ON a.IddocOrdenProduccionRuta = d.IddocOrdenProduccionRuta
+                INNER JOIN dbo.docOrdenProduccionItem e WITH (NOLOCK) ON c.IdDocumento_OrdenProduccion = e.IdDocumento_OrdenProduccion AND b.IdmaeItem_Inventario = e.IdmaeItem
+                INNER JOIN dbo.maeItemInventario f WITH (NOLOCK) ON b.IdmaeItem_Inventario = f.IdmaeItem_Inventario AND f.IdtdItemForm = 10
+                WHERE a.IdtdDocumentoForm = 131
+                    AND a.bDevolucion = 0
+                    AND a.bDesactivado = 0
+                    AND a.bAnulado = 0
+                    AND a.IdDocumento_OrdenProduccion <> 0
+                    AND a.IdmaeCentroCosto = 47
+                GROUP BY g.IdDocumento_OrdenVenta
+            ) q4 ON x.IdDocumento_OrdenVenta = q4.IdDocumento_OrdenVenta
+            WHERE x.CoddocOrdenVenta IS NOT NULL
+                AND x.IdtdDocumentoForm = 10 
+                AND x.IdtdTipoVenta = 4
+                AND x.bAnulado = 0
+            ) ff
+        ON gg.IdDocumento_OrdenVenta = ff.IdDocumento_OrdenVenta
+        """
+
+# Fechas del plan por proceso (el pedido del plan es el código del pedido en SQL Server)
+QUERY_PLAN = """
+        SELECT 
+            "IdDocumento_OrdenVenta" as pedido,
+            "Fecha_Colocacion",
+            "Fecha_Entrega",
+            "star_armado",
+            "star_tenido",
+            "star_telaprob",
+            "star_corte",
+            "star_costura",
+            "finish_armado",
+            "finish_tenido",
+            "finish_telaprob",
+            "finish_corte",
+            "finish_costura"
+        FROM "docOrdenVenta"
+        WHERE "IdDocumento_OrdenVenta" IN ({})
+        """
+
+
+def query_plan(pedidos):
+    """Consulta del plan para la lista de pedidos (un marcador %s por pedido)."""
+    return QUERY_PLAN.format(','.join(['%s' for _ in pedidos]))
+
+
+def query_avance_pedidos(pedidos):
+    """QUERY_AVANCE limitada a una lista de pedidos (parámetros: los de QUERY_AVANCE y luego los pedidos)."""
+    return QUERY_AVANCE + "WHERE gg.PEDIDO IN ({})\n".format(','.join(['?' for _ in pedidos]))
+
+
+# Órdenes de producción del pedido v: directas (corte, costura) y por la nota de pedido de tela (armado, teñido)
+_OPS_DEL_PEDIDO = """(o.IdDocumento_Referencia = v.IdDocumento_OrdenVenta
+           OR o.IdDocumento_Referencia IN (SELECT i.IdDocumento_OrdenVenta FROM docOrdenVentaItem i WITH (NOLOCK)
+                                           WHERE i.IdDocumento_Referencia = v.IdDocumento_OrdenVenta))"""
+
+# Versión de cada pedido en SQL Server: los campos del pedido que devuelve QUERY_AVANCE (entrega,
+# unidades, cliente, PO) y fechas, conteos y sumas de lo que alimenta sus porcentajes (KG de los
+# ítems del pedido, KG programados y requeridos de las órdenes, cierres, notas y recetas). Un alta,
+# baja, cierre o cambio de fecha o cantidad cambia alguno de esos valores. Es una consulta liviana
+# para saber qué pedidos cambiaron
+QUERY_VERSIONES = """
+SELECT v.CoddocOrdenVenta AS PEDIDO,
+       CONCAT(CONVERT(VARCHAR(23), (SELECT MAX(f) FROM (VALUES
+                  (v.dtFechaEmision), (op.F_EMI), (op.F_APROB), (ni.F_REG), (re.F_FIN)) AS t(f)), 121),
+              '/', CONVERT(VARCHAR(23), v.dtFechaEntrega, 121), '/', v.dCantidad, '/', vi.KG,
+              '/', cl.NommaeAnexoCliente, '/', v.nvDocumentoReferencia,
+              '/', op.N, '/', op.CERR, '/', it.PROG, '/', it.REQ, '/', ru.CERR,
+              '/', ni.N, '/', ni.KG, '/', re.N) AS VERSION
+FROM docOrdenVenta v WITH (NOLOCK)
+INNER JOIN maeAnexoCliente cl WITH (NOLOCK) ON v.IdmaeAnexo_Cliente = cl.IdmaeAnexo_Cliente
+OUTER APPLY (
+    SELECT SUM(c.dCantidad) AS KG
+    FROM docOrdenVentaItem c WITH (NOLOCK)
+    WHERE c.IdDocumento_Referencia = v.IdDocumento_OrdenVenta
+) AS vi
+OUTER APPLY (
+    SELECT MAX(o.dtFechaEmision) AS F_EMI, MAX(o.FechaCierreAprobado) AS F_APROB,
+           COUNT(*) AS N, SUM(CAST(o.bcerrado AS INT)) AS CERR
+    FROM docOrdenProduccion o WITH (NOLOCK)
+    WHERE {ops}
+) AS op
+OUTER APPLY (
+    SELECT SUM(y.dCantidadProgramado) AS PROG, SUM(y.dCantidadRequerido) AS REQ
+    FROM docOrdenProduccionItem y WITH (NOLOCK)
+    INNER JOIN docOrdenProduccion o WITH (NOLOCK) ON y.IdDocumento_OrdenProduccion = o.IdDocumento_OrdenProduccion
+    WHERE {ops}
+) AS it
+OUTER APPLY (
+    SELECT SUM(CAST(s.bcerrado AS INT)) AS CERR
+    FROM docOrdenProduccionRuta s WITH (NOLOCK)
+    INNER JOIN docOrdenProduccion o WITH (NOLOCK) ON s.IdDocumento_OrdenProduccion = o.IdDocumento_OrdenProduccion
+    WHERE {ops}
+) AS ru
+OUTER APPLY (
+    SELECT MAX(n.dtFechaRegistro) AS F_REG, COUNT(*) AS N, SUM(b.dCantidadIng) AS KG
+    FROM docNotaInventario n WITH (NOLOCK)
+    INNER JOIN docNotaInventarioItem b WITH (NOLOCK) ON n.IdDocumento_NotaInventario = b.IdDocumento_NotaInventario
+    INNER JOIN docOrdenProduccion o WITH (NOLOCK) ON n.IdDocumento_OrdenProduccion = o.IdDocumento_OrdenProduccion
+    WHERE {ops}
+) AS ni
+OUTER APPLY (
+    SELECT MAX(r.dtFechaHoraFin) AS F_FIN, COUNT(*) AS N
+    FROM docRecetaOrdenProduccion ro WITH (NOLOCK)
+    INNER JOIN docReceta r WITH (NOLOCK) ON ro.IdDocumento_Receta = r.IdDocumento_Receta
+    INNER JOIN docOrdenProduccion o WITH (NOLOCK) ON ro.IdDocumento_OrdenProduccion = o.IdDocumento_OrdenProduccion
+    WHERE {ops}
+) AS re
+WHERE {filtro}
+"""
+
+# Filtro de QUERY_VERSIONES con los mismos pedidos que QUERY_AVANCE (mismos parámetros)
+FILTRO_VENTANA = """v.IdtdDocumentoForm = 10
+  AND v.IdtdTipoVenta = 4
+  AND v.bAnulado = 0
+  AND v.dtFechaEntrega >= ?
+  AND v.dtFechaEntrega < ?
+  AND cl.NommaeAnexoCliente LIKE ?"""
+
+
+def query_versiones(filtro):
+    """QUERY_VERSIONES con la condición `filtro` sobre los pedidos."""
+    return QUERY_VERSIONES.format(ops=_OPS_DEL_PEDIDO, filtro=filtro)
+
+
+def query_versiones_pedidos(pedidos):
+    """Versiones de una lista de pedidos (un marcador ? por pedido)."""
+    return query_versiones("v.CoddocOrdenVenta IN ({})".format(','.join(['?' for _ in pedidos])))
+
+
+# Versión de cada pedido del plan: xmin cambia con cada INSERT o UPDATE de la fila
+QUERY_VERSIONES_PLAN = """
+SELECT "IdDocumento_OrdenVenta" AS pedido, xmin::text AS version
+FROM "docOrdenVenta"
+WHERE "IdDocumento_OrdenVenta" IN ({})
+"""
+
+
+def query_versiones_plan(pedidos):
+    return QUERY_VERSIONES_PLAN.format(','.join(['%s' for _ in pedidos]))
@@ -0,0 +1,125 @@
+import tempfile
+from time import perf_counter
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from exportar import MAX_SPOOL
+from medicion import registrar
+
+# COPY en CSV: pyarrow lo lee en C++ (en varios hilos) sin crear tuplas de Python por fila.
+# Un campo vacío sin comillas es NULL y "" con comillas es un texto vacío, igual que en PostgreSQL.
+# Los booleanos salen de COPY como t / f.
+OPCIONES_CSV = dict(strings_can_be_null=True, quoted_strings_can_be_null=False,
+                    true_values=["t"], false_values=["f"])
+
+# Tipo de Arrow por OID de tipo de PostgreSQL. Así cada columna tiene el tipo de la consulta y
+# no el que pyarrow infiere del texto (un texto de solo dígitos perdería los ceros a la
+# izquierda), y los mismos tipos que arma leer_arrow con los valores de psycopg2 (enteros de
+# 64 bits, float64). Los tipos que no están aquí se dejan a la inferencia de pyarrow.
+TIPOS_ARROW = {
+    16: pa.bool_(),             # bool
+    20: pa.int64(),             # int8
+    21: pa.int64(),             # int2
+    23: pa.int64(),             # int4
+    700: pa.float64(),          # float4
+    701: pa.float64(),          # float8
+    18: pa.string(),            # char
+    19: pa.string(),            # name
+    25: pa.string(),            # text
+    1042: pa.string(),          # bpchar
+    1043: pa.string(),          # varchar
+    114: pa.string(),           # json
+    3802: pa.string(),          # jsonb
+    2950: pa.string(),          # uuid
+    1082: pa.date32(),          # date
+    1114: pa.timestamp("us"),   # timestamp sin zona
+}
+OID_NUMERIC = 1700
+
+
+def tipos_columnas(cur, query, params=None):
+    """Tipos de Arrow de las columnas de la consulta, leídos de su descripción (LIMIT 0, sin filas).
+    numeric con precisión y escala pasa a decimal128, igual que en leer_arrow; sin ellas (o con
+    más de 38 dígitos) se lee como texto para no perder dígitos."""
+    cur.execute(f"SELECT * FROM ({query.strip().rstrip(';')}) q LIMIT 0", params)
+    tipos = {}
+    for columna in cur.description:
+        if columna.type_code == OID_NUMERIC:
+            tipos[columna.name] = (pa.decimal128(columna.precision, columna.scale)
+                                   if columna.precision and columna.precision <= 38 else pa.string())
+        elif columna.type_code in TIPOS_ARROW:
+            tipos[columna.name] = TIPOS_ARROW[columna.type_code]
+    return tipos
+
+
+def opciones_conversion(conn, query, params=None):
+    """ConvertOptions de pyarrow con los tipos de columna de la consulta."""
+    with conn.cursor() as cur:
+        return pacsv.ConvertOptions(column_types=tipos_columnas(cur, query, params), **OPCIONES_CSV)
+
+
+def sentencia_copy(cur, query, params=None):
+    """Arma COPY (...) TO STDOUT en CSV con encabezado. COPY no admite parámetros enlazados,
+    por eso se incrustan con mogrify (que los escapa igual que execute)."""
+    if params is not None:
+        query = cur.mogrify(query, params).decode()
+    return f"COPY ({query.strip().rstrip(';')}) TO STDOUT WITH (FORMAT csv, HEADER)"
+
+
+def copiar_csv(query, conn, destino, params=None):
+    """Escribe el resultado de la consulta como CSV en el archivo `destino` usando COPY."""
+    with conn.cursor() as cur:
+        cur.copy_expert(sentencia_copy(cur, query, params), destino)
+
+
+def leer_copy(nombre, query, conn, params=None, timeout=None):
+    """Lee el resultado de la consulta con COPY y lo convierte con pyarrow en un DataFrame
+    con tipos de Arrow. `conn` es una conexión psycopg2 (o la conexión cruda de un engine).
+    Con `timeout` (segundos) el servidor cancela el COPY si tarda más."""
+    inicio = perf_counter()
+    try:
+        with tempfile.SpooledTemporaryFile(max_size=MAX_SPOOL) as spool:
+            if timeout:
+                with conn.cursor() as cur:
+                    cur.execute(f"SET LOCAL statement_timeout = {int(timeout * 1000)}")
+            conversion = opciones_conversion(conn, query, params)
+            copiar_csv(query, conn, spool, params)
+            t_ejecucion = perf_counter() - inicio
+            tamano = spool.tell()
+            spool.seek(0)
+            inicio = perf_counter()
+            tabla = pacsv.read_csv(spool, convert_options=conversion)
+            t_lectura = perf_counter() - inicio
+    except Exception as e:
+        registrar(nombre, "postgres", params, t_ejecucion=perf_counter() - inicio,
+                  error=f"{type(e).__name__}: {e}"[:500])
+        raise
+
+    inicio = perf_counter()
+    df = tabla.to_pandas(types_mapper=pd.ArrowDtype)
+    registrar(nombre, "postgres", params, filas=len(df), bytes_=tamano, t_ejecucion=t_ejecucion,
+              t_lectura=t_lectura, t_dataframe=perf_counter() - inicio)
+    return df
+
+
+def exportar_copy(query, conn, formato="csv", params=None):
+    """Exporta el resultado de la consulta en bytes para st.download_button.
+
+    En CSV los bytes salen tal cual de COPY, sin pasar por pandas. En Parquet el CSV se
+    convierte con pyarrow directamente a Parquet.
+    """
+    if formato not in ("csv", "parquet"):
+        raise ValueError(f"Formato no soportado: {formato}")
+    with tempfile.SpooledTemporaryFile(max_size=MAX_SPOOL) as spool:
+        copiar_csv(query, conn, spool, params)
+        spool.seek(0)
+        if formato == "csv":
+            return spool.read()
+        tabla = pacsv.read_csv(spool, convert_options=opciones_conversion(conn, query, params))
+    with tempfile.SpooledTemporaryFile(max_size=MAX_SPOOL) as salida:
+        pq.write_table(tabla, salida)
+        salida.seek(0)
+        return salida.read()
@@ -1,17 +1,23 @@
 import streamlit as st
 import pandas as pd
-import psycopg2
-from psycopg2 import sql
 from datetime import datetime
+from time import perf_counter
+from medicion import medir
+from lectura_arrow import leer_arrow, motor_postgres
+from copia_postgres import leer_copy, exportar_copy
+from exportar import MIME
+from carga_diferida import diferido, precargar
+psycopg2 = diferido("psycopg2")
+sql = diferido("psycopg2.sql")
 
 class PostgreSQLApp:
     def __init__(self):
         # Initialize connection parameters from Streamlit secrets
-        self.host = st.secrets["host"]
-        self.port = st.secrets["port"]
-        self.database = st.secrets["database"]
-        self.user = st.secrets["user"]
-        self.password = st.secrets["password"]
+        self.host = st.secrets["postgres"]["host"]
+        self.port = st.secrets["postgres"]["port"]
+        self.database = st.secrets["postgres"]["database"]
+        self.user = st.secrets["postgres"]["user"]
+        self.password = st.secrets["postgres"]["password"]
 
     def _get_connection(self):
         """Establishes a connection to PostgreSQL database"""
@@ -25,12 +31,16 @@ class PostgreSQLApp:
 
     def execute_query(self, query, params=None):
         """Execute a query and return results as a DataFrame"""
+        inicio = perf_counter()
         with self._get_connection() as conn:
-            with conn.cursor() as cur:
+            t_conexion = perf_counter() - inicio
+            with medir("crudplan.execute_query", conn, params, t_conexion=t_conexion) as medicion, \
+                    conn.cursor() as cur:
                 if params:
                     cur.execute(query, params)
                 else:
                     cur.execute(query)
+                medicion['filas'] = cur.rowcount
                 
                 # Commit for write operations
                 if query.strip().upper().startswith(('INSERT', 'UPDATE', 'DELETE')):
@@ -45,11 +55,25 @@ class PostgreSQLApp:
         """Read records from the database, optionally filtered by ID"""
         base_query = 'SELECT * FROM "docOrdenVenta"'
         
+        # Lectura por bloques con cursor del lado del servidor y tipos de Arrow
         if id_filter:
             query = base_query + f' WHERE "IdDocumento_OrdenVenta" = %s'
-            return self.execute_query(query, (id_filter,))
+            return leer_arrow("crudplan.read_records", query, motor_postgres(), (id_filter,))
         else:
-            return self.execute_query(base_query)
+            # Tabla completa: COPY ... TO STDOUT en CSV, convertido por pyarrow
+            conn = motor_postgres().raw_connection()
+            try:
+                return leer_copy("crudplan.read_records", base_query, conn)
+            finally:
+                conn.close()
+
+    def export_records(self, formato='csv'):
+        """Export the whole table with COPY as CSV or Parquet bytes"""
+        conn = motor_postgres().raw_connection()
+        try:
+            return exportar_copy('SELECT * FROM "docOrdenVenta"', conn, formato)
+        finally:
+            conn.close()
 
     def create_record(self, record_data):
         """Insert a new record into the database"""
@@ -181,6 +205,16 @@ def main():
                 st.dataframe(result, hide_index=True)
             else:
                 st.write("No se encontraron resultados")
+
+        # Exportación de la tabla completa (COPY directo al archivo, sin pasar por filas de Python)
+        formato = st.radio("Formato de exportación", ["csv", "parquet"], horizontal=True)
+        if st.button("Preparar exportación"):
+            st.download_button(
+                label=f"Descargar tabla completa ({formato.upper()})",
+                data=pg_app.export_records(formato),
+                file_name=f"docOrdenVenta.{formato}",
+                mime=MIME[formato],
+            )
     
     with tab2:
         st.header("Crear Nuevo Registro")
@@ -281,4 +315,4 @@ def main():
 
 if __name__ == "__main__":
     main()
-
+    precargar()
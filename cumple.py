@@ -1,59 +1,92 @@
 import streamlit as st
-import pyodbc
 import pandas as pd
-from datetime import datetime
+import numpy as np
+from datetime import datetime, date
+from medicion import conectar_medido, leer_sql
+from conexiones import conectar_sqlserver
+from carga_diferida import precargar
 
 st.set_page_config(layout="wide")
 
 # Conexión a la base de datos SQL Server
 #connection = pyodbc.connect('DRIVER={SQL Server};SERVER=your_server;DATABASE=your_db;UID=your_user;PWD=your_password')
 
-connection = pyodbc.connect(
-        "driver={ODBC Driver 17 for SQL Server};"
-        "server=" + st.secrets["server"] + ";"
-        "database=" + st.secrets["database"] + ";"
-        "uid=" + st.secrets["username"] + ";"
-        "pwd=" + st.secrets["password"] + ";"
-    )
+def get_connection():
+    connection = conectar_sqlserver()
+    return connection
 
-# Obtener la fecha de hoy
-today = datetime.today().date()
+# Día del año en un año bisiesto, así el 29 de febrero también tiene su lugar
+def dia_del_año(mes, dia):
+    return date(2000, mes, dia).timetuple().tm_yday
 
-# Sidebar para la selección de fechas y área
-start_date = st.sidebar.date_input("fecha de inicio", value=today)
-end_date = st.sidebar.date_input("fecha de fin", value=pd.to_datetime('2025-12-31'))
-
-
-# Consulta SQL para obtener datos filtrados
-query = f"""
-SELECT *,
-       CONCAT(RIGHT('00' + CAST(dia AS VARCHAR(2)), 2), '-',
-              RIGHT('00' + CAST(mes AS VARCHAR(2)), 2), '-',
-              año) AS CUMPLEAÑOS
-FROM (
+# Trabajadores activos con día y mes de nacimiento; se consulta una vez por hora
+@st.cache_data(ttl=3600)
+def cargar_trabajadores():
+    query = """
     SELECT a.nommaeanexotrabajador AS NOMBRE,
            b.nommaecentrocosto AS AREA,
            c.nommaecargo AS CARGO,a.IdmaeCentroCosto,
            DAY(a.dtfechanacimiento) AS dia,
-           '2025' AS año,
-           MONTH(a.dtfechanacimiento) AS mes,
-           a.bdesactivado
+           MONTH(a.dtfechanacimiento) AS mes
     FROM maeanexotrabajador a
     INNER JOIN maecentrocosto b ON a.idmaecentrocosto = b.idmaecentrocosto
     INNER JOIN maecargo c ON a.idmaecargo = c.idmaecargo
     WHERE a.bcesado = 0
+      AND a.bdesactivado = 0  --and a.IdmaeCentroCosto in (109, 104, 111, 110,108)
       AND a.dtfechanacimiento IS NOT NULL
-) sc
-WHERE sc.bdesactivado = 0  --and sc.IdmaeCentroCosto in (109, 104, 111, 110,108)
-  AND CAST(CONCAT(año, '-', RIGHT('00' + CAST(mes AS VARCHAR(2)), 2), '-', RIGHT('00' + CAST(dia AS VARCHAR(2)), 2)) AS DATE) BETWEEN '{start_date}' AND '{end_date}'
-ORDER BY CAST(CONCAT(año, '-', RIGHT('00' + CAST(mes AS VARCHAR(2)), 2), '-', RIGHT('00' + CAST(dia AS VARCHAR(2)), 2)) AS DATE);
-"""
+    """
+    conn, t_conexion = conectar_medido(get_connection)
+    data = leer_sql("cumple.cargar_trabajadores", query, conn, t_conexion=t_conexion)
+    conn.close()
+
+    data['dia'] = data['dia'].astype('int8')
+    data['mes'] = data['mes'].astype('int8')
+    data['AREA'] = data['AREA'].astype('category')
+    # Índice por día del año: la tabla queda ordenada para buscar rangos con searchsorted
+    fechas = pd.to_datetime(pd.DataFrame({'year': 2000, 'month': data['mes'], 'day': data['dia']}))
+    data['DIA_AÑO'] = fechas.dt.dayofyear.astype('int16')
+    return data.sort_values('DIA_AÑO', kind='stable').reset_index(drop=True)
+
+# Cumpleaños entre dos fechas (en memoria), incluyendo rangos que pasan de un año al siguiente
+def filtrar_cumpleaños(data, start_date, end_date):
+    if end_date < start_date:
+        return data.iloc[0:0]
+    inicio = dia_del_año(start_date.month, start_date.day)
+    fin = dia_del_año(end_date.month, end_date.day)
+    dias = data['DIA_AÑO'].to_numpy()
+    desde = np.searchsorted(dias, inicio, side='left')
+    hasta = np.searchsorted(dias, fin, side='right')
+
+    if (end_date - start_date).days >= 365:
+        # Un año completo o más: todos, empezando por el día de inicio
+        filas = np.r_[desde:len(dias), 0:desde]
+    elif start_date.year == end_date.year:
+        filas = np.arange(desde, hasta)
+    else:
+        filas = np.r_[desde:len(dias), 0:hasta]
+    resultado = data.iloc[filas].copy()
+
+    # Año del próximo cumpleaños dentro del rango
+    año = np.where(resultado['DIA_AÑO'] >= inicio, start_date.year, start_date.year + 1)
+    resultado['CUMPLEAÑOS'] = (
+        resultado['dia'].astype(str).str.zfill(2) + '-'
+        + resultado['mes'].astype(str).str.zfill(2) + '-'
+        + pd.Series(año, index=resultado.index).astype(str)
+    )
+    return resultado
 
-# Ejecutar la consulta y obtener los datos
-data = pd.read_sql(query, connection)
+# Obtener la fecha de hoy
+today = datetime.today().date()
+
+# Sidebar para la selección de fechas y área
+start_date = st.sidebar.date_input("fecha de inicio", value=today)
+end_date = st.sidebar.date_input("fecha de fin", value=pd.to_datetime('2025-12-31'))
+
+# Filtrar por fechas sobre los datos cacheados (sin consultar la base de datos)
+data = filtrar_cumpleaños(cargar_trabajadores(), start_date, end_date)
 
 # Obtener las opciones únicas para el campo 'area'
-areas = data['AREA'].unique()
+areas = data['AREA'].unique().tolist()
 
 
 # crear un multiselect box con todas las áreas seleccionadas por defecto
@@ -70,3 +103,6 @@ filtered_data = data[data['AREA'].isin(selected_area)]
 columns_to_show = ['NOMBRE','AREA', 'CARGO','CUMPLEAÑOS']
 st.write(f"Registros: {len(filtered_data)}")
 st.dataframe(filtered_data[columns_to_show], hide_index=True)
+
+# Después de la primera pintura, cargar en segundo plano los módulos diferidos
+precargar()
@@ -0,0 +1,245 @@
+"""Datos sintéticos de pedidos para probar y medir los reportes sin las bases de producción.
+
+Crea en SQLite las tablas de SQL Server que usan los reportes de avance (docOrdenVenta,
+docOrdenVentaItem, docOrdenProduccion*, docNotaInventario*) y, en otra base, la tabla del plan
+de PostgreSQL ("docOrdenVenta" con las columnas star_* y finish_*). Solo tienen las columnas
+que usan las consultas, con los mismos nombres.
+"""
+import numpy as np
+import pandas as pd
+
+FECHA_BASE = pd.Timestamp("2025-01-01")
+CLIENTES = ["ADIDAS PERU", "NIKE INC", "LACOSTE SA", "TOMMY HILFIGER", "GAP INC", "RALPH LAUREN CORP"]
+# Cantidades por pedido
+ITEMS_POR_PEDIDO = 2
+OPS_TELA_POR_PEDIDO = 2
+NOTAS_POR_AREA = 2
+ITEMS_POR_NOTA = 2
+# Centros de costo de corte y costura, como en las consultas
+CENTRO_CORTE = 29
+CENTRO_COSTURA = 47
+
+PROCESOS_PLAN = ["armado", "tenido", "telaprob", "corte", "costura"]
+
+# Versión SQLite de la consulta consolidada de borrador.run_query: mismas columnas y mismos
+# cruces (ítems de venta, OP de tela con sus rutas, OP de confección y notas de corte y costura).
+# Los pedidos a consultar se leen de la tabla temporal pedidos_consulta.
+QUERY_CONSOLIDADO = """
+WITH kg AS (
+    SELECT IdDocumento_Referencia AS id, SUM(dCantidad) AS KG
+    FROM docOrdenVentaItem
+    GROUP BY IdDocumento_Referencia
+), tela AS (
+    SELECT z.IdDocumento_Referencia AS id,
+           SUM(y.dCantidadProgramado) AS KG_ARM,
+           SUM(z.bcerrado * y.dCantidadRequerido) AS KG_PRODUC,
+           SUM(s.bcerrado * y.dCantidadProgramado) AS KG_TENIDOS,
+           MIN(z.dtFechaEmision) AS FMINARM, MAX(z.dtFechaEmision) AS FMAXARM,
+           MIN(s.dtFechaHoraFin) AS FMINTENID, MAX(s.dtFechaHoraFin) AS FMAXTENID,
+           MIN(z.FechaCierreAprobado) AS FMINTELAPROB, MAX(z.FechaCierreAprobado) AS FMAXTELAPROB
+    FROM docOrdenProduccionItem y
+    JOIN docOrdenProduccion z ON y.IdDocumento_OrdenProduccion = z.IdDocumento_OrdenProduccion
+    JOIN docOrdenProduccionRuta s ON y.IdDocumento_OrdenProduccion = s.IdDocumento_OrdenProduccion
+    WHERE z.IdtdDocumentoForm = 138 AND s.IdmaeReceta > 0
+    GROUP BY z.IdDocumento_Referencia
+), prog AS (
+    SELECT c.IdDocumento_Referencia AS id, SUM(a.dCantidadProgramado) AS PROG
+    FROM docOrdenProduccion c
+    JOIN docOrdenProduccionItem a ON c.IdDocumento_OrdenProduccion = a.IdDocumento_OrdenProduccion
+    WHERE c.IdtdDocumentoForm = 127 AND c.bAnulado = 0
+    GROUP BY c.IdDocumento_Referencia
+), notas AS (
+    SELECT c.IdDocumento_Referencia AS id,
+           SUM(CASE WHEN n.IdmaeCentroCosto = 29 THEN i.dCantidadIng END) AS CORTADO,
+           SUM(CASE WHEN n.IdmaeCentroCosto = 47 THEN i.dCantidadIng END) AS COSIDO,
+           MIN(CASE WHEN n.IdmaeCentroCosto = 29 THEN n.dtFechaRegistro END) AS FMINCORTE,
+           MAX(CASE WHEN n.IdmaeCentroCosto = 29 THEN n.dtFechaRegistro END) AS FMAXCORTE,
+           MIN(CASE WHEN n.IdmaeCentroCosto = 47 THEN n.dtFechaRegistro END) AS FMINCOSIDO,
+           MAX(CASE WHEN n.IdmaeCentroCosto = 47 THEN n.dtFechaRegistro END) AS FMAXCOSIDO
+    FROM docNotaInventario n
+    JOIN docNotaInventarioItem i ON n.IdDocumento_NotaInventario = i.IdDocumento_NotaInventario
+    JOIN docOrdenProduccion c ON n.IdDocumento_OrdenProduccion = c.IdDocumento_OrdenProduccion
+    WHERE n.IdtdDocumentoForm = 131 AND n.bAnulado = 0 AND c.IdtdDocumentoForm = 127
+    GROUP BY c.IdDocumento_Referencia
+)
+SELECT a.CoddocOrdenVenta AS PEDIDO,
+       date(a.dtFechaEmision) AS F_EMISION,
+       date(a.dtFechaEntrega) AS F_ENTREGA,
+       CAST(julianday(a.dtFechaEntrega) - julianday(a.dtFechaEmision) AS INTEGER) AS DIAS,
+       substr(b.NommaeAnexoCliente, 1, 15) AS CLIENTE,
+       a.nvDocumentoReferencia AS PO,
+       CAST(COALESCE(kg.KG, 0) AS INTEGER) AS KG_REQ,
+       printf('%.0f%%', CASE WHEN COALESCE(kg.KG, 0) = 0 THEN 0 ELSE 100.0 * COALESCE(t.KG_ARM, 0) / kg.KG END) AS KG_ARMP,
+       printf('%.0f%%', CASE WHEN COALESCE(kg.KG, 0) = 0 THEN 0 ELSE 100.0 * COALESCE(t.KG_TENIDOS, 0) / kg.KG END) AS KG_TENIDP,
+       printf('%.0f%%', CASE WHEN COALESCE(kg.KG, 0) = 0 THEN 0 ELSE 100.0 * COALESCE(t.KG_PRODUC, 0) / kg.KG END) AS KG_TELAPROBP,
+       CAST(a.dCantidad AS INTEGER) AS UNID,
+       printf('%.0f%%', CASE WHEN a.dCantidad = 0 THEN 0 ELSE 100.0 * COALESCE(p.PROG, 0) / a.dCantidad END) AS PROGP,
+       printf('%.0f%%', CASE WHEN a.dCantidad = 0 THEN 0 ELSE 100.0 * COALESCE(n.CORTADO, 0) / a.dCantidad END) AS CORTADOP,
+       printf('%.0f%%', CASE WHEN a.dCantidad = 0 THEN 0 ELSE 100.0 * COALESCE(n.COSIDO, 0) / a.dCantidad END) AS COSIDOP,
+       t.FMINARM, t.FMAXARM, t.FMINTENID, t.FMAXTENID, t.FMINTELAPROB, t.FMAXTELAPROB,
+       n.FMINCORTE, n.FMAXCORTE, n.FMINCOSIDO, n.FMAXCOSIDO
+FROM docOrdenVenta a
+JOIN pedidos_consulta q ON q.PEDIDO = a.CoddocOrdenVenta
+JOIN maeAnexoCliente b ON a.IdmaeAnexo_Cliente = b.IdmaeAnexo_Cliente
+LEFT JOIN kg ON kg.id = a.IdDocumento_OrdenVenta
+LEFT JOIN tela t ON t.id = a.IdDocumento_OrdenVenta
+LEFT JOIN prog p ON p.id = a.IdDocumento_OrdenVenta
+LEFT JOIN notas n ON n.id = a.IdDocumento_OrdenVenta
+WHERE a.IdtdDocumentoForm = 10 AND a.IdtdTipoVenta = 4 AND a.bAnulado = 0
+"""
+
+QUERY_PLAN = """
+SELECT p."IdDocumento_OrdenVenta" AS pedido, "Fecha_Colocacion", "Fecha_Entrega",
+       "star_armado", "star_tenido", "star_telaprob", "star_corte", "star_costura",
+       "finish_armado", "finish_tenido", "finish_telaprob", "finish_corte", "finish_costura"
+FROM "docOrdenVenta" p
+JOIN pedidos_consulta q ON q.PEDIDO = p."IdDocumento_OrdenVenta"
+"""
+
+INDICES = [
+    "CREATE INDEX ix_ov_cod ON docOrdenVenta (CoddocOrdenVenta)",
+    "CREATE INDEX ix_ovi_ref ON docOrdenVentaItem (IdDocumento_Referencia)",
+    "CREATE INDEX ix_op_ref ON docOrdenProduccion (IdDocumento_Referencia)",
+    "CREATE INDEX ix_opi_op ON docOrdenProduccionItem (IdDocumento_OrdenProduccion)",
+    "CREATE INDEX ix_opr_op ON docOrdenProduccionRuta (IdDocumento_OrdenProduccion)",
+    "CREATE INDEX ix_ni_op ON docNotaInventario (IdDocumento_OrdenProduccion)",
+    "CREATE INDEX ix_nii_nota ON docNotaInventarioItem (IdDocumento_NotaInventario)",
+]
+
+
+def _dias(rng, n, minimo, maximo):
+    return pd.to_timedelta(rng.integers(minimo, maximo, n), unit="D")
+
+
+def tablas_erp(pedidos, semilla=0):
+    """Devuelve {tabla: DataFrame} con las tablas de SQL Server para `pedidos` pedidos."""
+    rng = np.random.default_rng(semilla)
+    ids = np.arange(1, pedidos + 1)
+    emision = FECHA_BASE + _dias(rng, pedidos, 0, 300)
+    unidades = rng.integers(500, 20000, pedidos)
+
+    ventas = pd.DataFrame({
+        "IdDocumento_OrdenVenta": ids,
+        "CoddocOrdenVenta": [f"P{i:07d}" for i in ids],
+        "IdmaeAnexo_Cliente": rng.integers(1, len(CLIENTES) + 1, pedidos),
+        "dtFechaEmision": emision,
+        "dtFechaEntrega": emision + _dias(rng, pedidos, 30, 90),
+        "nvDocumentoReferencia": [f"PO-{i}" for i in rng.integers(10000, 99999, pedidos)],
+        "dCantidad": unidades,
+        "IdtdDocumentoForm": 10,
+        "IdtdTipoVenta": 4,
+        "bAnulado": 0,
+    })
+    clientes = pd.DataFrame({"IdmaeAnexo_Cliente": np.arange(1, len(CLIENTES) + 1),
+                             "NommaeAnexoCliente": CLIENTES})
+
+    items = pd.DataFrame({
+        "IdDocumento_Referencia": np.repeat(ids, ITEMS_POR_PEDIDO),
+        "IdmaeItem": np.tile(np.arange(1, ITEMS_POR_PEDIDO + 1), pedidos),
+        "dCantidad": rng.random(pedidos * ITEMS_POR_PEDIDO) * 800 + 50,
+    })
+
+    # OP de tela (form 138) y una OP de confección (form 127) por pedido
+    n_tela = pedidos * OPS_TELA_POR_PEDIDO
+    ref_tela = np.repeat(ids, OPS_TELA_POR_PEDIDO)
+    emision_tela = np.repeat(emision, OPS_TELA_POR_PEDIDO) + _dias(rng, n_tela, 0, 10)
+    ops = pd.DataFrame({
+        "IdDocumento_OrdenProduccion": np.arange(1, n_tela + pedidos + 1),
+        "IdDocumento_Referencia": np.concatenate([ref_tela, ids]),
+        "IdtdDocumentoForm": np.r_[np.full(n_tela, 138), np.full(pedidos, 127)],
+        "bcerrado": rng.integers(0, 2, n_tela + pedidos),
+        "bAnulado": 0,
+        "dtFechaEmision": np.concatenate([emision_tela, emision + _dias(rng, pedidos, 10, 20)]),
+        "FechaCierreAprobado": np.concatenate([emision_tela + _dias(rng, n_tela, 5, 20),
+                                               emision + _dias(rng, pedidos, 20, 30)]),
+    })
+    id_ops = ops["IdDocumento_OrdenProduccion"].to_numpy()
+    id_tela, id_confeccion = id_ops[:n_tela], id_ops[n_tela:]
+
+    ops_items = pd.DataFrame({
+        "IdDocumento_OrdenProduccion": np.repeat(id_ops, 2),
+        "IdmaeItem": np.tile([1, 2], len(id_ops)),
+        "dCantidadProgramado": np.r_[rng.random(n_tela * 2) * 400,
+                                     np.repeat(unidades, 2) * rng.random(pedidos * 2) * 0.6],
+        "dCantidadRequerido": rng.random(len(id_ops) * 2) * 400,
+    })
+    rutas = pd.DataFrame({
+        "IddocOrdenProduccionRuta": np.arange(1, n_tela * 2 + 1),
+        "IdDocumento_OrdenProduccion": np.repeat(id_tela, 2),
+        "IdmaeReceta": rng.integers(0, 50, n_tela * 2),
+        "IdmaeCentroCosto": 0,
+        "bcerrado": rng.integers(0, 2, n_tela * 2),
+        "dtFechaHoraFin": np.repeat(emision_tela, 2) + _dias(rng, n_tela * 2, 3, 15),
+    })
+
+    # Notas de ingreso de corte y costura sobre la OP de confección
+    por_op = NOTAS_POR_AREA * 2
+    n_notas = pedidos * por_op
+    centro = np.tile(np.r_[np.full(NOTAS_POR_AREA, CENTRO_CORTE), np.full(NOTAS_POR_AREA, CENTRO_COSTURA)], pedidos)
+    notas = pd.DataFrame({
+        "IdDocumento_NotaInventario": np.arange(1, n_notas + 1),
+        "IdDocumento_OrdenProduccion": np.repeat(id_confeccion, por_op),
+        "IdmaeCentroCosto": centro,
+        "IdtdDocumentoForm": 131,
+        "bAnulado": 0,
+        "dtFechaRegistro": np.repeat(emision, por_op) + _dias(rng, n_notas, 20, 60)
+                           + pd.to_timedelta(np.where(centro == CENTRO_COSTURA, 7, 0), unit="D"),
+    })
+    notas_items = pd.DataFrame({
+        "IdDocumento_NotaInventario": np.repeat(notas["IdDocumento_NotaInventario"].to_numpy(), ITEMS_POR_NOTA),
+        "dCantidadIng": np.repeat(unidades, por_op * ITEMS_POR_NOTA) * rng.random(n_notas * ITEMS_POR_NOTA) * 0.15,
+    })
+
+    return {
+        "docOrdenVenta": ventas,
+        "maeAnexoCliente": clientes,
+        "docOrdenVentaItem": items,
+        "docOrdenProduccion": ops,
+        "docOrdenProduccionItem": ops_items,
+        "docOrdenProduccionRuta": rutas,
+        "docNotaInventario": notas,
+        "docNotaInventarioItem": notas_items,
+    }
+
+
+def tabla_plan(ventas, semilla=0):
+    """Tabla del plan (PostgreSQL) con fechas planificadas de inicio y fin por proceso."""
+    rng = np.random.default_rng(semilla + 1)
+    n = len(ventas)
+    plan = pd.DataFrame({
+        "IdDocumento_OrdenVenta": ventas["CoddocOrdenVenta"],
+        "Fecha_Colocacion": ventas["dtFechaEmision"],
+        "Fecha_Entrega": ventas["dtFechaEntrega"],
+    })
+    inicio = ventas["dtFechaEmision"]
+    for desfase, proceso in enumerate(PROCESOS_PLAN):
+        inicio = inicio + _dias(rng, n, 2 + desfase, 8 + desfase)
+        plan[f"star_{proceso}"] = inicio
+        plan[f"finish_{proceso}"] = inicio + _dias(rng, n, 5, 15)
+    return plan
+
+
+def cargar(conn_erp, conn_plan, pedidos, semilla=0):
+    """Crea y llena las dos bases de prueba; devuelve los códigos de pedido generados."""
+    tablas = tablas_erp(pedidos, semilla)
+    for nombre, df in tablas.items():
+        df.to_sql(nombre, conn_erp, index=False, if_exists="replace", chunksize=50_000)
+    for indice in INDICES:
+        conn_erp.execute(indice)
+    conn_erp.commit()
+    plan = tabla_plan(tablas["docOrdenVenta"], semilla)
+    plan.to_sql("docOrdenVenta", conn_plan, index=False, if_exists="replace", chunksize=50_000)
+    conn_plan.execute('CREATE INDEX ix_plan_pedido ON "docOrdenVenta" ("IdDocumento_OrdenVenta")')
+    conn_plan.commit()
+    return tablas["docOrdenVenta"]["CoddocOrdenVenta"].tolist()
+
+
+def preparar_pedidos(conn, pedidos):
+    """Deja los pedidos a consultar en la tabla temporal pedidos_consulta.
+
+    Se usa una tabla en lugar de IN (?, ?, ...) porque SQLite (y SQL Server, con 2100)
+    limitan la cantidad de parámetros por consulta.
+    """
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS pedidos_consulta (PEDIDO TEXT PRIMARY KEY)")
+    conn.execute("DELETE FROM pedidos_consulta")
+    conn.executemany("INSERT OR IGNORE INTO pedidos_consulta VALUES (?)", ((p,) for p in pedidos))
@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
+from carga_diferida import diferido, precargar
+px = diferido("plotly.express")
+go = diferido("plotly.graph_objects")
 
 # Crear el DataFrame original (Ejemplo de un solo pedido)
 data = {
@@ -127,3 +128,6 @@ pedido = df['PEDIDO'][0]
 st.title("Pedido:  " + str(df['PEDIDO'][0]))
 st.write("Cliente:  " + str(df['CLIENTE'][0]))
 st.plotly_chart(fig)
+
+# Después de la primera pintura, cargar en segundo plano los módulos diferidos
+precargar()
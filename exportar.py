@@ -0,0 +1,95 @@
+import tempfile
+
+import pandas as pd
+import streamlit as st
+import xlsxwriter
+
+MIME = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+# Filas de datos por hoja de Excel (el límite es 1.048.576 incluyendo el encabezado)
+MAX_FILAS_HOJA = 1_048_575
+# Tamaño hasta el que el archivo temporal se mantiene en memoria antes de pasar a disco
+MAX_SPOOL = 32 * 1024 * 1024
+# Filas por bloque al escribir CSV
+FILAS_BLOQUE_CSV = 50_000
+# Filas por bloque al pasar los datos a valores de Python para xlsxwriter
+FILAS_BLOQUE_XLSX = 10_000
+
+
+def _hojas(datos, nombre='Sheet1'):
+    """Normaliza un DataFrame o un diccionario {hoja: DataFrame} a una lista de (hoja, DataFrame)."""
+    if isinstance(datos, pd.DataFrame):
+        return [(nombre, datos)]
+    return list(datos.items())
+
+
+def escribir_xlsx(datos, destino):
+    """Escribe una o varias hojas fila por fila con xlsxwriter en modo constant_memory.
+
+    En este modo cada fila se envía a disco al pasar a la siguiente, así la memoria no crece
+    con el tamaño del archivo; los valores se convierten a objetos de Python de a
+    FILAS_BLOQUE_XLSX filas. Si un DataFrame supera el límite de filas se parte en varias hojas.
+    """
+    workbook = xlsxwriter.Workbook(destino, {
+        'constant_memory': True,
+        'default_date_format': 'dd/mm/yyyy',
+        'nan_inf_to_errors': True,
+    })
+    encabezado = workbook.add_format({'bold': True})
+    for nombre, df in _hojas(datos):
+        for parte, inicio in enumerate(range(0, max(len(df), 1), MAX_FILAS_HOJA), start=1):
+            hoja = nombre[:31] if parte == 1 else f"{nombre[:27]}_{parte}"
+            worksheet = workbook.add_worksheet(hoja)
+            worksheet.write_row(0, 0, [str(c) for c in df.columns], encabezado)
+            fin = min(inicio + MAX_FILAS_HOJA, len(df))
+            for desde in range(inicio, fin, FILAS_BLOQUE_XLSX):
+                bloque = df.iloc[desde:min(desde + FILAS_BLOQUE_XLSX, fin)]
+                valores = bloque.astype(object).where(bloque.notna(), None)
+                for fila, registro in enumerate(valores.itertuples(index=False, name=None), start=desde - inicio + 1):
+                    worksheet.write_row(fila, 0, registro)
+    workbook.close()
+
+
+def escribir_csv(df, destino):
+    """Escribe el DataFrame como CSV UTF-8 por bloques de filas."""
+    df.to_csv(destino, index=False, mode='wb', encoding='utf-8', chunksize=FILAS_BLOQUE_CSV)
+
+
+def escribir_parquet(df, destino):
+    """Escribe el DataFrame como Parquet (requiere pyarrow)."""
+    df.to_parquet(destino, index=False)
+
+
+ESCRITORES = {
+    'xlsx': escribir_xlsx,
+    'csv': escribir_csv,
+    'parquet': escribir_parquet,
+}
+
+
+def exportar(datos, formato='xlsx'):
+    """Escribe los datos en un archivo temporal (en memoria hasta MAX_SPOOL, luego en disco)
+    y devuelve su contenido en bytes. CSV y Parquet solo admiten un DataFrame."""
+    if formato not in ESCRITORES:
+        raise ValueError(f"Formato no soportado: {formato}")
+    if formato != 'xlsx' and not isinstance(datos, pd.DataFrame):
+        raise ValueError(f"El formato {formato} admite un solo DataFrame")
+    with tempfile.SpooledTemporaryFile(max_size=MAX_SPOOL) as spool:
+        ESCRITORES[formato](datos, spool)
+        spool.seek(0)
+        return spool.read()
+
+
+def boton_descarga(datos, nombre_archivo, etiqueta="Descargar", formato=None, key=None):
+    """Muestra un st.download_button con los datos exportados; el formato sale de la extensión del archivo."""
+    formato = formato or nombre_archivo.rsplit('.', 1)[-1].lower()
+    return st.download_button(
+        label=etiqueta,
+        data=exportar(datos, formato),
+        file_name=nombre_archivo,
+        mime=MIME[formato],
+        key=key,
+    )
@@ -1,40 +1,23 @@
 import streamlit as st
-import pyodbc
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import psycopg2
+from conexiones import conectar_postgres, conectar_sqlserver
+from medicion import conectar_medido, leer_sql
+from graficos_pedido import crear_gantt
+from carga_diferida import precargar
 
 st.set_page_config(layout="wide")
 
 # Configurar la conexión a la base de datos utilizando las credenciales almacenadas en secrets
 def connect_db():
-    connection = pyodbc.connect(
-        "driver={odbc driver 17 for sql server};"
-        "server=" + st.secrets["msserver"] + ";"
-        "database=" + st.secrets["msdatabase"] + ";"
-        "uid=" + st.secrets["msusername"] + ";"
-        "pwd=" + st.secrets["mspassword"] + ";"
-    )
-    return connection
+    return conectar_sqlserver()
 
 # New PostgreSQL connection function
 def connect_postgres():
-    connection = psycopg2.connect(
-        host=st.secrets["host"],
-        port=st.secrets["port"],
-        database=st.secrets["database"],
-        user=st.secrets["user"],
-        password=st.secrets["password"]
-    )
-    return connection
-
+    return conectar_postgres()
 
 
 # Función para ejecutar la consulta SQL
 def run_query(pedido):
-    conn = connect_db()
+    conn, t_conexion = conectar_medido(connect_db)
     query = """SELECT gg.PEDIDO, --gg.IdDocumento_OrdenVenta, 
     	gg.F_EMISION, gg.F_ENTREGA, gg.DIAS, gg.CLIENTE, gg.PO, gg.KG_REQ, 
        gg.KG_ARMP, gg.KG_TENIDP, gg.KG_TELAPROBP, gg.UNID, gg.PROGP, gg.CORTADOP, gg.COSIDOP, 
@@ -260,13 +243,13 @@ WHERE x.CoddocOrdenVenta IS NOT NULL
 ON gg.IdDocumento_OrdenVenta = ff.IdDocumento_OrdenVenta
 WHERE gg.PEDIDO = ?"""
 
-    df = pd.read_sql(query, conn, params=(pedido,))
+    df = leer_sql("gantt2BD.run_query", query, conn, params=(pedido,), t_conexion=t_conexion)
     conn.close()
     return df
 
 # New PostgreSQL query function
 def run_postgres_query(pedido):
-    conn = connect_postgres()
+    conn, t_conexion = conectar_medido(connect_postgres)
     
     # Modify this query to get the specific dates and information you want
     query = '''
@@ -289,13 +272,11 @@ def run_postgres_query(pedido):
     WHERE "IdDocumento_OrdenVenta" = %s
     '''
     
-    df = pd.read_sql(query, conn, params=(pedido,))
+    df = leer_sql("gantt2BD.run_postgres_query", query, conn, params=(pedido,), t_conexion=t_conexion)
     conn.close()
     return df
 
 
-
-
 # Interfaz de usuario de Streamlit
 st.title("Progreso del Pedido")
 
@@ -325,167 +306,9 @@ if st.button("Ejecutar Consulta"):
                 else:
                     st.warning("No se encontraron datos adicionales en PostgreSQL.")
 
-                # Procesar los datos para el gráfico de Gantt
-                f_emision = pd.to_datetime(df['F_EMISION'].iloc[0])
-                #dias = df['DIAS'].iloc[0]
-
-                # Cálculo de las fechas de inicio y fin
-                
-                start_armado = pd.to_datetime(df_postgres['star_armado'].iloc[0]) 
-		  
-                start_tenido = pd.to_datetime(df_postgres['star_tenido'].iloc[0])
-                start_telaprob = pd.to_datetime(df_postgres['star_telaprob'].iloc[0])
-                start_corte = pd.to_datetime(df_postgres['star_corte'].iloc[0])
-                start_costura = pd.to_datetime(df_postgres['star_costura'].iloc[0])
-                finish_armado = pd.to_datetime(df_postgres['finish_armado'].iloc[0])
-                finish_tenido = pd.to_datetime(df_postgres['finish_tenido'].iloc[0])
-                finish_telaprob = pd.to_datetime(df_postgres['finish_telaprob'].iloc[0])
-                finish_corte = pd.to_datetime(df_postgres['finish_corte'].iloc[0])
-                finish_costura = pd.to_datetime(df_postgres['finish_costura'].iloc[0])
-                inicial = pd.to_datetime(df_postgres['Fecha_Colocacion'].iloc[0])
-                fin = pd.to_datetime(df_postgres['Fecha_Entrega'].iloc[0]) 
-		
-
-                 
-				# Crear DataFrame para el gráfico de Gantt
-                df_gantt = pd.DataFrame({
-                    'Proceso': ['ARMADO', 'TEÑIDO', 'TELA_APROB', 'CORTE', 'COSTURA'],
-                    'Start': [start_armado, start_tenido, start_telaprob, start_corte, start_costura],
-                    'Finish': [finish_armado, finish_tenido, finish_telaprob, finish_corte, finish_costura],
-                    'Start Real': [pd.to_datetime(df['FMINARM'].iloc[0]), pd.to_datetime(df['FMINTENID'].iloc[0]), 
-                                   pd.to_datetime(df['FMINTELAPROB'].iloc[0]), pd.to_datetime(df['FMINCORTE'].iloc[0]), 
-                                   pd.to_datetime(df['FMINCOSIDO'].iloc[0])],
-                    'Finish Real': [pd.to_datetime(df['FMAXARM'].iloc[0]), pd.to_datetime(df['FMAXTENID'].iloc[0]), 
-                                    pd.to_datetime(df['FMAXTELAPROB'].iloc[0]), pd.to_datetime(df['FMAXCORTE'].iloc[0]), 
-                                    pd.to_datetime(df['FMAXCOSIDO'].iloc[0])],
-                    'Avance': [df['KG_ARMP'].iloc[0], df['KG_TENIDP'].iloc[0], df['KG_TELAPROBP'].iloc[0], 
-                               df['CORTADOP'].iloc[0], df['COSIDOP'].iloc[0]]
-                })
-
                 # Crear el gráfico de Gantt
-                fig = px.timeline(df_gantt, x_start="Start", x_end="Finish", y="Proceso", text="Avance")
-
-	        # Cambiar el color de las barras
-                for trace in fig.data:
-                    trace.marker.color = 'lightsteelblue'  # Puedes cambiar a cualquier color válido
-
-                # Mostrar las etiquetas del eje X cada 7 días
-                tick0_date = f_emision.strftime('%Y-%m-%d')
-                fig.update_xaxes(tickmode='linear', tick0=tick0_date, dtick=7 * 24 * 60 * 60 * 1000)
+                fig = crear_gantt(df, df_postgres)
 
-                # Ajustar el diseño del gráfico
-                fig.update_yaxes(autorange="reversed")
-
-                # Agregar las barras de las fechas reales
-                fig.add_trace(go.Scatter(
-                    x=df_gantt['Start Real'],
-                    y=df_gantt['Proceso'],
-                    mode='markers',
-                    #marker=dict(color='black', size=10),
-		    marker=dict(symbol='triangle-up', size=10, color='black'),	
-                    name='Start Real'
-                ))
-                fig.add_trace(go.Scatter(
-                    x=df_gantt['Finish Real'],
-                    y=df_gantt['Proceso'],
-                    mode='markers',
-		    marker=dict(symbol='triangle-down', size=10, color='red'),
-                    #marker=dict(color='red', size=10),
-                    name='Finish Real'
-                ))
-
-                # Fechas de colocación y entrega
-                fecha_colocacion = pd.to_datetime(df['F_EMISION'].iloc[0])
-                fecha_entrega = pd.to_datetime(df['F_ENTREGA'].iloc[0])
-
-                # Agregar líneas verticales para las fechas de colocación y entrega
-                fig.add_shape(
-                    type="line",
-                    x0=fecha_colocacion,
-                    y0=0,
-                    x1=fecha_colocacion,
-                    y1=len(df_gantt),
-                    line=dict(color="green", width=2, dash="dash"),
-                    name="Fecha Colocación"
-                )
-		
-                # Para la fecha de colocación
-                fig.add_annotation(
-                    x=fecha_colocacion,
-                    y=len(df_gantt)/2,
-                    text="Emision<br>" + fecha_colocacion.strftime('%b %d'),
-                    showarrow=True,
-                    arrowhead=1
-                )        	
-                fig.add_shape(
-                    type="line",
-                    x0=fecha_entrega,
-                    y0=0,
-                    x1=fecha_entrega,
-                    y1=len(df_gantt),
-                    line=dict(color="red", width=2, dash="dash"),
-                    name="Fecha Entrega"
-                )
-		# Para la fecha de entrega
-                fig.add_annotation(
-                    x=fecha_entrega,
-                    y=len(df_gantt)/2,
-                    text="Entrega<br>" + fecha_entrega.strftime('%b %d'),
-                    showarrow=True,
-                    arrowhead=1
-                )    
-
-                # Agregar una línea vertical para la fecha actual
-                fecha_actual = datetime.now().strftime('%Y-%m-%d')
-                fig.add_shape(
-                    type="line",
-                    x0=fecha_actual,
-                    y0=0,
-                    x1=fecha_actual,
-                    y1=len(df_gantt),
-                    line=dict(color="blue", width=2, dash="dash"),
-                    name="Fecha Actual"
-                )
-
-                fig.add_shape(
-                    type="line",
-                    x0=inicial,
-                    y0=0,
-                    x1=inicial,
-                    y1=len(df_gantt),
-                    line=dict(color="green", width=2, dash="dash"),
-                    name="inicial"
-                )
-		
-                # Para la fecha de colocación
-                fig.add_annotation(
-                    x=inicial,
-                    y=len(df_gantt)/3,
-                    text="Inicio<br>" + inicial.strftime('%b %d'),
-                    showarrow=True,
-                    arrowhead=1
-                )        	
-                fig.add_shape(
-                    type="line",
-                    x0=fin,
-                    y0=0,
-                    x1=fin,
-                    y1=len(df_gantt),
-                    line=dict(color="red", width=2, dash="dash"),
-                    name="fin"
-                )
-		# Para la fecha de entrega
-                fig.add_annotation(
-                    x=fin,
-                    y=len(df_gantt)/3,
-                    text="Fin<br>" + fin.strftime('%b %d'),
-                    showarrow=True,
-                    arrowhead=1
-                )
-
-        
-
-               
                 st.title(f"Pedido: {df['PEDIDO'].iloc[0]}")
                 st.write(f"Cliente: {df['CLIENTE'].iloc[0]}")
                 st.plotly_chart(fig)
@@ -494,3 +317,6 @@ if st.button("Ejecutar Consulta"):
             st.error(f"Error al ejecutar la consulta: {e}")
     else:
         st.warning("Por favor ingresa un número de pedido.")
+
+# Después de la primera pintura, cargar en segundo plano los módulos diferidos
+precargar()
@@ -0,0 +1,352 @@
+"""Gráficos de Gantt de un pedido, compartidos por las páginas de seguimiento.
+
+create_gantt_chart recibe el resultado de varios pedidos con la fila de resumen al final
+(borrador.py); crear_gantt recibe un solo pedido (gantt2BD.py). En ambos las barras se colorean
+según el estado de cada proceso en reglas_avance.py.
+"""
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from carga_diferida import diferido
+from reglas_avance import COLORES_ESTADO, PROCESOS, estados_pedido
+px = diferido("plotly.express")
+go = diferido("plotly.graph_objects")
+
+
+# Función para crear el gráfico de Gantt
+def create_gantt_chart(df, df_postgres):
+    """Crea un gráfico de Gantt con los datos proporcionados."""
+    n = len(df) - 1  # Índice de la fila de resumen
+    
+    # Fechas de inicio y fin
+    start_armado = pd.to_datetime(df_postgres['star_armado'].iloc[n])
+    finish_armado = pd.to_datetime(df_postgres['finish_armado'].iloc[n])
+    start_tenido = pd.to_datetime(df_postgres['star_tenido'].iloc[n])
+    finish_tenido = pd.to_datetime(df_postgres['finish_tenido'].iloc[n])
+    start_telaprob = pd.to_datetime(df_postgres['star_telaprob'].iloc[n])
+    finish_telaprob = pd.to_datetime(df_postgres['finish_telaprob'].iloc[n])
+    start_corte = pd.to_datetime(df_postgres['star_corte'].iloc[n])
+    finish_corte = pd.to_datetime(df_postgres['finish_corte'].iloc[n])
+    start_costura = pd.to_datetime(df_postgres['star_costura'].iloc[n])
+    finish_costura = pd.to_datetime(df_postgres['finish_costura'].iloc[n])
+    
+
+    
+    # Crear DataFrame para el gráfico de Gantt
+    df_gantt = pd.DataFrame({
+        'Proceso': ['ARMADO', 'TEÑIDO', 'TELA_APROB', 'CORTE', 'COSTURA'],
+        'Start': [start_armado, start_tenido, start_telaprob, start_corte, start_costura],
+        'Finish': [finish_armado, finish_tenido, finish_telaprob, finish_corte, finish_costura],
+        'Start Real': [pd.to_datetime(df['FMINARM'].iloc[n]), pd.to_datetime(df['FMINTENID'].iloc[n]), 
+                       pd.to_datetime(df['FMINTELAPROB'].iloc[n]), pd.to_datetime(df['FMINCORTE'].iloc[n]), 
+                       pd.to_datetime(df['FMINCOSIDO'].iloc[n])],
+        'Finish Real': [pd.to_datetime(df['FMAXARM'].iloc[n]), pd.to_datetime(df['FMAXTENID'].iloc[n]), 
+                        pd.to_datetime(df['FMAXTELAPROB'].iloc[n]), pd.to_datetime(df['FMAXCORTE'].iloc[n]), 
+                        pd.to_datetime(df['FMAXCOSIDO'].iloc[n])],
+        'Avance': [df['KG_ARMP'].iloc[n], df['KG_TENIDP'].iloc[n], df['KG_TELAPROBP'].iloc[n], 
+                   df['CORTADOP'].iloc[n], df['COSIDOP'].iloc[n]]
+    })
+    
+    # Crear el gráfico de Gantt
+    fig = px.timeline(df_gantt, x_start="Start", x_end="Finish", y="Proceso", text="Avance")
+
+    # Color de cada barra según el estado del proceso en la fila de resumen (reglas de avance)
+    estados = estados_pedido(df, df_postgres, fila=n)
+    for trace in fig.data:
+        trace.marker.color = [COLORES_ESTADO.get(estados.get(p), 'lightsteelblue') for p in PROCESOS]
+    
+    # Agregar líneas verticales cada dos días
+    fecha_inicio = min(df_gantt['Start'].min(), df_gantt['Start Real'].min())
+    fecha_fin = max(df_gantt['Finish'].max(), df_gantt['Finish Real'].max())
+    dias_totales = (fecha_fin - fecha_inicio).days
+
+    for i in range(0, dias_totales + 1, 2):
+        fecha_linea = fecha_inicio + timedelta(days=i)
+        fig.add_shape(
+            type="line",
+            x0=fecha_linea,
+            y0=0,
+            x1=fecha_linea,
+            y1=len(df_gantt),
+            line=dict(
+                color="lightgray",
+                width=1,
+                dash="dot"
+            ),
+            layer="below"  # Esto asegura que las líneas estén detrás de las barras del Gantt
+        )
+
+    # Agregar las marcas de inicio y fin reales
+    fig.add_trace(go.Scatter(
+        x=df_gantt['Start Real'],
+        y=df_gantt['Proceso'],
+        mode='markers',
+        marker=dict(symbol='triangle-up', size=10, color='black'),
+        name='Inicio Real'
+    ))
+    fig.add_trace(go.Scatter(
+        x=df_gantt['Finish Real'],
+        y=df_gantt['Proceso'],
+        mode='markers',
+        marker=dict(symbol='triangle-down', size=10, color='red'),
+        name='Fin Real'
+    ))
+
+    # Fechas de emisión y entrega
+    fecha_emision = pd.to_datetime(df['F_EMISION'].iloc[n])
+    fecha_entrega = pd.to_datetime(df['F_ENTREGA'].iloc[n])
+
+    # Fechas de inicio y fin del pedido
+    fecha_inicio_pedido = min(df_gantt['Start'].min(), df_gantt['Start Real'].min())
+    fecha_fin_pedido = max(df_gantt['Finish'].max(), df_gantt['Finish Real'].max())
+
+    # Agregar líneas verticales para las fechas de emisión y entrega
+    fig.add_shape(
+        type="line",
+        x0=fecha_emision,
+        y0=0,
+        x1=fecha_emision,
+        y1=len(df_gantt),
+        line=dict(color="green", width=2, dash="dash"),
+        name="Fecha Emisión"
+    )
+    fig.add_annotation(
+        x=fecha_emision,
+        y=len(df_gantt)/2,
+        text="Emisión<br>" + fecha_emision.strftime('%b %d'),
+        showarrow=True,
+        arrowhead=1
+    )
+    fig.add_shape(
+        type="line",
+        x0=fecha_entrega,
+        y0=0,
+        x1=fecha_entrega,
+        y1=len(df_gantt),
+        line=dict(color="red", width=2, dash="dash"),
+        name="Fecha Entrega"
+    )
+    fig.add_annotation(
+        x=fecha_entrega,
+        y=len(df_gantt)/2,
+        text="Entrega<br>" + fecha_entrega.strftime('%b %d'),
+        showarrow=True,
+        arrowhead=1
+    )
+
+    # Agregar líneas verticales para las fechas de inicio y fin del pedido
+    fig.add_shape(
+        type="line",
+        x0=fecha_inicio_pedido,
+        y0=0,
+        x1=fecha_inicio_pedido,
+        y1=len(df_gantt),
+        line=dict(color="purple", width=2, dash="dash"),
+        name="Inicio Pedido"
+    )
+    fig.add_annotation(
+        x=fecha_inicio_pedido,
+        y=len(df_gantt)/2,
+        text="Inicio<br>" + fecha_inicio_pedido.strftime('%b %d'),
+        showarrow=True,
+        arrowhead=1
+    )
+    fig.add_shape(
+        type="line",
+        x0=fecha_fin_pedido,
+        y0=0,
+        x1=fecha_fin_pedido,
+        y1=len(df_gantt),
+        line=dict(color="orange", width=2, dash="dash"),
+        name="Fin Pedido"
+    )
+    fig.add_annotation(
+        x=fecha_fin_pedido,
+        y=len(df_gantt)/2,
+        text="Fin<br>" + fecha_fin_pedido.strftime('%b %d'),
+        showarrow=True,
+        arrowhead=1
+    )
+
+    # Agregar una línea vertical para la fecha actual
+    fecha_actual = datetime.now().strftime('%Y-%m-%d')
+    fig.add_shape(
+        type="line",
+        x0=fecha_actual,
+        y0=0,
+        x1=fecha_actual,
+        y1=len(df_gantt),
+        line=dict(color="blue", width=2, dash="dash"),
+        name="Fecha Actual"
+    )
+
+    # Ajustar el diseño del gráfico
+    fig.update_xaxes(tickmode='linear', dtick=2 * 24 * 60 * 60 * 1000, tickformat='%d\n%b\n%y')
+    fig.update_yaxes(autorange="reversed")
+    
+    return fig
+
+
+# Función para crear el gráfico de Gantt de un pedido
+def crear_gantt(df, df_postgres):
+    # Procesar los datos para el gráfico de Gantt
+    f_emision = pd.to_datetime(df['F_EMISION'].iloc[0])
+    #dias = df['DIAS'].iloc[0]
+
+    # Cálculo de las fechas de inicio y fin
+
+    start_armado = pd.to_datetime(df_postgres['star_armado'].iloc[0])
+
+    start_tenido = pd.to_datetime(df_postgres['star_tenido'].iloc[0])
+    start_telaprob = pd.to_datetime(df_postgres['star_telaprob'].iloc[0])
+    start_corte = pd.to_datetime(df_postgres['star_corte'].iloc[0])
+    start_costura = pd.to_datetime(df_postgres['star_costura'].iloc[0])
+    finish_armado = pd.to_datetime(df_postgres['finish_armado'].iloc[0])
+    finish_tenido = pd.to_datetime(df_postgres['finish_tenido'].iloc[0])
+    finish_telaprob = pd.to_datetime(df_postgres['finish_telaprob'].iloc[0])
+    finish_corte = pd.to_datetime(df_postgres['finish_corte'].iloc[0])
+    finish_costura = pd.to_datetime(df_postgres['finish_costura'].iloc[0])
+    inicial = pd.to_datetime(df_postgres['Fecha_Colocacion'].iloc[0])
+    fin = pd.to_datetime(df_postgres['Fecha_Entrega'].iloc[0])
+
+
+
+    # Crear DataFrame para el gráfico de Gantt
+    df_gantt = pd.DataFrame({
+        'Proceso': ['ARMADO', 'TEÑIDO', 'TELA_APROB', 'CORTE', 'COSTURA'],
+        'Start': [start_armado, start_tenido, start_telaprob, start_corte, start_costura],
+        'Finish': [finish_armado, finish_tenido, finish_telaprob, finish_corte, finish_costura],
+        'Start Real': [pd.to_datetime(df['FMINARM'].iloc[0]), pd.to_datetime(df['FMINTENID'].iloc[0]),
+                       pd.to_datetime(df['FMINTELAPROB'].iloc[0]), pd.to_datetime(df['FMINCORTE'].iloc[0]),
+                       pd.to_datetime(df['FMINCOSIDO'].iloc[0])],
+        'Finish Real': [pd.to_datetime(df['FMAXARM'].iloc[0]), pd.to_datetime(df['FMAXTENID'].iloc[0]),
+                        pd.to_datetime(df['FMAXTELAPROB'].iloc[0]), pd.to_datetime(df['FMAXCORTE'].iloc[0]),
+                        pd.to_datetime(df['FMAXCOSIDO'].iloc[0])],
+        'Avance': [df['KG_ARMP'].iloc[0], df['KG_TENIDP'].iloc[0], df['KG_TELAPROBP'].iloc[0],
+                   df['CORTADOP'].iloc[0], df['COSIDOP'].iloc[0]]
+    })
+
+    # Crear el gráfico de Gantt
+    fig = px.timeline(df_gantt, x_start="Start", x_end="Finish", y="Proceso", text="Avance")
+
+    # Color de cada barra según el estado del proceso (reglas de avance)
+    estados = estados_pedido(df, df_postgres)
+    for trace in fig.data:
+        trace.marker.color = [COLORES_ESTADO.get(estados.get(p), 'lightsteelblue') for p in PROCESOS]
+
+    # Mostrar las etiquetas del eje X cada 7 días
+    tick0_date = f_emision.strftime('%Y-%m-%d')
+    fig.update_xaxes(tickmode='linear', tick0=tick0_date, dtick=7 * 24 * 60 * 60 * 1000)
+
+    # Ajustar el diseño del gráfico
+    fig.update_yaxes(autorange="reversed")
+
+    # Agregar las barras de las fechas reales
+    fig.add_trace(go.Scatter(
+        x=df_gantt['Start Real'],
+        y=df_gantt['Proceso'],
+        mode='markers',
+        #marker=dict(color='black', size=10),
+        marker=dict(symbol='triangle-up', size=10, color='black'),
+        name='Start Real'
+    ))
+    fig.add_trace(go.Scatter(
+        x=df_gantt['Finish Real'],
+        y=df_gantt['Proceso'],
+        mode='markers',
+        marker=dict(symbol='triangle-down', size=10, color='red'),
+        #marker=dict(color='red', size=10),
+        name='Finish Real'
+    ))
+
+    # Fechas de colocación y entrega
+    fecha_colocacion = pd.to_datetime(df['F_EMISION'].iloc[0])
+    fecha_entrega = pd.to_datetime(df['F_ENTREGA'].iloc[0])
+
+    # Agregar líneas verticales para las fechas de colocación y entrega
+    fig.add_shape(
+        type="line",
+        x0=fecha_colocacion,
+        y0=0,
+        x1=fecha_colocacion,
+        y1=len(df_gantt),
+        line=dict(color="green", width=2, dash="dash"),
+        name="Fecha Colocación"
+    )
+
+    # Para la fecha de colocación
+    fig.add_annotation(
+        x=fecha_colocacion,
+        y=len(df_gantt)/2,
+        text="Emision<br>" + fecha_colocacion.strftime('%b %d'),
+        showarrow=True,
+        arrowhead=1
+    )
+    fig.add_shape(
+        type="line",
+        x0=fecha_entrega,
+        y0=0,
+        x1=fecha_entrega,
+        y1=len(df_gantt),
+        line=dict(color="red", width=2, dash="dash"),
+        name="Fecha Entrega"
+    )
+    # Para la fecha de entrega
+    fig.add_annotation(
+        x=fecha_entrega,
+        y=len(df_gantt)/2,
+        text="Entrega<br>" + fecha_entrega.strftime('%b %d'),
+        showarrow=True,
+        arrowhead=1
+    )
+
+    # Agregar una línea vertical para la fecha actual
+    fecha_actual = datetime.now().strftime('%Y-%m-%d')
+    fig.add_shape(
+        type="line",
+        x0=fecha_actual,
+        y0=0,
+        x1=fecha_actual,
+        y1=len(df_gantt),
+        line=dict(color="blue", width=2, dash="dash"),
+        name="Fecha Actual"
+    )
+
+    fig.add_shape(
+        type="line",
+        x0=inicial,
+        y0=0,
+        x1=inicial,
+        y1=len(df_gantt),
+        line=dict(color="green", width=2, dash="dash"),
+        name="inicial"
+    )
+
+    # Para la fecha de colocación
+    fig.add_annotation(
+        x=inicial,
+        y=len(df_gantt)/3,
+        text="Inicio<br>" + inicial.strftime('%b %d'),
+        showarrow=True,
+        arrowhead=1
+    )
+    fig.add_shape(
+        type="line",
+        x0=fin,
+        y0=0,
+        x1=fin,
+        y1=len(df_gantt),
+        line=dict(color="red", width=2, dash="dash"),
+        name="fin"
+    )
+    # Para la fecha de entrega
+    fig.add_annotation(
+        x=fin,
+        y=len(df_gantt)/3,
+        text="Fin<br>" + fin.strftime('%b %d'),
+        showarrow=True,
+        arrowhead=1
+    )
+
+    return fig
@@ -1,19 +1,14 @@
 import streamlit as st
-import pandas as pd
-import pyodbc
-import base64
-import io
+from exportar import boton_descarga
+from ingesta import leer_excel
+from medicion import leer_sql
+from conexiones import conectar_sqlserver
+from carga_diferida import precargar
 
 # Función para conectar a la base de datos
 def connect_to_database():
     try:
-        conn = pyodbc.connect(
-            "DRIVER={ODBC Driver 17 for SQL Server};"
-            "SERVER=" + st.secrets["server"] + ";"
-            "DATABASE=" + st.secrets["database"] + ";"
-            "UID=" + st.secrets["username"] + ";"
-            "PWD=" + st.secrets["password"] + ";"
-        )
+        conn = conectar_sqlserver()
         return conn
     except Exception as e:
         st.error(f"Error al conectar a la base de datos: {e}")
@@ -22,7 +17,7 @@ def connect_to_database():
 # Función para ejecutar la consulta SQL y obtener resultados
 def get_sql_data(conn, op):
     query = f"SELECT coddocordenproduccion, dcantidadprogramado FROM docordenproduccion WHERE coddocordenproduccion = '{op}'"
-    df = pd.read_sql(query, conn)
+    df = leer_sql("gtdataexcel.get_sql_data", query, conn)
     return df
 
 # Aplicación Streamlit
@@ -32,7 +27,7 @@ def main():
     uploaded_file = st.file_uploader("Subir archivo Excel", type=["xlsx"])
 
     if uploaded_file is not None:
-        excel_data = pd.read_excel(uploaded_file)
+        excel_data = leer_excel(uploaded_file)
         conn = connect_to_database()
 
         new_data = excel_data.copy()
@@ -49,26 +44,10 @@ def main():
         st.write("Descarga el archivo Excel actualizado:")
         #st.dataframe(new_data)
 
-        # Convertir el DataFrame a formato CSV en memoria (como una cadena de texto)
-        csv = new_data.to_csv(index=False)
-
-        # Generar el enlace de descarga del archivo CSV utilizando st.markdown
-        b64 = base64.b64encode(csv.encode()).decode()  # Codifica el CSV en base64
-        href = f'<a href="data:file/csv;base64,{b64}" download="excel_actualizado.csv">Descargar archivo CSV</a>'
-        st.markdown(href, unsafe_allow_html=True)
-        
-        # Convertir el DataFrame a un archivo Excel en memoria (como una cadena de bytes)
-        excel_bytes = None
-        with io.BytesIO() as buffer:
-            excel_writer = pd.ExcelWriter(buffer, engine='xlsxwriter')
-            new_data.to_excel(excel_writer, index=False)
-            excel_writer.close()  # Cerrar el escritor de Excel
-            excel_bytes = buffer.getvalue()
-
-        # Generar el enlace de descarga del archivo Excel utilizando st.markdown
-        b64 = base64.b64encode(excel_bytes).decode()
-        href = f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="excel_actualizado.xlsx">Descargar archivo Excel</a>'
-        st.markdown(href, unsafe_allow_html=True)
+        # Botones de descarga (el archivo se sirve aparte, no incrustado en el HTML de la página)
+        boton_descarga(new_data, "excel_actualizado.csv", "Descargar archivo CSV")
+        boton_descarga(new_data, "excel_actualizado.xlsx", "Descargar archivo Excel")
 
 if __name__ == '__main__':
     main()
+    precargar()
@@ -0,0 +1,206 @@
+import re
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from medicion import conectar_medido, leer_sql
+
+# Días hacia atrás que se cargan en el índice la primera vez
+DIAS_INDICE = 180
+# Longitud de los n-gramas del índice
+N_GRAMA = 3
+# Columnas por las que se puede buscar
+COLUMNAS_BUSQUEDA = ["PARTIDA", "COLOR", "CLIENTE_BUSQ", "REF"]
+# Columnas de códigos: se buscan por prefijo cuando el texto parece un código
+COLUMNAS_CODIGO = {"PARTIDA", "REF"}
+# Columnas de estado que cambian después de la emisión
+COLUMNAS_ESTADO = ["APROB_DESPACH", "DESPACHADO", "CERRADO"]
+# Horas entre reconstrucciones completas del índice (corren la ventana de DIAS_INDICE días y
+# recogen cambios en columnas que no son de estado)
+HORAS_RECONSTRUCCION = 6
+
+QUERY_INDICE = """
+    SELECT a.IdDocumento_OrdenProduccion AS ID,
+           a.dtFechaEmision AS F_EMISION,
+           a.CoddocOrdenProduccion as PARTIDA,
+           LEFT (F.ntDescripcion,30) AS DESCRIP,
+           F.dCantidadProgramado AS KG_CRUDO,
+           f.dCantidadRequerido AS KG_PRODUC,
+           a.nvDocumentoReferencia as REF,
+           g.NommaeColor AS COLOR,
+           a.bCierreAprobado AS APROB_DESPACH,
+           a.bProduccionAprobado as DESPACHADO,
+           a.bcerrado AS CERRADO,
+           convert(varchar(15), h.NommaeAnexoCliente) AS Cliente,
+           h.NommaeAnexoCliente AS CLIENTE_BUSQ
+    FROM docOrdenProduccion a WITH (NOLOCK)
+    INNER JOIN docOrdenProduccionItem f WITH (NOLOCK)
+        ON f.IdDocumento_OrdenProduccion= a.IdDocumento_OrdenProduccion
+    INNER JOIN maeColor g WITH (NOLOCK)
+        ON g.IdmaeColor= a.IdmaeColor
+    INNER JOIN maeAnexoCliente h WITH (NOLOCK)
+        ON h.IdmaeAnexo_Cliente= a.IdmaeAnexo_Cliente
+    WHERE a.IdtdDocumentoForm = 138
+    AND a.dtFechaEmision >= ?
+"""
+
+# Estados actuales de las partidas de la ventana (columnas livianas, sin el detalle por ítem)
+QUERY_ESTADOS = """
+    SELECT a.IdDocumento_OrdenProduccion AS ID,
+           a.bCierreAprobado AS APROB_DESPACH,
+           a.bProduccionAprobado as DESPACHADO,
+           a.bcerrado AS CERRADO
+    FROM docOrdenProduccion a WITH (NOLOCK)
+    WHERE a.IdtdDocumentoForm = 138
+    AND a.dtFechaEmision >= ?
+"""
+
+
+def parece_codigo(texto):
+    """Indica si el texto parece un código (sin espacios y con al menos un dígito)."""
+    return bool(re.fullmatch(r"[A-Za-z0-9\-_/.]+", texto)) and any(c.isdigit() for c in texto)
+
+
+def ngramas(texto, n=N_GRAMA):
+    """Devuelve el conjunto de n-gramas de un texto."""
+    return {texto[i:i + n] for i in range(len(texto) - n + 1)}
+
+
+class IndicePartidas:
+    """Índice en memoria de las partidas recientes (formulario 138) para búsquedas sin ir a SQL Server.
+
+    Las columnas de búsqueda se guardan como arreglos numpy en minúsculas y cada una tiene
+    un índice invertido de n-gramas (n-grama -> filas) para resolver búsquedas por contenido.
+    """
+
+    def __init__(self, conectar, dias=DIAS_INDICE):
+        self.conectar = conectar
+        self.dias = dias
+        self.desde = None
+        self.datos = pd.DataFrame()
+        self.columnas = {}
+        self.postings = {col: {} for col in COLUMNAS_BUSQUEDA}
+        self.activo = np.zeros(0, dtype=bool)
+        self.marca_agua = None
+        self.actualizado = None
+        self.reconstruido = None
+        self._lock = threading.Lock()
+
+    def _leer(self, nombre, query, desde):
+        conn, t_conexion = conectar_medido(self.conectar)
+        df = leer_sql(f"indicepartidas.{nombre}", query, conn, params=(desde,), t_conexion=t_conexion)
+        conn.close()
+        return df
+
+    def _indexar(self, nuevos, inicio):
+        """Agrega las filas nuevas a los arreglos columnares y a los índices de n-gramas."""
+        for col in COLUMNAS_BUSQUEDA:
+            valores = nuevos[col].fillna("").astype(str).str.lower().to_numpy(dtype=str)
+            previos = self.columnas.get(col, np.array([], dtype=str))
+            self.columnas[col] = np.concatenate([previos, valores])
+            nuevos_postings = defaultdict(list)
+            for fila, texto in enumerate(valores, start=inicio):
+                for grama in ngramas(texto):
+                    nuevos_postings[grama].append(fila)
+            # Las filas se agregan en orden creciente, así cada lista queda ordenada y sin duplicados
+            postings = self.postings[col]
+            for grama, filas in nuevos_postings.items():
+                filas = np.array(filas, dtype=np.int32)
+                previas = postings.get(grama)
+                postings[grama] = filas if previas is None else np.concatenate([previas, filas])
+
+    def actualizar(self):
+        """Carga las partidas emitidas desde la última marca de agua, reemplaza las que ya estaban
+        y refresca los estados (aprobación, despacho, cierre) de las ya indexadas. Cada
+        HORAS_RECONSTRUCCION reconstruye el índice completo con la ventana corrida a hoy, así
+        no crece sin límite."""
+        with self._lock:
+            ahora = datetime.now()
+            if self.reconstruido is None or ahora - self.reconstruido > timedelta(hours=HORAS_RECONSTRUCCION):
+                return self._reconstruir(ahora)
+            nuevos = self._leer("leer", QUERY_INDICE, self.marca_agua)
+            if not nuevos.empty:
+                # Las filas de partidas que vuelven a llegar se desactivan y se reindexan
+                self.activo &= ~self.datos["ID"].isin(nuevos["ID"]).to_numpy()
+                inicio = len(self.datos)
+                self._indexar(nuevos, inicio)
+                self.datos = pd.concat([self.datos, nuevos], ignore_index=True)
+                self.activo = np.concatenate([self.activo, np.ones(len(nuevos), dtype=bool)])
+                self.marca_agua = nuevos["F_EMISION"].max()
+                if self.activo.mean() < 0.8:
+                    self._compactar()
+            self._refrescar_estados()
+            self.actualizado = ahora
+            return len(nuevos)
+
+    def _reconstruir(self, ahora):
+        """Vuelve a leer toda la ventana de `dias` días hasta hoy y rehace los índices."""
+        self.desde = ahora - timedelta(days=self.dias)
+        datos = self._leer("leer", QUERY_INDICE, self.desde)
+        self.columnas = {}
+        self.postings = {col: {} for col in COLUMNAS_BUSQUEDA}
+        self._indexar(datos, 0)
+        self.datos = datos
+        self.activo = np.ones(len(datos), dtype=bool)
+        self.marca_agua = datos["F_EMISION"].max() if not datos.empty else self.desde
+        self.reconstruido = self.actualizado = ahora
+        return len(datos)
+
+    def _refrescar_estados(self):
+        """Actualiza las columnas de estado de las filas indexadas (no son columnas de búsqueda,
+        así que no hace falta reindexar)."""
+        if self.datos.empty:
+            return
+        estados = self._leer("estados", QUERY_ESTADOS, self.desde).drop_duplicates("ID").set_index("ID")
+        for col in COLUMNAS_ESTADO:
+            actuales = self.datos["ID"].map(estados[col])
+            self.datos[col] = actuales.where(actuales.notna(), self.datos[col]).infer_objects()
+
+    def _compactar(self):
+        """Reconstruye los arreglos e índices descartando las filas desactivadas."""
+        datos = self.datos[self.activo].reset_index(drop=True)
+        self.columnas = {}
+        self.postings = {col: {} for col in COLUMNAS_BUSQUEDA}
+        self._indexar(datos, 0)
+        self.datos = datos
+        self.activo = np.ones(len(datos), dtype=bool)
+
+    def _filas_columna(self, col, texto):
+        """Filas cuya columna coincide con el texto, con las mismas reglas que la búsqueda en SQL
+        Server (partida.condicion): igual si viene entre comillas, por prefijo si la columna es
+        de código y el texto lo parece, y por contenido en otro caso."""
+        valores = self.columnas[col]
+        if len(texto) > 1 and texto[0] == texto[-1] == '"':
+            return np.flatnonzero(valores == texto[1:-1])
+        if col in COLUMNAS_CODIGO and parece_codigo(texto):
+            def coincide(v):
+                return np.char.startswith(v, texto)
+        else:
+            def coincide(v):
+                return np.char.find(v, texto) >= 0
+        if len(texto) < N_GRAMA:
+            return np.flatnonzero(coincide(valores))
+        candidatas = None
+        for grama in ngramas(texto):
+            filas = self.postings[col].get(grama)
+            if filas is None:
+                return np.array([], dtype=np.int32)
+            candidatas = filas if candidatas is None else np.intersect1d(candidatas, filas, assume_unique=True)
+        # Los n-gramas solo filtran candidatas; se confirma la coincidencia del texto
+        return candidatas[coincide(valores[candidatas])]
+
+    def buscar(self, partida="", color="", cliente="", ref="", limite=None):
+        """Busca por contenido en las columnas indicadas (los campos vacíos no filtran)."""
+        filtros = zip(COLUMNAS_BUSQUEDA, [partida, color, cliente, ref])
+        with self._lock:
+            filas = np.flatnonzero(self.activo)
+            for col, texto in filtros:
+                texto = texto.strip().lower()
+                if texto:
+                    filas = np.intersect1d(filas, self._filas_columna(col, texto))
+            resultado = self.datos.iloc[filas[::-1]]
+        if limite is not None:
+            resultado = resultado.head(limite)
+        return resultado.drop(columns=["ID", "F_EMISION", "CLIENTE_BUSQ"]).reset_index(drop=True)
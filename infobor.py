@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+from ingesta import leer_excel
 
 def transform_table(df):
     # Inicializar una lista para almacenar los datos transformados
@@ -49,7 +50,7 @@ def main():
     if uploaded_file:
         try:
             # Leer el archivo Excel
-            df = pd.read_excel(uploaded_file)
+            df = leer_excel(uploaded_file)
 
             # Asegurarse de que la estructura del DataFrame sea la esperada
             required_columns = ['GRAFICO', 'QTY', 'TDX', 'TMX']
@@ -0,0 +1,39 @@
+import hashlib
+import importlib.util
+import io
+
+import pandas as pd
+import streamlit as st
+
+# Motor de lectura: calamine (Rust, mucho más rápido) si está instalado; si no, openpyxl,
+# que pandas ya abre en modo read_only.
+MOTOR_EXCEL = 'calamine' if importlib.util.find_spec('python_calamine') else 'openpyxl'
+
+
+def huella_archivo(contenido):
+    """Huella del contenido del archivo, usada como clave de la cache."""
+    return hashlib.blake2b(contenido, digest_size=16).hexdigest()
+
+
+@st.cache_data(max_entries=20, show_spinner="Leyendo archivo...")
+def _leer_excel(huella, _contenido, columnas, hoja, motor, dtype_backend):
+    # `_contenido` no entra en la clave de la cache de Streamlit; la clave es la huella
+    usecols = (lambda col: col in columnas) if columnas else None
+    return pd.read_excel(io.BytesIO(_contenido), sheet_name=hoja, usecols=usecols,
+                         engine=motor, dtype_backend=dtype_backend)
+
+
+def leer_excel(archivo, columnas=None, hoja=0, dtype_backend=None):
+    """Lee un Excel subido con st.file_uploader una sola vez por contenido de archivo.
+
+    Las siguientes interacciones con la página reutilizan el DataFrame cacheado. Con `columnas`
+    solo se cargan esas columnas (las que no existan se ignoran). Por defecto los tipos son los
+    mismos de pd.read_excel; dtype_backend='pyarrow' ocupa menos memoria en textos, pero cambia
+    lo que ve la app (pd.NA en lugar de NaN, escalares de Arrow en iterrows), así que cada app
+    debe revisarse antes de usarlo.
+    """
+    contenido = archivo.getvalue()
+    columnas = tuple(columnas) if columnas else None
+    # openpyxl no lee el formato .xls antiguo; en ese caso pandas elige el motor
+    motor = MOTOR_EXCEL if MOTOR_EXCEL == 'calamine' or not archivo.name.lower().endswith('.xls') else None
+    return _leer_excel(huella_archivo(contenido), contenido, columnas, hoja, motor, dtype_backend)
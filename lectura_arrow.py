@@ -0,0 +1,119 @@
+from time import perf_counter
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+from sqlalchemy import create_engine
+from sqlalchemy.engine import URL
+
+from medicion import registrar
+
+# Filas que se traen del servidor por bloque
+FILAS_BLOQUE = 20_000
+# Nombres de motor iguales a los de medicion
+BACKENDS = {"mssql": "sqlserver", "postgresql": "postgres"}
+
+
+# Credenciales en .streamlit/secrets.toml, una sección por motor (todas las páginas corren en el
+# mismo proceso y comparten el archivo):
+#
+#   [sqlserver]                 [postgres]
+#   server = "..."              host = "..."
+#   database = "..."            port = 5432
+#   username = "..."            database = "..."
+#   password = "..."            user = "..."
+#                               password = "..."
+@st.cache_resource
+def motor_sqlserver(seccion="sqlserver"):
+    """Engine de SQLAlchemy para SQL Server, uno por proceso y por sección de los secrets."""
+    datos = st.secrets[seccion]
+    cadena = (
+        "driver={ODBC Driver 17 for SQL Server};"
+        "server=" + datos["server"] + ";"
+        "database=" + datos["database"] + ";"
+        "uid=" + datos["username"] + ";"
+        "pwd=" + datos["password"] + ";"
+    )
+    return create_engine(URL.create("mssql+pyodbc", query={"odbc_connect": cadena}), pool_pre_ping=True)
+
+
+@st.cache_resource
+def motor_postgres(seccion="postgres"):
+    """Engine de SQLAlchemy para PostgreSQL, uno por proceso y por sección de los secrets."""
+    datos = st.secrets[seccion]
+    url = URL.create(
+        "postgresql+psycopg2",
+        host=datos["host"],
+        port=datos["port"],
+        database=datos["database"],
+        username=datos["user"],
+        password=datos["password"],
+    )
+    return create_engine(url, pool_pre_ping=True)
+
+
+def poner_timeout(conn, segundos):
+    """Límite de tiempo por consulta para esta conexión: en PostgreSQL dura hasta el fin de la
+    transacción (SET LOCAL); en SQL Server es el timeout de consulta de pyodbc."""
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(segundos * 1000)}")
+    elif conn.dialect.name == "mssql":
+        conn.connection.dbapi_connection.timeout = int(segundos)
+
+
+def _bloque_arrow(columnas, filas):
+    """Convierte un bloque de filas (tuplas) en una tabla de Arrow, columna por columna."""
+    valores = list(zip(*filas))
+    return pa.table({col: pa.array(valores[i]) for i, col in enumerate(columnas)})
+
+
+def leer_arrow(nombre, query, engine, params=None, filas_bloque=FILAS_BLOQUE, timeout=None):
+    """Ejecuta la consulta (SQL del driver, con sus marcadores ? o %s) y arma un DataFrame
+    con tipos de Arrow, leyendo el resultado por bloques.
+
+    En PostgreSQL se usa un cursor del lado del servidor, así el cliente nunca tiene todas las
+    filas como tuplas de Python a la vez; en SQL Server pyodbc ya lee el resultado por partes
+    con fetchmany. Cada bloque pasa a columnas de Arrow antes de leer el siguiente.
+    Con `timeout` (segundos) el servidor cancela la consulta si tarda más.
+    Registra los tiempos en medicion con el nombre indicado.
+    """
+    backend = BACKENDS.get(engine.dialect.name, engine.dialect.name)
+    # Una lista de parámetros se interpretaría como varias ejecuciones (executemany)
+    params = tuple(params) if params is not None else None
+    t_conexion = t_ejecucion = None
+    inicio = perf_counter()
+    try:
+        with engine.connect() as conn:
+            t_conexion = perf_counter() - inicio
+            if timeout:
+                poner_timeout(conn, timeout)
+            if engine.dialect.supports_server_side_cursors:
+                conn = conn.execution_options(stream_results=True, max_row_buffer=filas_bloque)
+            try:
+                inicio = perf_counter()
+                resultado = conn.exec_driver_sql(query, params) if params is not None else conn.exec_driver_sql(query)
+                t_ejecucion = perf_counter() - inicio
+
+                inicio = perf_counter()
+                columnas = list(resultado.keys())
+                bloques = [_bloque_arrow(columnas, filas) for filas in resultado.partitions(filas_bloque)]
+                t_lectura = perf_counter() - inicio
+            finally:
+                if timeout and engine.dialect.name == "mssql":
+                    conn.connection.dbapi_connection.timeout = 0  # la conexión vuelve al pool sin límite
+    except Exception as e:
+        registrar(nombre, backend, params, t_conexion=t_conexion, t_ejecucion=t_ejecucion,
+                  error=f"{type(e).__name__}: {e}"[:500])
+        raise
+
+    inicio = perf_counter()
+    if bloques:
+        # "permissive" unifica tipos entre bloques (por ejemplo, una columna toda nula en un bloque)
+        tabla = pa.concat_tables(bloques, promote_options="permissive")
+    else:
+        tabla = pa.table({col: pa.array([], type=pa.null()) for col in columnas})
+    df = tabla.to_pandas(types_mapper=pd.ArrowDtype)
+    t_dataframe = perf_counter() - inicio
+    registrar(nombre, backend, params, filas=len(df), bytes_=int(df.memory_usage(deep=True).sum()),
+              t_conexion=t_conexion, t_ejecucion=t_ejecucion, t_lectura=t_lectura, t_dataframe=t_dataframe)
+    return df
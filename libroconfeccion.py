@@ -0,0 +1,107 @@
+import pandas as pd
+
+from almacen_local import conectar_local, fechas_a_texto, upsert
+from medicion import leer_sql
+
+# Días que se vuelven a leer antes de la última nota copiada, para recoger notas anuladas
+# o con ítems agregados después de la última sincronización
+DIAS_REPASO = 3
+
+# Notas de salida (form 130) y de retorno (form 131) de confección, agrupadas por nota y OP.
+# Solo trae notas con Id mayor a la marca de agua o registradas dentro de la ventana de repaso.
+QUERY_NOTAS = """
+select a.IdDocumento_NotaInventario AS ID_NOTA,
+    CASE a.IdtdDocumentoForm WHEN 130 THEN 'ENVIADO' ELSE 'RETORNADO' END AS TIPO,
+    c.CoddocOrdenProduccion AS OP, a.dtFechaRegistro as FECHA,
+    d.NommaeAnexoProveedor AS PROVEEDOR,
+    SUM(CASE a.IdtdDocumentoForm WHEN 130 THEN b.dCantidadSal ELSE b.dCantidadIng END) AS UNIDADES
+from docNotaInventario a
+inner join docNotaInventarioItem b on a.IdDocumento_NotaInventario = b.IdDocumento_NotaInventario
+inner join docOrdenProduccion c on a.IdDocumento_OrdenProduccion = c.IdDocumento_OrdenProduccion
+inner join maeAnexoProveedor d on a.IdmaeAnexo = d.IdmaeAnexo_Proveedor
+where (a.IdDocumento_NotaInventario > ? OR a.dtFechaRegistro >= ?)
+    and a.dtFechaRegistro > '01-10-2024'
+    and a.bAnulado= 0
+    and a.IdmaeSunatCTipoComprobantePago = 10
+    and c.IdmaeAnexo_Cliente = 2533
+    and (
+        (a.IdtdDocumentoForm = 130
+         and a.IdmaeAnexo IN (248,5526, 321, 5512,60,64, 6640)
+         and a.IdmaeTransaccionNota = 17
+         and b.dCantidadSal > 0)
+     or (a.IdtdDocumentoForm = 131
+         and a.IdmaeAnexo IN (248,5526))
+    )
+GROUP BY a.IdDocumento_NotaInventario, a.IdtdDocumentoForm, c.CoddocOrdenProduccion,
+    a.dtFechaRegistro, d.NommaeAnexoProveedor
+"""
+
+
+def crear_tablas(conn):
+    """Crea el libro local de notas de confección si no existe."""
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS confeccion_notas (
+            "ID_NOTA" INTEGER,
+            "TIPO" TEXT,
+            "OP" TEXT,
+            "FECHA" TEXT,
+            "PROVEEDOR" TEXT,
+            "UNIDADES" REAL,
+            PRIMARY KEY ("ID_NOTA", "TIPO", "OP")
+        );
+        CREATE INDEX IF NOT EXISTS confeccion_notas_fecha ON confeccion_notas ("FECHA");
+    """)
+
+
+def marca_agua(conn):
+    """Último Id de nota copiado y fecha desde la que se repasan las notas (None si el libro está vacío)."""
+    id_nota, fecha = conn.execute('SELECT MAX("ID_NOTA"), MAX("FECHA") FROM confeccion_notas').fetchone()
+    if id_nota is None:
+        return 0, None
+    return id_nota, (pd.Timestamp(fecha) - pd.Timedelta(days=DIAS_REPASO)).to_pydatetime()
+
+
+def sincronizar_notas(conn_erp):
+    """Copia al libro local las notas nuevas y las de la ventana de repaso; devuelve las filas leídas."""
+    conn = conectar_local()
+    try:
+        crear_tablas(conn)
+        id_nota, repaso = marca_agua(conn)
+        # Con el libro vacío se usa una fecha futura para que solo cuente el filtro por Id
+        nuevos = leer_sql("libroconfeccion.sincronizar_notas", QUERY_NOTAS, conn_erp,
+                          params=(id_nota, repaso or pd.Timestamp('2100-01-01').to_pydatetime()))
+        if repaso is not None:
+            # Lo que estaba en la ventana de repaso se reemplaza por lo leído (las anuladas desaparecen)
+            conn.execute('DELETE FROM confeccion_notas WHERE "FECHA" >= ?', (repaso.strftime("%Y-%m-%d %H:%M:%S"),))
+            conn.commit()
+        return upsert(conn, "confeccion_notas", fechas_a_texto(nuevos, ["FECHA"]))
+    finally:
+        conn.close()
+
+
+def reconstruir_libro(conn_erp):
+    """Borra el libro local y lo vuelve a cargar completo desde el ERP."""
+    conn = conectar_local()
+    try:
+        crear_tablas(conn)
+        conn.execute("DELETE FROM confeccion_notas")
+        conn.commit()
+    finally:
+        conn.close()
+    return sincronizar_notas(conn_erp)
+
+
+def totales_por_op(tipo):
+    """Totales por OP del libro local para ENVIADO o RETORNADO (fecha y proveedor mínimos, como el reporte)."""
+    conn = conectar_local()
+    try:
+        crear_tablas(conn)
+        df = pd.read_sql(
+            'SELECT "OP", MIN("FECHA") AS FECHA, MIN("PROVEEDOR") AS PROVEEDOR, SUM("UNIDADES") AS UNIDADES '
+            'FROM confeccion_notas WHERE "TIPO" = ? GROUP BY "OP"',
+            conn, params=(tipo,),
+        )
+    finally:
+        conn.close()
+    df["FECHA"] = pd.to_datetime(df["FECHA"])
+    return df
@@ -0,0 +1,161 @@
+import hashlib
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from time import perf_counter
+
+import pandas as pd
+
+from almacen_local import conectar_local
+
+# Base local donde se registran los tiempos de las consultas
+BASE_METRICAS = "metricas.db"
+# Poner MEDIR_CONSULTAS=0 para no registrar nada
+MEDIR_CONSULTAS = os.environ.get("MEDIR_CONSULTAS", "1") != "0"
+
+BACKENDS = {"pyodbc": "sqlserver", "psycopg2": "postgres", "sqlite3": "sqlite"}
+
+
+def crear_tablas(conn):
+    """Crea la tabla local de tiempos de consultas si no existe."""
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS consultas (
+            "FECHA" TEXT,
+            "NOMBRE" TEXT,
+            "BACKEND" TEXT,
+            "HASH_PARAMS" TEXT,
+            "FILAS" INTEGER,
+            "BYTES" INTEGER,
+            "T_CONEXION" REAL,
+            "T_EJECUCION" REAL,
+            "T_LECTURA" REAL,
+            "T_DATAFRAME" REAL,
+            "T_TOTAL" REAL,
+            "ERROR" TEXT
+        );
+        CREATE INDEX IF NOT EXISTS consultas_fecha ON consultas ("FECHA");
+    """)
+
+
+def backend_de(conn):
+    """Nombre del motor según el módulo de la conexión (sqlserver, postgres, sqlite)."""
+    # Las conexiones del pool de SQLAlchemy envuelven a la del driver
+    conn = getattr(conn, "driver_connection", conn)
+    modulo = type(conn).__module__.split(".")[0]
+    return BACKENDS.get(modulo, modulo)
+
+
+def hash_params(params):
+    """Huella corta de los parámetros, para agrupar llamadas iguales sin guardar los valores."""
+    if params is None:
+        return None
+    return hashlib.blake2b(repr(params).encode(), digest_size=8).hexdigest()
+
+
+def registrar(nombre, backend, params=None, filas=None, bytes_=None, t_conexion=None,
+              t_ejecucion=None, t_lectura=None, t_dataframe=None, error=None):
+    """Guarda una medición. Un fallo al registrar nunca interrumpe la aplicación."""
+    if not MEDIR_CONSULTAS:
+        return
+    tiempos = [t for t in (t_conexion, t_ejecucion, t_lectura, t_dataframe) if t is not None]
+    fila = (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), nombre, backend, hash_params(params),
+            filas, bytes_, t_conexion, t_ejecucion, t_lectura, t_dataframe, sum(tiempos), error)
+    try:
+        conn = conectar_local(BASE_METRICAS)
+        try:
+            crear_tablas(conn)
+            conn.execute("INSERT INTO consultas VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", fila)
+            conn.commit()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        pass
+
+
+def conectar_medido(conectar, *args, **kwargs):
+    """Abre una conexión con la función `conectar` y devuelve (conexión, segundos que tomó)."""
+    inicio = perf_counter()
+    conn = conectar(*args, **kwargs)
+    return conn, perf_counter() - inicio
+
+
+def leer_sql(nombre, query, conn, params=None, t_conexion=None):
+    """Equivalente de pd.read_sql para conexiones DB-API que registra tiempos de ejecución,
+    lectura de filas y armado del DataFrame, además de filas y bytes devueltos."""
+    backend = backend_de(conn)
+    t_ejecucion = t_lectura = None
+    inicio = perf_counter()
+    cur = conn.cursor()
+    try:
+        if params is None:
+            cur.execute(query)
+        else:
+            cur.execute(query, params)
+        t_ejecucion = perf_counter() - inicio
+
+        inicio = perf_counter()
+        filas = cur.fetchall()
+        columnas = [col[0] for col in cur.description]
+        t_lectura = perf_counter() - inicio
+    except Exception as e:
+        registrar(nombre, backend, params, t_conexion=t_conexion, t_ejecucion=t_ejecucion,
+                  t_lectura=t_lectura, error=f"{type(e).__name__}: {e}"[:500])
+        raise
+    finally:
+        cur.close()
+
+    inicio = perf_counter()
+    df = pd.DataFrame.from_records([tuple(fila) for fila in filas], columns=columnas, coerce_float=True)
+    t_dataframe = perf_counter() - inicio
+    registrar(nombre, backend, params, filas=len(df), bytes_=int(df.memory_usage(deep=True).sum()),
+              t_conexion=t_conexion, t_ejecucion=t_ejecucion, t_lectura=t_lectura, t_dataframe=t_dataframe)
+    return df
+
+
+@contextmanager
+def medir(nombre, conn, params=None, t_conexion=None):
+    """Mide un bloque que ejecuta sentencias por su cuenta (INSERT, UPDATE, cursores propios).
+
+    Dentro del bloque se puede asignar `medicion['filas']` con las filas afectadas o leídas.
+    """
+    medicion = {"filas": None}
+    inicio = perf_counter()
+    try:
+        yield medicion
+    except Exception as e:
+        registrar(nombre, backend_de(conn), params, t_conexion=t_conexion,
+                  t_ejecucion=perf_counter() - inicio, error=f"{type(e).__name__}: {e}"[:500])
+        raise
+    registrar(nombre, backend_de(conn), params, filas=medicion["filas"], t_conexion=t_conexion,
+              t_ejecucion=perf_counter() - inicio)
+
+
+def leer_mediciones(dias=7):
+    """Mediciones de los últimos `dias` días, con FECHA como datetime."""
+    conn = conectar_local(BASE_METRICAS)
+    try:
+        crear_tablas(conn)
+        desde = (pd.Timestamp.now() - pd.Timedelta(days=dias)).strftime("%Y-%m-%d %H:%M:%S")
+        df = pd.read_sql('SELECT * FROM consultas WHERE "FECHA" >= ?', conn, params=(desde,))
+    finally:
+        conn.close()
+    df["FECHA"] = pd.to_datetime(df["FECHA"])
+    return df
+
+
+def resumen_por_consulta(df):
+    """Percentiles del tiempo total y promedios por fase, por consulta y motor."""
+    if df.empty:
+        return pd.DataFrame()
+    grupos = df.groupby(["NOMBRE", "BACKEND"])
+    resumen = grupos["T_TOTAL"].quantile([0.5, 0.9, 0.99]).unstack()
+    resumen.columns = ["P50", "P90", "P99"]
+    resumen.insert(0, "LLAMADAS", grupos.size())
+    resumen["ERRORES"] = grupos["ERROR"].count()
+    resumen["MAX"] = grupos["T_TOTAL"].max()
+    fases = grupos[["T_CONEXION", "T_EJECUCION", "T_LECTURA", "T_DATAFRAME"]].mean()
+    resumen = resumen.join(fases.add_prefix("PROM_"))
+    resumen["FILAS_PROM"] = grupos["FILAS"].mean()
+    resumen["MB_PROM"] = grupos["BYTES"].mean() / 2**20
+    return resumen.round(4).sort_values("P90", ascending=False).reset_index()
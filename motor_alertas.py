@@ -0,0 +1,99 @@
+"""Piezas comunes de los motores de alertas (alertaspartidas.py, alertasavance.py).
+
+Cada corrida calcula las filas en alerta, las compara con las de la corrida anterior (tabla de
+vigentes en la base local) y agrega a la bandeja solo las nuevas o las que cambiaron en la
+columna de comparación. Cada corrida queda registrada en la tabla corridas_alertas.
+"""
+import argparse
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from almacen_local import conectar_local
+
+# Registro de corridas de todos los motores (MOTOR, CORRIDA, VIGENTES, NUEVAS)
+TABLA_CORRIDAS = 'corridas_alertas'
+
+
+def leer_vigentes(tabla, columnas):
+    """Filas en alerta de la última corrida; si el motor nunca corrió, un DataFrame vacío con `columnas`."""
+    conn = conectar_local()
+    try:
+        return pd.read_sql(f'SELECT * FROM "{tabla}"', conn)
+    except pd.errors.DatabaseError:
+        return pd.DataFrame(columns=columnas)
+    finally:
+        conn.close()
+
+
+def nuevas_o_cambiadas(actuales, anteriores, claves, columna):
+    """Filas de `actuales` que no estaban en la corrida anterior o cuya `columna` cambió."""
+    if anteriores.empty:
+        return actuales
+    # Las claves se comparan como texto: en la base local pueden haber quedado con otro tipo
+    previas = anteriores[claves + [columna]].astype({c: str for c in claves})
+    # Una fila por clave: con claves repetidas el merge tendría más filas que `actuales`
+    previas = previas.drop_duplicates(claves, keep='last').rename(columns={columna: f'{columna}_ANTERIOR'})
+    cruce = actuales[claves + [columna]].astype({c: str for c in claves}).merge(previas, on=claves, how='left')
+    return actuales[(cruce[f'{columna}_ANTERIOR'] != cruce[columna]).to_numpy()]
+
+
+def guardar_corrida(motor, actuales, claves, columna, tabla_vigentes, tabla_alertas, archivo_csv=None):
+    """Compara `actuales` con la corrida anterior, reemplaza las vigentes, agrega las alertas nuevas
+    o cambiadas a la bandeja (y al CSV, si se indica) y registra la corrida.
+    Devuelve (filas en alerta, alertas nuevas o cambiadas)."""
+    corrida = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    actuales = actuales.assign(CORRIDA=corrida)
+    alertas = nuevas_o_cambiadas(actuales, leer_vigentes(tabla_vigentes, list(actuales.columns)), claves, columna)
+
+    local = conectar_local()
+    try:
+        actuales.to_sql(tabla_vigentes, local, if_exists='replace', index=False)
+        if not alertas.empty:
+            alertas.to_sql(tabla_alertas, local, if_exists='append', index=False)
+        # Registro de corridas: el tablero distingue "sin corridas" de "corrida sin alertas"
+        pd.DataFrame([{'MOTOR': motor, 'CORRIDA': corrida, 'VIGENTES': len(actuales), 'NUEVAS': len(alertas)}]).to_sql(
+            TABLA_CORRIDAS, local, if_exists='append', index=False)
+    finally:
+        local.close()
+
+    if archivo_csv and not alertas.empty:
+        alertas.to_csv(archivo_csv, mode='a', index=False, header=not os.path.exists(archivo_csv))
+    return len(actuales), len(alertas)
+
+
+def ultima_corrida(motor):
+    """Fecha y hora de la última corrida del motor, o None si todavía no corrió."""
+    conn = conectar_local()
+    try:
+        return conn.execute(f"SELECT MAX(CORRIDA) FROM {TABLA_CORRIDAS} WHERE MOTOR = ?", (motor,)).fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        conn.close()
+
+
+def argumentos(descripcion, intervalo):
+    """Parser con las opciones comunes: --intervalo (minutos), --csv y --una-vez."""
+    parser = argparse.ArgumentParser(description=descripcion)
+    parser.add_argument('--intervalo', type=int, default=intervalo, help="minutos entre corridas")
+    parser.add_argument('--csv', default=None, help="archivo CSV de salida (bandeja de alertas)")
+    parser.add_argument('--una-vez', action='store_true', help="ejecutar una sola corrida y salir")
+    return parser
+
+
+def repetir(correr, intervalo, una_vez, mensaje):
+    """Ejecuta `correr()` cada `intervalo` minutos e imprime `mensaje` con sus dos resultados.
+    Un error en una corrida se informa y no detiene el ciclo."""
+    while True:
+        try:
+            en_alerta, nuevas = correr()
+            print(f"{datetime.now():%Y-%m-%d %H:%M} " + mensaje.format(en_alerta, nuevas))
+        except Exception as e:
+            print(f"{datetime.now():%Y-%m-%d %H:%M} error en la corrida: {e}")
+        if una_vez:
+            break
+        time.sleep(intervalo * 60)
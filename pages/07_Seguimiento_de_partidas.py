@@ -0,0 +1,3 @@
+from paginas import ejecutar
+
+ejecutar("seguipartida.py")
@@ -0,0 +1,59 @@
+"""Páginas de la aplicación única (streamlit run app.py).
+
+Cada archivo de pages/ solo ejecuta uno de los scripts de la raíz con ejecutar(), así los
+scripts siguen funcionando solos con streamlit run. Al correr todos en el mismo proceso, los
+pools de conexiones (lectura_arrow), las caches y los módulos compartidos (conexiones,
+consultas_avance, reglas_avance, graficos_pedido) se crean una sola vez por servidor y no
+una vez por app desplegada.
+"""
+import os
+import runpy
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+# Secciones del menú de inicio: (archivo en pages/, título)
+SECCIONES = {
+    "Seguimiento de pedidos": [
+        ("01_Progreso_de_pedidos.py", "Progreso de pedidos consolidado"),
+        ("02_Avance_por_proceso.py", "Avance de procesos por pedido"),
+        ("03_Gantt_del_pedido.py", "Gantt de un pedido"),
+        ("04_Pedidos_por_OP_combo_talla.py", "Pedidos por OP, combo y talla"),
+        ("05_Pedido_por_talla.py", "Pedido por talla"),
+        ("06_Ordenes_de_venta.py", "Gestión de órdenes de venta"),
+    ],
+    "Partidas": [
+        ("07_Seguimiento_de_partidas.py", "Seguimiento de partidas"),
+        ("08_Busqueda_de_partidas.py", "Búsqueda de partidas"),
+    ],
+    "Confección": [
+        ("09_Confeccion_OP_47B.py", "47 B: Confección OP"),
+        ("10_Columnas_47B.py", "Selección de columnas, cuadro 47B"),
+    ],
+    "Tipo de cambio": [
+        ("11_Tipo_de_cambio_SBS.py", "Tipo de cambio SBS"),
+        ("12_Tipo_de_cambio.py", "Tipo de cambio"),
+        ("13_TC_Inforgest.py", "Tabla TC Inforgest"),
+    ],
+    "Archivos": [
+        ("14_Excel_con_datos_de_BD.py", "Excel con datos de la BD"),
+        ("15_Transformacion_de_Excel.py", "Transformación de datos de Excel"),
+        ("16_Transponer_tallas.py", "Transponer tallas y cantidades"),
+        ("17_Codigo_grafico.py", "Extracción de código gráfico"),
+        ("18_Etiquetas_por_codigo.py", "Extractor de etiquetas por código"),
+        ("19_Info_de_PDFs.py", "Extracción de info de PDFs"),
+        ("20_Manejo_de_PDFs.py", "Manejo de PDFs"),
+        ("21_Tablas_de_HTML.py", "Tablas desde archivos HTML"),
+        ("22_Inventario_de_software.py", "Consolidador de inventario de software"),
+        ("23_Visor_XML.py", "Visor de archivos XML"),
+    ],
+    "Otros": [
+        ("24_Cumpleanos.py", "Cumpleaños"),
+        ("25_Consulta_multiples_BD.py", "Consulta de múltiples bases de datos"),
+        ("26_Tiempos_de_consultas.py", "Tiempos de consultas SQL"),
+    ],
+}
+
+
+def ejecutar(script):
+    """Ejecuta un script de la raíz como si se hubiera lanzado con streamlit run."""
+    runpy.run_path(os.path.join(RAIZ, script), run_name="__main__")
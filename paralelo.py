@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as TiempoAgotado
+from time import perf_counter
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+# Tiempo máximo por motor, en segundos. Se aplica en el driver (la consulta se cancela en el
+# servidor) y además como espera máxima del hilo.
+TIMEOUTS = {'mssql': 60, 'postgres': 30}
+# Margen sobre el timeout del driver antes de dejar de esperar al hilo
+MARGEN_ESPERA = 5
+
+
+def en_paralelo(tareas, timeouts=None):
+    """Ejecuta en hilos las funciones sin argumentos de `tareas` ({nombre: función}) y espera
+    a todas. Devuelve {nombre: {'valor', 'error', 'segundos'}}.
+
+    Si una tarea no termina dentro de su timeout (más MARGEN_ESPERA) se deja de esperar, se
+    marca con error y la página sigue; el driver cancela la consulta con su propio timeout.
+    """
+    timeouts = {**TIMEOUTS, **(timeouts or {})}
+    ctx = get_script_run_ctx()
+    resultados = {}
+    # Los hilos heredan el contexto de la sesión para poder usar st.cache_data
+    executor = ThreadPoolExecutor(max_workers=len(tareas), initializer=add_script_run_ctx, initargs=(None, ctx))
+
+    def medir(funcion):
+        inicio = perf_counter()
+        try:
+            return funcion(), None, perf_counter() - inicio
+        except Exception as e:
+            return None, e, perf_counter() - inicio
+
+    inicio = perf_counter()
+    futuros = {nombre: executor.submit(medir, funcion) for nombre, funcion in tareas.items()}
+    for nombre, futuro in futuros.items():
+        limite = timeouts.get(nombre, max(TIMEOUTS.values())) + MARGEN_ESPERA
+        restante = max(0, limite - (perf_counter() - inicio))
+        try:
+            valor, error, segundos = futuro.result(timeout=restante)
+        except TiempoAgotado:
+            futuro.cancel()
+            valor, error, segundos = None, TimeoutError(f"{nombre}: sin respuesta en {limite} s"), perf_counter() - inicio
+        resultados[nombre] = {'valor': valor, 'error': error, 'segundos': segundos}
+    executor.shutdown(wait=False, cancel_futures=True)
+    return resultados
+
+
+def mostrar_tiempos(resultados, etiquetas=None):
+    """Muestra en una línea el tiempo de cada motor y el total de la página."""
+    etiquetas = etiquetas or {}
+    partes = [f"{etiquetas.get(nombre, nombre)}: {r['segundos']:.2f} s" + (" (error)" if r['error'] else "")
+              for nombre, r in resultados.items()]
+    total = max((r['segundos'] for r in resultados.values()), default=0)
+    st.caption(" · ".join(partes) + f" · en paralelo: {total:.2f} s")
@@ -1,23 +1,48 @@
 import streamlit as st
-import pyodbc
-import pandas as pd
+from datetime import datetime, timedelta
+from indicepartidas import IndicePartidas, DIAS_INDICE, parece_codigo
+from medicion import conectar_medido, leer_sql
+from conexiones import conectar_sqlserver
+from carga_diferida import precargar
 
 # Función para conectar a SQL Server usando las credenciales de secrets
 def sql_connection():
-    conn = pyodbc.connect(
-        "driver={odbc driver 17 for sql server};"
-        "server=" + st.secrets["server"] + ";"
-        "database=" + st.secrets["database"] + ";"
-        "uid=" + st.secrets["username"] + ";"
-        "pwd=" + st.secrets["password"] + ";"
-    )
+    conn = conectar_sqlserver()
     return conn
 
 
+# Filas por página de resultados
+FILAS_POR_PAGINA = 100
+# Mínimo de caracteres para lanzar la búsqueda automática
+MIN_CARACTERES = 3
+
+
+def condicion(columna, texto, es_codigo=False):
+    """Arma el predicado para un campo: exacto si va entre comillas, por prefijo si es código
+    (aprovecha el índice) y por contenido en otro caso. Devuelve None si el campo está vacío."""
+    texto = texto.strip()
+    if not texto:
+        return None
+    if len(texto) > 1 and texto[0] == texto[-1] == '"':
+        return f"{columna} = ?", texto[1:-1]
+    if es_codigo and parece_codigo(texto):
+        return f"{columna} LIKE ?", f"{texto}%"
+    return f"{columna} LIKE ?", f"%{texto}%"
+
+
 # Función para ejecutar la consulta SQL con filtros
-def fetch_data(partida, color, cliente, ref):
-    conn = sql_connection()
-    query = """
+@st.cache_data(ttl=300, max_entries=200)
+def fetch_data(partida, color, cliente, ref, pagina=1, por_pagina=FILAS_POR_PAGINA):
+    filtros = [
+        condicion("a.CoddocOrdenProduccion", partida, es_codigo=True),
+        condicion("g.NommaeColor", color),
+        condicion("h.NommaeAnexoCliente", cliente),
+        condicion("a.nvDocumentoReferencia", ref, es_codigo=True),
+    ]
+    filtros = [f for f in filtros if f is not None]
+    where = "".join(f"\n        AND {predicado}" for predicado, _ in filtros)
+
+    query = f"""
         SELECT a.CoddocOrdenProduccion as PARTIDA, 
                LEFT (F.ntDescripcion,30) AS DESCRIP, 
                F.dCantidadProgramado AS KG_CRUDO, 
@@ -35,17 +60,34 @@ def fetch_data(partida, color, cliente, ref):
             ON g.IdmaeColor= a.IdmaeColor
         INNER JOIN maeAnexoCliente h WITH (NOLOCK)
             ON h.IdmaeAnexo_Cliente= a.IdmaeAnexo_Cliente
-        WHERE a.IdtdDocumentoForm = 138
-        AND a.CoddocOrdenProduccion LIKE ? 
-        AND g.NommaeColor LIKE ?
-        AND h.NommaeAnexoCliente LIKE ?
-        AND a.nvDocumentoReferencia LIKE ?
+        WHERE a.IdtdDocumentoForm = 138{where}
+        ORDER BY a.dtFechaEmision DESC, a.CoddocOrdenProduccion
+        OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
     """
-    params = (f'%{partida}%', f'%{color}%', f'%{cliente}%', f'%{ref}%')
-    df = pd.read_sql(query, conn, params=params)
+    params = tuple(valor for _, valor in filtros) + ((pagina - 1) * por_pagina, por_pagina)
+    conn, t_conexion = conectar_medido(sql_connection)
+    df = leer_sql("partida.fetch_data", query, conn, params=params, t_conexion=t_conexion)
     conn.close()
     return df
 
+# Minutos entre actualizaciones incrementales del índice en memoria
+MINUTOS_REFRESCO_INDICE = 5
+
+
+# Índice en memoria compartido por todas las sesiones del servidor
+@st.cache_resource
+def obtener_indice():
+    indice = IndicePartidas(sql_connection)
+    indice.actualizar()
+    return indice
+
+
+def buscar_en_indice(partida, color, cliente, ref):
+    indice = obtener_indice()
+    if datetime.now() - indice.actualizado > timedelta(minutes=MINUTOS_REFRESCO_INDICE):
+        indice.actualizar()
+    return indice.buscar(partida, color, cliente, ref, limite=FILAS_POR_PAGINA)
+
 # Título de la aplicación
 st.title("Búsqueda de Partidas")
 
@@ -55,14 +97,40 @@ color = st.text_input("COLOR:", "")
 cliente = st.text_input("CLIENTE:", "")
 ref = st.text_input("REF:", "")
 
-# Botón para ejecutar la búsqueda
-if st.button("Buscar"):
-    # Obtener resultados
-    resultados = fetch_data(partida, color, cliente, ref)
-    
+col1, col2, col3 = st.columns(3)
+with col1:
+    automatica = st.toggle("Búsqueda automática al escribir", value=False)
+with col2:
+    usar_indice = st.toggle(f"Buscar en memoria (últimos {DIAS_INDICE} días)", value=False)
+with col3:
+    pagina = st.number_input("Página", min_value=1, value=1, disabled=usar_indice)
+
+campos = [partida, color, cliente, ref]
+
+# Botón para ejecutar la búsqueda (o búsqueda automática con un mínimo de caracteres)
+if st.button("Buscar") or (automatica and sum(len(c.strip()) for c in campos) >= MIN_CARACTERES):
+    if not any(c.strip() for c in campos):
+        st.warning("Ingresa al menos un criterio de búsqueda.")
+        st.session_state.pop('criterios_partida', None)
+    else:
+        # Se guardan los criterios: al cambiar de página se repite la búsqueda sin pulsar Buscar
+        st.session_state['criterios_partida'] = campos
+
+if 'criterios_partida' in st.session_state:
+    criterios = st.session_state['criterios_partida']
+    # Obtener resultados (las búsquedas recientes se sirven desde la cache)
+    if usar_indice:
+        resultados = buscar_en_indice(*criterios)
+    else:
+        resultados = fetch_data(*criterios, pagina)
+
     # Mostrar resultados
     if not resultados.empty:
+        if not usar_indice:
+            st.write(f"Página {pagina} ({len(resultados)} filas, máximo {FILAS_POR_PAGINA})")
         st.dataframe(resultados)
     else:
         st.write("No se encontraron resultados.")
 
+# Después de la primera pintura, cargar en segundo plano los módulos diferidos
+precargar()
@@ -1,26 +1,21 @@
 import streamlit as st
-import pyodbc
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
+from conexiones import conectar_sqlserver
+from medicion import conectar_medido, leer_sql
+from carga_diferida import diferido, precargar
+px = diferido("plotly.express")
+go = diferido("plotly.graph_objects")
 
 st.set_page_config(layout="wide")
 
 # Configurar la conexión a la base de datos utilizando las credenciales almacenadas en secrets
 def connect_db():
-    connection = pyodbc.connect(
-        "driver={odbc driver 17 for sql server};"
-        "server=" + st.secrets["server"] + ";"
-        "database=" + st.secrets["database"] + ";"
-        "uid=" + st.secrets["username"] + ";"
-        "pwd=" + st.secrets["password"] + ";"
-    )
-    return connection
+    return conectar_sqlserver()
 
 # Función para ejecutar la consulta SQL
 def run_query(pedido):
-    conn = connect_db()
+    conn, t_conexion = conectar_medido(connect_db)
     query = """SELECT gg.PEDIDO, --gg.IdDocumento_OrdenVenta, 
     	gg.F_EMISION, gg.F_ENTREGA, gg.DIAS, gg.CLIENTE, gg.PO, gg.KG_REQ, 
        gg.KG_ARMP, gg.KG_TENIDP, gg.KG_TELAPROBP, gg.UNID, gg.PROGP, gg.CORTADOP, gg.COSIDOP, 
@@ -246,7 +241,7 @@ WHERE x.CoddocOrdenVenta IS NOT NULL
 ON gg.IdDocumento_OrdenVenta = ff.IdDocumento_OrdenVenta
 WHERE gg.PEDIDO = ?"""
 
-    df = pd.read_sql(query, conn, params=(pedido,))
+    df = leer_sql("pediGantt.run_query", query, conn, params=(pedido,), t_conexion=t_conexion)
     conn.close()
     return df
 
@@ -378,3 +373,6 @@ if st.button("Ejecutar Consulta"):
             st.error(f"Error al ejecutar la consulta: {e}")
     else:
         st.warning("Por favor ingresa un número de pedido.")
+
+# Después de la primera pintura, cargar en segundo plano los módulos diferidos
+precargar()
@@ -1,22 +1,20 @@
 import streamlit as st
 import pandas as pd
-import pyodbc
+from tallas import orden_tallas
+from medicion import conectar_medido, leer_sql
+from conexiones import conectar_sqlserver
+from carga_diferida import precargar
 
 st.set_page_config(layout="wide")
 
 # conexión a la base de datos usando credenciales del archivo secrets
 def get_connection():
-    conn = pyodbc.connect(
-        "driver={odbc driver 17 for sql server};"
-        "server=" + st.secrets["server"] + ";"
-        "database=" + st.secrets["database"] + ";"
-        "uid=" + st.secrets["username"] + ";"
-        "pwd=" + st.secrets["password"] + ";"
-    )
+    conn = conectar_sqlserver()
     return conn
 
-# función para ejecutar la consulta
-def load_data(pedido, estilos):
+# función para traer una sola vez todos los ítems del pedido (cacheado)
+@st.cache_data(ttl=600)
+def load_pedido(pedido):
     query = """
     select 
         a.iddocumento_ordenventa,
@@ -40,17 +38,39 @@ def load_data(pedido, estilos):
         maeestilo f on f.idmaeestilo = a.idmaeestilo
     where 
         b.coddocordenventa = ?
-        {}
-    """.format("and f.nommaeestilo in ({})".format(', '.join('?' * len(estilos))) if estilos else "")
-
-    params = [pedido] + estilos if estilos else [pedido]
+    """
 
-    conn = get_connection()
-    df = pd.read_sql_query(query, conn, params=params)
+    conn, t_conexion = conectar_medido(get_connection)
+    df = leer_sql("pedidotall.load_pedido", query, conn, params=[pedido], t_conexion=t_conexion)
     conn.close()
 
+    # Columnas de texto repetidas como categorías (menos memoria y agrupaciones más rápidas)
+    for col in ['pedido', 'cliente', 'estilo', 'combo']:
+        df[col] = df[col].astype('category')
+    df['talla'] = pd.Categorical(df['talla'], categories=orden_tallas(df['talla'].dropna().unique()), ordered=True)
+
     return df
 
+# función para filtrar los estilos sobre los datos cacheados del pedido
+def load_data(pedido, estilos):
+    df = load_pedido(pedido)
+    if estilos:
+        df = df[df['estilo'].isin(estilos)]
+    return df
+
+# tabla dinámica combo x talla con totales, respetando el orden de tallas
+def tabla_dinamica(df):
+    tabla = (
+        df.groupby(['estilo', 'combo', 'talla'], observed=True)['cant'].sum()
+        .unstack('talla', fill_value=0)
+    )
+    tallas = [t for t in df['talla'].cat.categories if t in tabla.columns]
+    tabla = tabla[tallas]
+    tabla.columns = pd.Index([str(t) for t in tallas], name='talla')
+    tabla['Total'] = tabla.sum(axis=1)
+    total = pd.DataFrame([tabla.sum()], index=pd.MultiIndex.from_tuples([('Total', '')], names=tabla.index.names))
+    return pd.concat([tabla, total])
+
 # sidebar para ingresar el pedido
 pedido_input = st.sidebar.text_input("Ingresa el pedido", "")
 
@@ -59,16 +79,8 @@ estilos_seleccionados = []
 estilos = []  # asegúrate de que `estilos` esté inicializada
 
 if pedido_input:
-    # obtener estilos disponibles para el pedido
-    with get_connection() as conn:
-        estilos_query = """
-        select distinct f.nommaeestilo 
-        from maeestilo f 
-        inner join docordenventaitem a on f.idmaeestilo = a.idmaeestilo 
-        inner join docordenventa b on a.iddocumento_ordenventa = b.iddocumento_ordenventa 
-        where b.coddocordenventa = ?
-        """
-        estilos = pd.read_sql(estilos_query, conn, params=[pedido_input])['nommaeestilo'].tolist()
+    # obtener estilos disponibles para el pedido desde los datos cacheados
+    estilos = sorted(load_pedido(pedido_input)['estilo'].unique())
 
     # sidebar para seleccionar estilos solo si hay estilos disponibles
     if estilos:
@@ -86,18 +98,12 @@ if st.sidebar.button("Consultar"):
             st.write(f"Cliente: {cliente}")
 
             # Crear la tabla dinámica con totales
-            pivot_table = pd.pivot_table(
-                df,
-            values='cant',
-            index=['estilo', 'combo'],      # eje vertical
-            columns=['talla'],        # eje horizontal
-            fill_value=0,
-            margins=True,  # Agrega totales
-            margins_name='Total',  # Nombre para la fila/columna de totales
-            aggfunc='sum'  # Especificar que queremos sumar
-            )
+            pivot_table = tabla_dinamica(df)
             st.write(pivot_table)
         else:
             st.write("No hay resultados para la consulta.")
     else:
         st.warning("Por favor, ingresa un número de pedido.")
+
+# Después de la primera pintura, cargar en segundo plano los módulos diferidos
+precargar()
@@ -1,10 +1,11 @@
 import streamlit as st
-import pyodbc
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import psycopg2
+from conexiones import conectar_postgres, conectar_sqlserver
+from medicion import conectar_medido, leer_sql
+from carga_diferida import diferido, precargar
+px = diferido("plotly.express")
+go = diferido("plotly.graph_objects")
 
 # Configuración de la página
 st.set_page_config(layout="wide")
@@ -12,23 +13,11 @@ st.title("Status progreso de procesos por pedido")
 
 # Funciones de conexión a la base de datos
 def connect_db(db_type='mssql'):
-    """Conecta a la base de datos especificada."""
+    """Conecta a la base de datos especificada (conexión del pool compartido)."""
     if db_type == 'mssql':
-        return pyodbc.connect(
-            "driver={ODBC Driver 17 for SQL Server};"
-            "server=" + st.secrets["msserver"] + ";"
-            "database=" + st.secrets["msdatabase"] + ";"
-            "uid=" + st.secrets["msusername"] + ";"
-            "pwd=" + st.secrets["mspassword"] + ";"
-        )
+        return conectar_sqlserver()
     elif db_type == 'postgres':
-        return psycopg2.connect(
-            host=st.secrets["host"],
-            port=st.secrets["port"],
-            database=st.secrets["database"],
-            user=st.secrets["user"],
-            password=st.secrets["password"]
-        )
+        return conectar_postgres()
     else:
         raise ValueError("Tipo de base de datos no soportado.")
 
@@ -111,7 +100,7 @@ def add_summary_row(df, db_type='mssql'):
 @st.cache_data
 def run_query(pedidos, db_type='mssql'):
     """Ejecuta una consulta en la base de datos especificada."""
-    conn = connect_db(db_type)
+    conn, t_conexion = conectar_medido(connect_db, db_type)
     if db_type == 'mssql':
         query = """
         SELECT gg.PEDIDO, gg.F_EMISION, gg.F_ENTREGA, gg.DIAS, gg.CLIENTE, gg.PO, gg.KG_REQ, 
@@ -357,7 +346,7 @@ def run_query(pedidos, db_type='mssql'):
         raise ValueError("Tipo de base de datos no soportado.")
     
     # Leer los datos
-    df = pd.read_sql(query, conn, params=tuple(pedidos))
+    df = leer_sql(f"probadordecodigo.run_query.{db_type}", query, conn, params=tuple(pedidos), t_conexion=t_conexion)
     
     # Convertir todas las columnas de fecha a solo fecha
     df = convert_date_columns(df)
@@ -511,3 +500,6 @@ if st.button("Ejecutar Consulta"):
             st.exception(e)  # Esto muestra el traceback completo para depuración
     else:
         st.warning("Por favor ingresa un número de pedido.")
+
+# Después de la primera pintura, cargar en segundo plano los módulos diferidos
+precargar()
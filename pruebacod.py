@@ -1,10 +1,16 @@
 import streamlit as st
-import pyodbc
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import psycopg2
+from conexiones import conectar_postgres, conectar_sqlserver
+from medicion import conectar_medido, leer_sql
+from cache_parquet import DIAS_CIERRE, leer_por_periodos, vaciar
+from consultas_avance import (FILTRO_VENTANA, QUERY_AVANCE, query_avance_pedidos, query_plan,
+                              query_versiones, query_versiones_plan)
+from refresco import olvidar, refrescar
+from reglas_avance import evaluar_cacheado, pedidos_completos, procesos_bajos
+from carga_diferida import diferido, precargar
+px = diferido("plotly.express")
+go = diferido("plotly.graph_objects")
 
 # Configuración de la página
 st.set_page_config(layout="wide")
@@ -12,23 +18,11 @@ st.title("Status progreso de procesos por pedido")
 
 # Funciones de conexión a la base de datos
 def connect_db(db_type='mssql'):
-    """Conecta a la base de datos especificada."""
+    """Conecta a la base de datos especificada (conexión del pool compartido)."""
     if db_type == 'mssql':
-        return pyodbc.connect(
-            "driver={ODBC Driver 17 for SQL Server};"
-            "server=" + st.secrets["msserver"] + ";"
-            "database=" + st.secrets["msdatabase"] + ";"
-            "uid=" + st.secrets["msusername"] + ";"
-            "pwd=" + st.secrets["mspassword"] + ";"
-        )
+        return conectar_sqlserver()
     elif db_type == 'postgres':
-        return psycopg2.connect(
-            host=st.secrets["host"],
-            port=st.secrets["port"],
-            database=st.secrets["database"],
-            user=st.secrets["user"],
-            password=st.secrets["password"]
-        )
+        return conectar_postgres()
     else:
         raise ValueError("Tipo de base de datos no soportado.")
 
@@ -48,248 +42,37 @@ def convert_date_columns(df):
     
     return df
 
-# Función para ejecutar consultas (usando st.cache_data)
-@st.cache_data
+# Función para ejecutar consultas (meses cerrados en Parquet, el resto con refresco incremental)
 def run_query(f_entrega_inicio, f_entrega_fin, clientes, db_type='mssql'):
-    """Ejecuta una consulta en la base de datos especificada."""
-    conn = connect_db(db_type)
+    """Ejecuta una consulta en la base de datos especificada. Se consulta primero la versión
+    de cada pedido y solo se vuelven a leer los que cambiaron desde la consulta anterior."""
+    conn, t_conexion = conectar_medido(connect_db, db_type)
     if db_type == 'mssql':
-        query = """
-        SELECT gg.PEDIDO, gg.F_EMISION, gg.F_ENTREGA, gg.DIAS, gg.CLIENTE, gg.PO, gg.KG_REQ, 
-               gg.KG_ARMP, gg.KG_TENIDP, gg.KG_TELAPROBP, gg.UNID, gg.PROGP, gg.CORTADOP, gg.COSIDOP, 
-               ff.FMINARM, ff.FMAXARM, ff.FMINTENID, ff.FMAXTENID, ff.FMINTELAPROB, ff.FMAXTELAPROB, ff.FMINCORTE, ff.FMAXCORTE, ff.FMINCOSIDO, ff.FMAXCOSIDO
-        FROM 
-            (SELECT
-                a.CoddocOrdenVenta AS PEDIDO, 
-                a.IdDocumento_OrdenVenta,
-                CASE WHEN ISDATE(a.dtFechaEmision) = 1 THEN CONVERT(DATE, a.dtFechaEmision) ELSE NULL END AS F_EMISION,
-                CASE WHEN ISDATE(a.dtFechaEntrega) = 1 THEN CONVERT(DATE, a.dtFechaEntrega) ELSE NULL END AS F_ENTREGA,
-                DATEDIFF(day, a.dtFechaEmision, a.dtFechaEntrega) AS DIAS,
-                SUBSTRING(b.NommaeAnexoCliente, 1, 15) AS CLIENTE,
-                a.nvDocumentoReferencia AS PO,
-                CONVERT(INT, COALESCE(d.KG, 0)) AS KG_REQ,
-                FORMAT(CASE WHEN d.KG = 0 THEN 0 ELSE (COALESCE(t.KG_ARM, 0) / d.KG) END, '0%') AS KG_ARMP,
-                FORMAT(CASE WHEN d.KG = 0 THEN 0 ELSE (COALESCE(t.KG_TEÑIDOS, 0) / d.KG) END, '0%') AS KG_TENIDP,
-                FORMAT(CASE WHEN d.KG = 0 THEN 0 ELSE (COALESCE(t.KG_PRODUC, 0) / d.KG) END, '0%') AS KG_TELAPROBP,
-                CONVERT(INT, a.dCantidad) AS UNID,
-                FORMAT(CASE WHEN a.dCantidad = 0 THEN 0 ELSE (COALESCE(programado.PROG, 0) / a.dCantidad) END, '0%') AS PROGP,
-                FORMAT(CASE WHEN a.dCantidad = 0 THEN 0 ELSE (COALESCE(cortado.CORTADO, 0) / a.dCantidad) END, '0%') AS CORTADOP,
-                FORMAT(CASE WHEN a.dCantidad = 0 THEN 0 ELSE (COALESCE(cosido.COSIDO, 0) / a.dCantidad) END, '0%') AS COSIDOP
-            FROM docOrdenVenta a
-            INNER JOIN maeAnexoCliente b ON a.IdmaeAnexo_Cliente = b.IdmaeAnexo_Cliente
-            LEFT JOIN (
-                SELECT
-                    c.IdDocumento_Referencia AS PEDIDO,
-                    SUM(c.dCantidad) AS KG
-                FROM docOrdenVentaItem c
-                WHERE c.IdDocumento_Referencia > 0
-                GROUP BY c.IdDocumento_Referencia
-            ) d ON a.IdDocumento_OrdenVenta = d.PEDIDO
-            LEFT JOIN (
-                SELECT
-                    x.IdDocumento_Referencia AS PEDIDO,
-                    SUM(y.dCantidadProgramado) AS KG_ARM,
-                    SUM(z.bcerrado * y.dCantidadRequerido) AS KG_PRODUC,
-                    SUM(s.bcerrado * y.dCantidadProgramado) AS KG_TEÑIDOS
-                FROM docOrdenProduccionItem y
-                INNER JOIN docOrdenProduccion z ON y.IdDocumento_OrdenProduccion = z.IdDocumento_OrdenProduccion
-                INNER JOIN docOrdenVentaItem x ON (z.IdDocumento_Referencia = x.IdDocumento_OrdenVenta AND y.idmaeItem = x.IdmaeItem)
-                INNER JOIN docOrdenProduccionRuta s ON y.IdDocumento_OrdenProduccion = s.IdDocumento_OrdenProduccion
-                WHERE s.IdmaeReceta > 0
-                GROUP BY x.IdDocumento_Referencia
-            ) t ON a.IdDocumento_OrdenVenta = t.PEDIDO
-            LEFT JOIN (
-                SELECT 
-                    g.IdDocumento_OrdenVenta,
-                    SUM(a.dCantidadProgramado) AS PROG
-                FROM dbo.docOrdenProduccion c WITH (NOLOCK)
-                INNER JOIN dbo.docOrdenProduccionItem a WITH (NOLOCK)
-                    ON c.IdDocumento_OrdenProduccion = a.IdDocumento_OrdenProduccion
-                INNER JOIN dbo.docOrdenVenta g WITH (NOLOCK)
-                    ON c.IdDocumento_Referencia = g.IdDocumento_OrdenVenta
-                INNER JOIN dbo.docOrdenProduccionRuta b WITH (NOLOCK)
-                    ON c.IdDocumento_OrdenProduccion = b.IdDocumento_OrdenProduccion
-                WHERE c.bAnulado = 0
-                    AND c.IdtdDocumentoForm = 127
-                    AND b.IdmaeCentroCosto = 29
-                GROUP BY g.IdDocumento_OrdenVenta
-            ) AS programado
-            ON a.IdDocumento_OrdenVenta = programado.IdDocumento_OrdenVenta
-            LEFT JOIN (
-                SELECT 
-                    g.IdDocumento_OrdenVenta,
-                    SUM(b.dCantidadIng) AS CORTADO
-                FROM dbo.docNotaInventario a WITH (NOLOCK)
-                INNER JOIN dbo.maeCentroCosto a1 WITH (NOLOCK)
-                    ON a.IdmaeCentroCosto = a1.IdmaeCentroCosto
-                    AND a1.bConOrdenProduccion = 1
-                INNER JOIN dbo.docNotaInventarioItem b WITH (NOLOCK)
-                    ON a.IdDocumento_NotaInventario = b.IdDocumento_NotaInventario
-                INNER JOIN dbo.docOrdenProduccion c WITH (NOLOCK)
-                    ON a.IdDocumento_OrdenProduccion = c.IdDocumento_OrdenProduccion
-                INNER JOIN dbo.docOrdenVenta g WITH (NOLOCK)
-                    ON c.IdDocumento_Referencia = g.IdDocumento_OrdenVenta
-                WHERE a.IdtdDocumentoForm = 131
-                    AND a.bDevolucion = 0
-                    AND a.bDesactivado = 0
-                    AND a.bAnulado = 0
-                    AND a.IdmaeCentroCosto = 29
-                GROUP BY g.IdDocumento_OrdenVenta
-            ) AS cortado
-            ON a.IdDocumento_OrdenVenta = cortado.IdDocumento_OrdenVenta
-            LEFT JOIN (
-                SELECT 
-                    g.IdDocumento_OrdenVenta,
-                    SUM(b.dCantidadIng) AS COSIDO
-                FROM dbo.docNotaInventario a WITH (NOLOCK)
-                INNER JOIN dbo.maeCentroCosto a1 WITH (NOLOCK)
-                    ON a.IdmaeCentroCosto = a1.IdmaeCentroCosto
-                    AND a1.bConOrdenProduccion = 1
-                INNER JOIN dbo.docNotaInventarioItem b WITH (NOLOCK)
-                    ON a.IdDocumento_NotaInventario = b.IdDocumento_NotaInventario
-                INNER JOIN dbo.docOrdenProduccion c WITH (NOLOCK)
-                    ON a.IdDocumento_OrdenProduccion = c.IdDocumento_OrdenProduccion
-                INNER JOIN dbo.docOrdenVenta g WITH (NOLOCK)
-                    ON c.IdDocumento_Referencia = g.IdDocumento_OrdenVenta
-                WHERE a.IdtdDocumentoForm = 131
-                    AND a.bDevolucion = 0
-                    AND a.bDesactivado = 0
-                    AND a.bAnulado = 0
-                    AND a.IdmaeCentroCosto = 47
-                GROUP BY g.IdDocumento_OrdenVenta
-            ) AS cosido
-            ON a.IdDocumento_OrdenVenta = cosido.IdDocumento_OrdenVenta
-            WHERE
-                a.IdtdDocumentoForm = 10
-                AND a.IdtdTipoVenta = 4
-                AND a.bAnulado = 0
-                AND a.dtFechaEntrega >= ?
-                AND a.dtFechaEntrega <= ?
-                AND b.NommaeAnexoCliente LIKE ?
-            ) gg
-        INNER JOIN 
-            (SELECT 
-                x.IdDocumento_OrdenVenta,
-                q0.FMINARM,
-                q0.FMAXARM,
-                q1.FMINTENID,
-                q1.FMAXTENID,
-                q2.FMINTELAPROB,
-                q2.FMAXTELAPROB,
-                q3.FMINCORTE,
-                q3.FMAXCORTE,
-                q4.FMINCOSIDO,
-                q4.FMAXCOSIDO
-            FROM docOrdenVenta x
-            LEFT JOIN (
-                SELECT 
-                    x.IdDocumento_OrdenVenta, 
-                    MIN(b.dtFechaEmision) AS FMINARM,
-                    MAX(b.dtFechaEmision) AS FMAXARM
-                FROM docOrdenVentaItem a
-                INNER JOIN docOrdenProduccion b ON b.IdDocumento_Referencia = a.IdDocumento_OrdenVenta
-                INNER JOIN docOrdenVenta x ON a.IdDocumento_Referencia = x.IdDocumento_OrdenVenta
-                WHERE b.IdtdDocumentoForm = 138 
-                    AND b.IdtdDocumentoForm_Referencia = 152 
-                    AND x.CoddocOrdenVenta IS NOT NULL
-                    AND a.IdDocumento_Referencia > 0
-                GROUP BY x.IdDocumento_OrdenVenta
-            ) q0 ON x.IdDocumento_OrdenVenta = q0.IdDocumento_OrdenVenta
-            LEFT JOIN (
-                SELECT 
-                    x.IdDocumento_OrdenVenta, 
-                    MIN(e.dtFechaHoraFin) AS FMINTENID,
-                    MAX(e.dtFechaHoraFin) AS FMAXTENID
-                FROM docOrdenVentaItem a
-                INNER JOIN docOrdenProduccion b ON b.IdDocumento_Referencia = a.IdDocumento_OrdenVenta
-                INNER JOIN docOrdenVenta x ON a.IdDocumento_Referencia = x.IdDocumento_OrdenVenta
-                INNER JOIN docRecetaOrdenProduccion d ON b.IdDocumento_OrdenProduccion = d.IdDocumento_OrdenProduccion
-                INNER JOIN docReceta e ON d.IdDocumento_Receta = e.IdDocumento_Receta
-                WHERE b.IdtdDocumentoForm = 138 
-                    AND b.IdtdDocumentoForm_Referencia = 152 
-                    AND x.CoddocOrdenVenta IS NOT NULL
-                    AND a.IdDocumento_Referencia > 0
-                GROUP BY x.IdDocumento_OrdenVenta
-            ) q1 ON x.IdDocumento_OrdenVenta = q1.IdDocumento_OrdenVenta
-            LEFT JOIN (
-                SELECT 
-                    x.IdDocumento_OrdenVenta,  
-                    MIN(b.FechaCierreAprobado) AS FMINTELAPROB,
-                    MAX(b.FechaCierreAprobado) AS FMAXTELAPROB
-                FROM docOrdenVentaItem a
-                INNER JOIN docOrdenProduccion b ON b.IdDocumento_Referencia = a.IdDocumento_OrdenVenta
-                INNER JOIN docOrdenVenta x ON a.IdDocumento_Referencia = x.IdDocumento_OrdenVenta
-                INNER JOIN docOrdenProduccionRuta d ON b.IdDocumento_OrdenProduccion = d.IdDocumento_OrdenProduccion
-                WHERE b.IdtdDocumentoForm = 138 
-                    AND b.IdtdDocumentoForm_Referencia = 152 
-                    AND x.CoddocOrdenVenta IS NOT NULL
-                    AND a.IdDocumento_Referencia > 0
-                GROUP BY x.IdDocumento_OrdenVenta
-            ) q2 ON x.IdDocumento_OrdenVenta = q2.IdDocumento_OrdenVenta
-            LEFT JOIN (
-                SELECT 
-                    g.IdDocumento_OrdenVenta,  
-                    MIN(a.dtFechaRegistro) AS FMINCORTE,
-                    MAX(a.dtFechaRegistro) AS FMAXCORTE
-                FROM dbo.docNotaInventario a WITH (NOLOCK)
-                INNER JOIN dbo.maeCentroCosto a1 WITH (NOLOCK) ON a.IdmaeCentroCosto = a1.IdmaeCentroCosto AND a1.bConOrdenProduccion = 1
-                INNER JOIN dbo.docNotaInventarioItem b WITH (NOLOCK) ON a.IdDocumento_NotaInventario = b.IdDocumento_NotaInventario AND b.dCantidadIng <> 0
-                INNER JOIN dbo.docOrdenProduccion c WITH (NOLOCK) ON a.IdDocumento_OrdenProduccion = c.IdDocumento_OrdenProduccion 
-                AND c.bAnulado = 0 AND c.IdtdDocumentoForm = 127
-                INNER JOIN dbo.docOrdenVenta g WITH (NOLOCK) ON c.IdDocumento_Referencia = g.IdDocumento_OrdenVenta
-                INNER JOIN dbo.docOrdenProduccionRuta d WITH (NOLOCK) ON a.IddocOrdenProduccionRuta = d.IddocOrdenProduccionRuta
-                INNER JOIN dbo.docOrdenProduccionItem e WITH (NOLOCK) ON c.IdDocumento_OrdenProduccion = e.IdDocumento_OrdenProduccion AND b.IdmaeItem_Inventario = e.IdmaeItem
-                INNER JOIN dbo.maeItemInventario f WITH (NOLOCK) ON b.IdmaeItem_Inventario = f.IdmaeItem_Inventario AND f.IdtdItemForm = 10
-                WHERE a.IdtdDocumentoForm = 131
-                    AND a.bDevolucion = 0
-                    AND a.bDesactivado = 0
-                    AND a.bAnulado = 0
-                    AND a.IdDocumento_OrdenProduccion <> 0
-                    AND a.IdmaeCentroCosto = 29
-                GROUP BY g.IdDocumento_OrdenVenta
-            ) q3 ON x.IdDocumento_OrdenVenta = q3.IdDocumento_OrdenVenta
-            LEFT JOIN (
-                SELECT 
-                    g.IdDocumento_OrdenVenta,  
-                    MIN(a.dtFechaRegistro) AS FMINCOSIDO,
-                    MAX(a.dtFechaRegistro) AS FMAXCOSIDO
-                FROM dbo.docNotaInventario a WITH (NOLOCK)
-                INNER JOIN dbo.maeCentroCosto a1 WITH (NOLOCK) ON a.IdmaeCentroCosto = a1.IdmaeCentroCosto AND a1.bConOrdenProduccion = 1
-                INNER JOIN dbo.docNotaInventarioItem b WITH (NOLOCK) ON a.IdDocumento_NotaInventario = b.IdDocumento_NotaInventario AND b.dCantidadIng <> 0
-                INNER JOIN dbo.docOrdenProduccion c WITH (NOLOCK) ON a.IdDocumento_OrdenProduccion = c.IdDocumento_OrdenProduccion 
-                AND c.bAnulado = 0 AND c.IdtdDocumentoForm = 127
-                INNER JOIN dbo.docOrdenVenta g WITH (NOLOCK) ON c.IdDocumento_Referencia = g.IdDocumento_OrdenVenta
-                INNER JOIN dbo.docOrdenProduccionRuta d WITH (NOLOCK) ON a.IddocOrdenProduccionRuta = d.IddocOrdenProduccionRuta
-                INNER JOIN dbo.docOrdenProduccionItem e WITH (NOLOCK) ON c.IdDocumento_OrdenProduccion = e.IdDocumento_OrdenProduccion AND b.IdmaeItem_Inventario = e.IdmaeItem
-                INNER JOIN dbo.maeItemInventario f WITH (NOLOCK) ON b.IdmaeItem_Inventario = f.IdmaeItem_Inventario AND f.IdtdItemForm = 10
-                WHERE a.IdtdDocumentoForm = 131
-                    AND a.bDevolucion = 0
-                    AND a.bDesactivado = 0
-                    AND a.bAnulado = 0
-                    AND a.IdDocumento_OrdenProduccion <> 0
-                    AND a.IdmaeCentroCosto = 47
-                GROUP BY g.IdDocumento_OrdenVenta
-            ) q4 ON x.IdDocumento_OrdenVenta = q4.IdDocumento_OrdenVenta
-            WHERE x.CoddocOrdenVenta IS NOT NULL
-                AND x.IdtdDocumentoForm = 10 
-                AND x.IdtdTipoVenta = 4
-                AND x.bAnulado = 0
-            ) ff
-        ON gg.IdDocumento_OrdenVenta = ff.IdDocumento_OrdenVenta
-        """
-        # Convertir las fechas a formato de cadena para la consulta
-        f_entrega_inicio_str = f_entrega_inicio.strftime('%Y-%m-%d')
-        f_entrega_fin_str = f_entrega_fin.strftime('%Y-%m-%d')
-        
+        query = QUERY_AVANCE
         # Si no se seleccionan clientes, se busca en todos los clientes
         if not clientes:
             clientes = ['']
         
-        # Ejecutar la consulta para cada cliente
+        # Ejecutar la consulta para cada cliente, por meses de entrega: los meses cerrados (todos
+        # sus pedidos completos) se leen de la cache en Parquet; el resto se consulta siempre
         dfs = []
         for cliente in clientes:
-            params = (f_entrega_inicio_str, f_entrega_fin_str, f'%{cliente}%')
-            df = pd.read_sql(query, conn, params=params)
+            def leer_mes(inicio, fin):
+                params = (inicio.strftime('%Y-%m-%d'), fin.strftime('%Y-%m-%d'), f'%{cliente}%')
+
+                def leer(pedidos):
+                    if pedidos is None:
+                        return leer_sql("pruebacod.run_query.mssql", query, conn, params=params)
+                    return leer_sql("pruebacod.run_query.mssql", query_avance_pedidos(pedidos), conn,
+                                    params=params + tuple(pedidos))
+
+                # Solo se releen los pedidos cuya versión cambió
+                def versionar():
+                    df = leer_sql("pruebacod.versiones.mssql", query_versiones(FILTRO_VENTANA), conn, params=params)
+                    return dict(zip(df['PEDIDO'], df['VERSION']))
+                return refrescar(("pruebacod", "mssql", cliente, inicio), versionar, leer)[0]
+            df = leer_por_periodos("pruebacod", leer_mes, f_entrega_inicio, f_entrega_fin, 'F_ENTREGA',
+                                   clave=(query, cliente), es_cerrado=lambda d: pedidos_completos(d).all())
             dfs.append(df)
         
         # Concatenar todos los DataFrames
@@ -299,28 +82,17 @@ def run_query(f_entrega_inicio, f_entrega_fin, clientes, db_type='mssql'):
         # Obtener los pedidos filtrados de SQL Server
         pedidos_filtrados = df_mssql['PEDIDO'].tolist()
         
-        # Consulta de PostgreSQL para obtener solo los pedidos filtrados
-        query = """
-        SELECT 
-            "IdDocumento_OrdenVenta" as pedido,
-            "Fecha_Colocacion",
-            "Fecha_Entrega",
-            "star_armado",
-            "star_tenido",
-            "star_telaprob",
-            "star_corte",
-            "star_costura",
-            "finish_armado",
-            "finish_tenido",
-            "finish_telaprob",
-            "finish_corte",
-            "finish_costura"
-        FROM "docOrdenVenta"
-        WHERE "IdDocumento_OrdenVenta" IN ({})
-        """.format(','.join(['%s' for _ in pedidos_filtrados]))
-        
-        # Ejecutar la consulta
-        df = pd.read_sql(query, conn, params=tuple(pedidos_filtrados))
+        # Ejecutar la consulta (solo para los pedidos cuyo plan cambió desde la anterior)
+        def versionar():
+            df = leer_sql("pruebacod.versiones.postgres", query_versiones_plan(pedidos_filtrados), conn,
+                          params=tuple(pedidos_filtrados), t_conexion=t_conexion)
+            return dict(zip(df['pedido'], df['version']))
+
+        def leer(pedidos):
+            pedidos = pedidos_filtrados if pedidos is None else pedidos
+            return leer_sql("pruebacod.run_query.postgres", query_plan(pedidos), conn, params=tuple(pedidos))
+
+        df, _ = refrescar(("pruebacod", "postgres", tuple(pedidos_filtrados)), versionar, leer, 'pedido')
     
     else:
         raise ValueError("Tipo de base de datos no soportado.")
@@ -343,6 +115,14 @@ f_entrega_fin = st.date_input("Fecha de Entrega Final", default_f_entrega_fin)
 # Selección de clientes
 clientes_input = st.text_input("Ingresa los nombres de los clientes (separados por coma)")
 
+st.caption(f"Los meses de entrega terminados hace más de {DIAS_CIERRE} días en los que todos los pedidos "
+           "tienen todos sus procesos completos se leen de la cache histórica: una corrección posterior en "
+           "esos pedidos no se ve hasta vaciarla. Los meses con algún pedido pendiente se consultan siempre.")
+
+if st.sidebar.button("Vaciar cache histórica"):
+    vaciar("pruebacod")
+    olvidar("pruebacod")
+
 if st.button("Ejecutar Consulta"):
     try:
         # Procesar la entrada de clientes
@@ -367,103 +147,15 @@ if st.button("Ejecutar Consulta"):
             # Mostrar tabla adicional con el avance de cada proceso
             st.subheader("Avance de Procesos por Pedido")
 
-            # Modificar la parte problemática del código (líneas 402-433 aproximadamente)
-            # Modificar la parte problemática del código evitando el uso de isinstance()
-            procesos = ['armado', 'tenido', 'telaprob', 'corte', 'costura']
-            avance_data = []
-
-            # Crear un diccionario para buscar el pedido correspondiente en el DataFrame df_mssql
-            df_dict = {str(row['PEDIDO']).lower(): row for _, row in df_mssql.iterrows() if 'PEDIDO' in df_mssql.columns}
-
-            for _, row in df_postgres.iterrows():
-                # Convertir pedido a string y minúsculas para comparación consistente
-                pedido_original = row['pedido']  # Mantener formato original para mostrar
-                pedido_key = str(pedido_original).lower()  # Clave para buscar en el diccionario
-                
-                for proceso in procesos:
-                    # Las fechas ya deben ser objetos date a este punto
-                    fecha_inicio = row[f'star_{proceso}']
-                    fecha_fin = row[f'finish_{proceso}']
-                    
-                    # Verificar que las fechas no sean nulas
-                    if pd.notna(fecha_inicio) and pd.notna(fecha_fin):
-                        try:
-                            # Intentar convertir a datetime primero
-                            if hasattr(fecha_inicio, 'date'):
-                                # Es un objeto timestamp o datetime
-                                fecha_inicio = fecha_inicio.date()
-                            else:
-                                # Es otro tipo de objeto, intentar convertir
-                                fecha_inicio = pd.to_datetime(fecha_inicio).date()
-                                
-                            if hasattr(fecha_fin, 'date'):
-                                fecha_fin = fecha_fin.date()
-                            else:
-                                fecha_fin = pd.to_datetime(fecha_fin).date()
-                            
-                            fecha_actual = datetime.now().date()  # Obtener solo la fecha actual
-                            
-                            diferencia_dias = (fecha_fin - fecha_actual).days
-                            
-                            # Evitar división por cero
-                            if (fecha_fin - fecha_inicio).days > 0:
-                                porcentaje_avance = ((fecha_actual - fecha_inicio).days / (fecha_fin - fecha_inicio).days) * 100
-                                # Limitar el porcentaje entre 0 y 100
-                                porcentaje_avance = max(0, min(100, porcentaje_avance))
-                            else:
-                                porcentaje_avance = 100 if fecha_actual >= fecha_fin else 0
-                            
-                            # Agregar el valor de avance de la primera tabla según el tipo de proceso
-                            avance_valor = ""
-                            if pedido_key in df_dict:
-                                if proceso == 'armado':
-                                    avance_valor = df_dict[pedido_key]['KG_ARMP']
-                                elif proceso == 'tenido':
-                                    avance_valor = df_dict[pedido_key]['KG_TENIDP']
-                                elif proceso == 'telaprob':
-                                    avance_valor = df_dict[pedido_key]['KG_TELAPROBP']
-                                elif proceso == 'corte':
-                                    avance_valor = df_dict[pedido_key]['CORTADOP']
-                                elif proceso == 'costura':
-                                    avance_valor = df_dict[pedido_key]['COSIDOP']
-                            
-                            avance_data.append({
-                                'PEDIDO': pedido_original,  # Usar el formato original para mostrar
-                                'PROCESO': proceso,
-                                'AVANCE': avance_valor,  # Nueva columna
-                                'Días(-)': diferencia_dias,
-                                'Avance_Prog': f"{porcentaje_avance:.0f}%"
-                            })
-                        except Exception as e:
-                            # En caso de error, mostrar el proceso que falló pero continuar con los demás
-                            st.warning(f"Error al procesar fecha para {pedido_original}, proceso {proceso}: {e}")
-                            continue
-            # Crear el DataFrame de avance si hay datos - FIXED INDENTATION
-            if avance_data:
-                df_avance = pd.DataFrame(avance_data)
+            # Avance programado (por fechas del plan) y real (de SQL Server) por pedido y proceso,
+            # con el estado de cada proceso según las reglas configuradas
+            df_avance = evaluar_cacheado(df_mssql, df_postgres)
+            if not df_avance.empty:
                 st.dataframe(df_avance)
-                # Después de crear df_avance y mostrarlo
-            if 'df_avance' in locals() and not df_avance.empty:
                 st.subheader("Situación de procesos por pedido")
-                
-                # Convertir la columna AVANCE_HOY a numérico (quitar el símbolo %)
-                df_avance['AVANCE_NUM'] = df_avance['AVANCE'].str.rstrip('%').astype(float)
-                
-                # Filtrar por proceso y su límite correspondiente
-                filtro_condiciones = (
-                    ((df_avance['PROCESO'] == 'armado') & (df_avance['AVANCE_NUM'] < 110)) |
-                    ((df_avance['PROCESO'] == 'tenido') & (df_avance['AVANCE_NUM'] < 110)) |
-                    ((df_avance['PROCESO'] == 'telaprob') & (df_avance['AVANCE_NUM'] < 100)) |
-                    ((df_avance['PROCESO'] == 'corte') & (df_avance['AVANCE_NUM'] < 105)) |
-                    ((df_avance['PROCESO'] == 'costura') & (df_avance['AVANCE_NUM'] < 105))
-                )
-                
-                df_procesos_bajos = df_avance[filtro_condiciones].copy()
-                
-                # Eliminar la columna auxiliar que usamos para el filtro
-                df_procesos_bajos = df_procesos_bajos.drop('AVANCE_NUM', axis=1)
-                
-                # Mostrar la tabla filtrada
+
+                # Procesos por debajo del umbral de avance de cada uno
+                df_procesos_bajos = procesos_bajos(df_avance)
                 if not df_procesos_bajos.empty:
                     st.dataframe(df_procesos_bajos)
                 else:
@@ -474,3 +166,6 @@ if st.button("Ejecutar Consulta"):
     except Exception as e:
         st.error(f"Error al ejecutar la consulta: {e}")
         st.exception(e)  # Esto muestra el traceback completo para depuración
+
+# Después de la primera pintura, cargar en segundo plano los módulos diferidos
+precargar()
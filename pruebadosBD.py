@@ -1,35 +1,28 @@
 import streamlit as st
-import pandas as pd
-import pyodbc
-import psycopg2
-
-
-# Función para conectarse a SQL Server y ejecutar una consulta
-def execute_sqlserver_query(query):
-    conn = pyodbc.connect(
-        "DRIVER={ODBC Driver 17 for SQL Server};"
-        "SERVER=" + st.secrets["msserver"] + ";"
-        "DATABASE=" + st.secrets["msdatabase"] + ";"
-        "UID=" + st.secrets["msusername"] + ";"
-        "PWD=" + st.secrets["mspassword"] + ";"
-    )
-    df = pd.read_sql(query, conn)
-    conn.close()
-    return df
-
-
-# Función para conectarse a PostgreSQL y ejecutar una consulta
-def execute_postgres_query(query):
-    conn = psycopg2.connect(
-        host=st.secrets["host"],
-        port=st.secrets["port"],
-        database=st.secrets["database"],
-        user=st.secrets["user"],
-        password=st.secrets["password"]
-    )
-    df = pd.read_sql(query, conn)
-    conn.close()
-    return df
+from lectura_arrow import leer_arrow, motor_sqlserver, motor_postgres
+from copia_postgres import leer_copy, exportar_copy
+from paralelo import TIMEOUTS, en_paralelo, mostrar_tiempos
+
+
+# Función para ejecutar una consulta en SQL Server (por bloques, con tipos de Arrow)
+def execute_sqlserver_query(query, params=None):
+    return leer_arrow("pruebadosBD.execute_sqlserver_query", query, motor_sqlserver(), params,
+                      timeout=TIMEOUTS['mssql'])
+
+
+# Función para ejecutar una consulta en PostgreSQL (cursor del lado del servidor, con tipos de Arrow)
+def execute_postgres_query(query, params=None):
+    return leer_arrow("pruebadosBD.execute_postgres_query", query, motor_postgres(), params,
+                      timeout=TIMEOUTS['postgres'])
+
+
+# Función para leer una consulta completa de PostgreSQL con COPY (más rápido para tablas enteras)
+def copy_postgres_query(query):
+    conn = motor_postgres().raw_connection()
+    try:
+        return leer_copy("pruebadosBD.copy_postgres_query", query, conn, timeout=TIMEOUTS['postgres'])
+    finally:
+        conn.close()
 
 
 # Título de la aplicación
@@ -48,41 +41,62 @@ FROM maeAnexoCliente
 
 postgres_base_query = 'SELECT * FROM "docOrdenVenta"'
 
+# Mostrar el resultado de un motor (o su error, sin detener al otro)
+def mostrar_resultado(resultado, motor, titulo=None, mostrar_conteo=False):
+    if resultado['error'] is not None:
+        st.error(f"Error en {motor}: {resultado['error']}")
+        return
+    df = resultado['valor']
+    if titulo:
+        st.subheader(titulo)
+    if mostrar_conteo:
+        st.write(f"Número de registros: {len(df)}")
+    if not df.empty:
+        if not mostrar_conteo:
+            st.write(f"Resultado en {motor}:")
+        st.dataframe(df, hide_index=True)
+    else:
+        st.write(f"No se encontraron resultados en {motor}")
+
+
+ETIQUETAS = {'mssql': 'SQL Server', 'postgres': 'PostgreSQL'}
+
 # Si hay un término de búsqueda, modificar las consultas
 if id:
-    sqlserver_query = sqlserver_base_query + f" WHERE IdmaeAnexo_Cliente = '{id}'"
-    postgres_query = postgres_base_query + f' WHERE "IdDocumento_OrdenVenta" = \'{id}\''
+    sqlserver_query = sqlserver_base_query + " WHERE IdmaeAnexo_Cliente = ?"
+    postgres_query = postgres_base_query + ' WHERE "IdDocumento_OrdenVenta" = %s'
 
     st.subheader("Resultados de la búsqueda")
 
-    # Ejecutar búsqueda en SQL Server
-    df_sqlserver_search = execute_sqlserver_query(sqlserver_query)
-    if not df_sqlserver_search.empty:
-        st.write("Resultado en SQL Server:")
-        st.dataframe(df_sqlserver_search, hide_index=True)
-    else:
-        st.write("No se encontraron resultados en SQL Server")
-
-    # Ejecutar búsqueda en PostgreSQL
-    df_postgres_search = execute_postgres_query(postgres_query)
-    if not df_postgres_search.empty:
-        st.write("Resultado en PostgreSQL:")
-        st.dataframe(df_postgres_search, hide_index=True)
-    else:
-        st.write("No se encontraron resultados en PostgreSQL")
+    # Ejecutar la búsqueda en los dos motores en paralelo
+    resultados = en_paralelo({
+        'mssql': lambda: execute_sqlserver_query(sqlserver_query, (id,)),
+        'postgres': lambda: execute_postgres_query(postgres_query, (id,)),
+    })
+    mostrar_tiempos(resultados, ETIQUETAS)
+    mostrar_resultado(resultados['mssql'], "SQL Server")
+    mostrar_resultado(resultados['postgres'], "PostgreSQL")
 
 # Mostrar todos los datos si no hay búsqueda
 else:
-    # Ejecutar las consultas base
-    df_sqlserver = execute_sqlserver_query(sqlserver_base_query)
-    df_postgres = execute_postgres_query(postgres_base_query)
+    # Ejecutar las consultas base en paralelo
+    resultados = en_paralelo({
+        'mssql': lambda: execute_sqlserver_query(sqlserver_base_query),
+        'postgres': lambda: copy_postgres_query(postgres_base_query),
+    })
+    mostrar_tiempos(resultados, ETIQUETAS)
 
     # Mostrar resultados de SQL Server
-    st.subheader("Datos de SQL Server")
-    st.write(f"Número de registros: {len(df_sqlserver)}")
-    st.dataframe(df_sqlserver, hide_index=True)
+    mostrar_resultado(resultados['mssql'], "SQL Server", "Datos de SQL Server", mostrar_conteo=True)
 
     # Mostrar resultados de PostgreSQL
-    st.subheader("Datos de PostgreSQL")
-    st.write(f"Número de registros: {len(df_postgres)}")
-    st.dataframe(df_postgres, hide_index=True)
+    mostrar_resultado(resultados['postgres'], "PostgreSQL", "Datos de PostgreSQL", mostrar_conteo=True)
+
+    # Descarga de la tabla de PostgreSQL: los bytes salen tal cual de COPY
+    if st.button("Preparar CSV de PostgreSQL"):
+        conn = motor_postgres().raw_connection()
+        try:
+            csv_postgres = exportar_copy(postgres_base_query, conn, 'csv')
+        finally:
+            conn.close()
+        st.download_button("Descargar CSV de PostgreSQL", csv_postgres, "docOrdenVenta.csv", "text/csv")
@@ -0,0 +1,102 @@
+"""Refresco incremental de resultados por pedido.
+
+Guarda en memoria el último resultado de cada consulta (por clave, por ejemplo la lista de
+pedidos) junto con la versión de cada pedido. En la siguiente lectura solo se consulta una
+versión liviana por pedido y se vuelven a leer los pedidos cuya versión cambió; sus filas se
+reemplazan en el resultado guardado. Se guardan a lo sumo MAX_RESULTADOS claves (se descarta
+la usada hace más tiempo) y se descartan las que ya tienen que releerse completas.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+from cache_parquet import huella
+
+# Pasado este tiempo se relee todo aunque ninguna versión haya cambiado (cubre cambios que
+# la versión no detecta)
+MAX_MINUTOS_SIN_RECARGA = 240
+# Con más pedidos cambiados que estos se relee todo (SQL Server admite hasta 2100 parámetros)
+MAX_PEDIDOS_PARCHE = 500
+# Claves guardadas a la vez en el proceso (cada una guarda un DataFrame completo)
+MAX_RESULTADOS = 32
+
+
+@st.cache_resource
+def _resultados():
+    """Últimos resultados por clave, compartidos por todas las sesiones del proceso, del usado
+    hace más tiempo al más reciente."""
+    return OrderedDict(), threading.Lock()
+
+
+def _guardar(resultados, clave, entrada):
+    """Guarda la entrada como la más reciente y descarta las vencidas y las que sobran."""
+    resultados[clave] = entrada
+    resultados.move_to_end(clave)
+    limite = time.time() - MAX_MINUTOS_SIN_RECARGA * 60
+    for vieja in [c for c, e in resultados.items() if e['hora'] < limite]:
+        del resultados[vieja]
+    while len(resultados) > MAX_RESULTADOS:
+        resultados.popitem(last=False)
+
+
+def refrescar(clave, versionar, leer, columna='PEDIDO'):
+    """Devuelve (df, version) con el resultado al día para `clave`.
+
+    `versionar()` devuelve {pedido: versión} de los pedidos que hoy forman el resultado.
+    `leer(pedidos)` lee las filas de esos pedidos, o de todos si recibe None.
+    `version` cambia solo si cambió el resultado: sirve como clave para cachear lo que se
+    calcula a partir de él (filas de resumen, gráficos). Si `versionar()` falla se lee todo.
+    """
+    resultados, candado = _resultados()
+    try:
+        versiones_actuales = versionar()
+    except Exception:
+        # Sin versiones no se puede parchar: lectura completa, sin guardar nada (el error de
+        # la consulta de versiones ya quedó registrado en medicion)
+        return leer(None), huella(('sin_version', time.time()))
+    actuales = {str(pedido).lower(): (pedido, version) for pedido, version in versiones_actuales.items()}
+    versiones = {p: v for p, (_, v) in actuales.items()}
+    with candado:
+        previo = resultados.get(clave)
+        if previo is not None:
+            resultados.move_to_end(clave)
+
+    if previo is not None and time.time() - previo['hora'] < MAX_MINUTOS_SIN_RECARGA * 60:
+        cambiados = {p for p in versiones.keys() | previo['versiones'].keys()
+                     if versiones.get(p) != previo['versiones'].get(p)}
+        if not cambiados:
+            return previo['df'].copy(), previo['version']
+    else:
+        cambiados = None
+
+    if cambiados is None or len(cambiados) > MAX_PEDIDOS_PARCHE:
+        df, hora = leer(None), time.time()
+    else:
+        # Los pedidos que ya no están (anulados, fuera de la ventana) solo se quitan
+        a_leer = [actuales[p][0] for p in cambiados if p in actuales]
+        nuevos = leer(a_leer) if a_leer else previo['df'].iloc[0:0]
+        claves_previas = previo['df'][columna].astype(str).str.lower()
+        quedan = previo['df'][~claves_previas.isin(cambiados)]
+        df = pd.concat([quedan, nuevos], ignore_index=True)
+        # Mismo orden de pedidos que el resultado anterior; los pedidos nuevos van al final
+        orden = {pedido: i for i, pedido in enumerate(dict.fromkeys(claves_previas))}
+        posicion = df[columna].astype(str).str.lower().map(orden).fillna(len(orden))
+        df = df.iloc[posicion.argsort(kind='stable')].reset_index(drop=True)
+        hora = previo['hora']
+
+    entrada = {'df': df, 'versiones': versiones, 'hora': hora,
+               'version': huella((hora, sorted(versiones.items())))}
+    with candado:
+        _guardar(resultados, clave, entrada)
+    return df.copy(), entrada['version']
+
+
+def olvidar(prefijo=None):
+    """Borra los resultados guardados (todos, o los de claves que empiezan con `prefijo`)."""
+    resultados, candado = _resultados()
+    with candado:
+        for clave in [c for c in resultados if prefijo is None or c[0] == prefijo]:
+            del resultados[clave]
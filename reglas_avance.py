@@ -0,0 +1,160 @@
+"""Reglas de salud del avance de procesos por pedido.
+
+Compara, para cada pedido y proceso, el avance programado (según las fechas del plan en
+PostgreSQL) con el avance real en KG o unidades (SQL Server) y los días que faltan para el fin
+planificado. Todo se evalúa de una vez como matrices pedido x proceso.
+
+Las reglas se leen de la sección [reglas_avance] de secrets.toml, por ejemplo:
+
+    [reglas_avance.corte]
+    umbral = 105       # % real con el que el proceso se da por completo
+    tolerancia = 10    # puntos de atraso del real frente al programado que se toleran
+    dias_aviso = 3     # con atraso y a estos días (o menos) del fin, el proceso es crítico
+
+Los procesos o valores que no estén en la configuración usan REGLAS_DEFECTO.
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+PROCESOS = ['armado', 'tenido', 'telaprob', 'corte', 'costura']
+# Columna de SQL Server con el avance real de cada proceso (texto con %)
+COLUMNA_AVANCE = {'armado': 'KG_ARMP', 'tenido': 'KG_TENIDP', 'telaprob': 'KG_TELAPROBP',
+                  'corte': 'CORTADOP', 'costura': 'COSIDOP'}
+REGLAS_DEFECTO = {
+    'armado': {'umbral': 110, 'tolerancia': 15, 'dias_aviso': 3},
+    'tenido': {'umbral': 110, 'tolerancia': 15, 'dias_aviso': 3},
+    'telaprob': {'umbral': 100, 'tolerancia': 15, 'dias_aviso': 3},
+    'corte': {'umbral': 105, 'tolerancia': 10, 'dias_aviso': 3},
+    'costura': {'umbral': 105, 'tolerancia': 10, 'dias_aviso': 3},
+}
+
+# Estados en orden de prioridad: se asigna el primero cuya condición se cumple
+SIN_DATO, COMPLETO, VENCIDO, CRITICO, ATRASADO, EN_PLAZO = (
+    'SIN_DATO', 'COMPLETO', 'VENCIDO', 'CRITICO', 'ATRASADO', 'EN_PLAZO')
+ESTADOS_ALERTA = [VENCIDO, CRITICO, ATRASADO]
+COLORES_ESTADO = {SIN_DATO: 'lightgray', COMPLETO: 'mediumseagreen', VENCIDO: 'firebrick',
+                  CRITICO: 'orangered', ATRASADO: 'gold', EN_PLAZO: 'lightsteelblue'}
+
+
+def cargar_reglas():
+    """Reglas por proceso: REGLAS_DEFECTO con lo que haya en st.secrets["reglas_avance"]."""
+    try:
+        configuradas = st.secrets.get("reglas_avance", {})
+    except Exception:
+        # Sin secrets.toml (por ejemplo en pruebas locales) se usan los valores por defecto
+        configuradas = {}
+    return {proceso: {**defecto, **dict(configuradas.get(proceso, {}))}
+            for proceso, defecto in REGLAS_DEFECTO.items()}
+
+
+def _fechas(df_plan, prefijo):
+    """Matriz pedido x proceso de fechas (datetime64[D], NaT si falta) de las columnas del plan."""
+    if df_plan.empty:
+        return np.empty((0, len(PROCESOS)), dtype='datetime64[D]')
+    return np.column_stack([
+        pd.to_datetime(df_plan[f'{prefijo}_{p}'], errors='coerce').to_numpy().astype('datetime64[D]')
+        for p in PROCESOS
+    ])
+
+
+def evaluar(df_avance, df_plan, reglas=None, hoy=None):
+    """Tabla larga PEDIDO x PROCESO con el avance real, los días al fin planificado, el avance
+    programado, la brecha (programado - real, en puntos) y el ESTADO según las reglas.
+
+    `df_avance` trae PEDIDO y las columnas de COLUMNA_AVANCE; `df_plan` trae pedido y las
+    fechas star_*/finish_*. Se omiten los procesos sin fecha de inicio o de fin en el plan.
+    """
+    reglas = reglas or cargar_reglas()
+    hoy = np.datetime64(hoy or datetime.now().date(), 'D')
+    n, k = len(df_plan), len(PROCESOS)
+    un_dia = np.timedelta64(1, 'D')
+
+    inicio, fin = _fechas(df_plan, 'star'), _fechas(df_plan, 'finish')
+    validas = ~(np.isnat(inicio) | np.isnat(fin))
+    duracion = (fin - inicio) / un_dia
+    dias = (fin - hoy) / un_dia
+    with np.errstate(divide='ignore', invalid='ignore'):
+        programado = np.where(duracion > 0,
+                              np.clip((hoy - inicio) / un_dia / duracion * 100, 0, 100),
+                              np.where(hoy >= fin, 100, 0))
+
+    # Avance real: cruce por pedido (sin distinguir mayúsculas) con las columnas de cada proceso
+    clave = df_avance['PEDIDO'].astype(str).str.lower()
+    texto = (df_avance.assign(_clave=clave).drop_duplicates('_clave', keep='last').set_index('_clave')
+             [[COLUMNA_AVANCE[p] for p in PROCESOS]]
+             .reindex(df_plan['pedido'].astype(str).str.lower())
+             .fillna(''))
+    real = texto.apply(lambda col: pd.to_numeric(col.astype(str).str.rstrip('%'), errors='coerce')).to_numpy(float)
+
+    # Reglas como vectores por proceso: se extienden sobre todos los pedidos
+    umbral = np.array([reglas[p]['umbral'] for p in PROCESOS], dtype=float)
+    tolerancia = np.array([reglas[p]['tolerancia'] for p in PROCESOS], dtype=float)
+    dias_aviso = np.array([reglas[p]['dias_aviso'] for p in PROCESOS], dtype=float)
+
+    # El real se lleva a la escala del programado (0-100) respecto del umbral de cierre
+    brecha = programado - real / umbral * 100
+    atrasado = brecha > tolerancia
+    estado = np.select(
+        [np.isnan(real), real >= umbral, dias < 0, atrasado & (dias <= dias_aviso), atrasado],
+        [SIN_DATO, COMPLETO, VENCIDO, CRITICO, ATRASADO],
+        default=EN_PLAZO,
+    )
+
+    df = pd.DataFrame({
+        'PEDIDO': np.repeat(df_plan['pedido'].to_numpy(), k),
+        'PROCESO': np.tile(PROCESOS, n),
+        'AVANCE': texto.to_numpy(dtype=object).ravel(),
+        'Días(-)': dias.ravel(),
+        'Avance_Prog': programado.ravel(),
+        'BRECHA': brecha.ravel(),
+        'ESTADO': estado.ravel(),
+    })[validas.ravel()]
+    df['Días(-)'] = df['Días(-)'].astype(int)
+    df['Avance_Prog'] = df['Avance_Prog'].round().astype(int).astype(str) + '%'
+    df['BRECHA'] = df['BRECHA'].round().astype('Int64')
+    return df.reset_index(drop=True)
+
+
+def huella_snapshot(df_avance, df_plan):
+    """Huella del contenido de los datos que usan las reglas (cambia si cambia algún avance o fecha)."""
+    columnas_plan = ['pedido'] + [f'{prefijo}_{p}' for prefijo in ('star', 'finish') for p in PROCESOS]
+    partes = [df_avance[['PEDIDO'] + list(COLUMNA_AVANCE.values())], df_plan[columnas_plan]]
+    return '-'.join(str(pd.util.hash_pandas_object(d.astype(str), index=False).sum()) for d in partes)
+
+
+@st.cache_data(ttl=3600, max_entries=32)
+def _evaluar_snapshot(snapshot, reglas, hoy, _df_avance, _df_plan):
+    return evaluar(_df_avance, _df_plan, reglas, hoy)
+
+
+def evaluar_cacheado(df_avance, df_plan, reglas=None, hoy=None):
+    """Como evaluar(), pero reutiliza el resultado si los datos, las reglas y el día no cambiaron."""
+    hoy = hoy or datetime.now().date()
+    return _evaluar_snapshot(huella_snapshot(df_avance, df_plan), reglas or cargar_reglas(), hoy,
+                             df_avance, df_plan)
+
+
+def procesos_bajos(df_salud):
+    """Procesos con avance real por debajo de su umbral (ni completos ni sin dato)."""
+    return df_salud[~df_salud['ESTADO'].isin([COMPLETO, SIN_DATO])]
+
+
+def pedidos_completos(df_avance, reglas=None):
+    """True para cada fila de `df_avance` con todos los procesos en o sobre su umbral."""
+    reglas = reglas or cargar_reglas()
+    completo = pd.Series(True, index=df_avance.index)
+    for proceso in PROCESOS:
+        real = pd.to_numeric(df_avance[COLUMNA_AVANCE[proceso]].astype(str).str.rstrip('%'), errors='coerce')
+        completo &= real >= reglas[proceso]['umbral']
+    return completo
+
+
+def estados_pedido(df_avance, df_plan, fila=0, reglas=None):
+    """ESTADO de cada proceso para una fila de los datos de un pedido (para los Gantt)."""
+    uno = df_avance.iloc[[fila]].assign(PEDIDO='_')
+    plan = df_plan.iloc[[fila]].assign(pedido='_')
+    salud = evaluar(uno, plan, reglas)
+    return dict(zip(salud['PROCESO'], salud['ESTADO']))
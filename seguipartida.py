@@ -1,7 +1,18 @@
 import streamlit as st
-import pyodbc
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
+from clasificapartidas import (
+    leer_partidas,
+    partidas_sin_tenido,
+    partidas_con_tenido_sin_aprob_tela,
+    partidas_con_tenido_sin_aprob_tela_estamp,
+    reporte_tiempos,
+    uso_plan_cache,
+)
+from alertaspartidas import leer_alertas_vigentes, ultima_corrida
+from carga_diferida import diferido, precargar
+pyodbc = diferido("pyodbc")
 
 st.set_page_config(layout="wide")
 
@@ -9,136 +20,69 @@ st.set_page_config(layout="wide")
 def connect_to_db():
     conn = pyodbc.connect(
         "driver={odbc driver 17 for sql server};"
-        "server=" + st.secrets["server"] + ";"
-        "database=" + st.secrets["database"] + ";"
-        "uid=" + st.secrets["username"] + ";"
-        "pwd=" + st.secrets["password"] + ";"
+        "server=" + st.secrets["sqlserver"]["server"] + ";"
+        "database=" + st.secrets["sqlserver"]["database"] + ";"
+        "uid=" + st.secrets["sqlserver"]["username"] + ";"
+        "pwd=" + st.secrets["sqlserver"]["password"] + ";"
     )
     return conn
 
 
-# Consulta para obtener PARTIDAS sin F_TENIDO y con más de x días
-def get_partidas_sin_tenido(dias):
+# Consulta única con todas las partidas candidatas; se cachea y las listas se filtran en memoria
+@st.cache_data(ttl=600)
+def get_partidas():
     conn = connect_to_db()
-    query = f"""
-        SELECT a.CoddocOrdenProduccion AS PARTIDA, DATEDIFF(DAY, a.dtFechaEmision, GETDATE()) AS DIAS  , LEFT(f.NommaeItemInventario, 35) AS TELA, FORMAT(a.dtFechaEmision, 'dd-MM') AS F_EMISION, 
-               --FORMAT(j.dtFechaHoraFin, 'dd-MM') AS F_TENIDO, 
-               --FORMAT(a.FechaCierreAprobado, 'dd-MM') AS F_APROB_TELA, 
-               a.dCantidad AS KG, 
-               a.nvDocumentoReferencia AS REF, g.NommaeColor AS COLOR, --a.bCierreAprobado AS AP_DES, 
-               --a.bProduccionAprobado AS DESP, a.bcerrado AS CERR, 
-               LEFT(h.NommaeAnexoCliente, 15) AS Cliente, 
-               --a.ntEstado AS ESTADO, k.NommaeRuta AS RUTA,
-               CASE WHEN LOWER(k.NommaeRuta) LIKE '%mofijado%' THEN 1 ELSE 0 END AS FLAG
-        FROM docOrdenProduccion a WITH (NOLOCK)
-        INNER JOIN maeItemInventario f WITH (NOLOCK) ON f.IdmaeItem_Inventario = a.IdmaeItem
-        INNER JOIN maeColor g WITH (NOLOCK) ON g.IdmaeColor = a.IdmaeColor
-        INNER JOIN maeAnexoCliente h WITH (NOLOCK) ON h.IdmaeAnexo_Cliente = a.IdmaeAnexo_Cliente
-        --INNER JOIN docRecetaOrdenProduccion i ON a.IdDocumento_OrdenProduccion = i.IdDocumento_OrdenProduccion
-        --INNER JOIN docReceta j ON i.IdDocumento_Receta = j.IdDocumento_Receta
-        LEFT JOIN docRecetaOrdenProduccion i ON a.IdDocumento_OrdenProduccion = i.IdDocumento_OrdenProduccion  -- LEFT JOIN
-        LEFT JOIN docReceta j ON i.IdDocumento_Receta = j.IdDocumento_Receta
-        INNER JOIN maeruta k ON a.IdmaeRuta = k.IdmaeRuta
-        WHERE a.IdtdDocumentoForm = 138
-        AND j.dtFechaHoraFin IS NULL
-        AND DATEDIFF(DAY, a.dtFechaEmision, GETDATE()) > {dias}
-        AND a.dtFechaEmision > '01-01-2025'
-        and j.bAnulado =0
-        AND a.IdmaeAnexo_Cliente IN (47, 49, 91, 93, 111, 1445, 2533, 2637, 4294, 4323, 4374, 4411, 4413, 4469, 5506, 6577)
-    """
-    df = pd.read_sql(query, conn)
+    df = leer_partidas(conn)
     conn.close()
-    
     return df
 
-# Consulta para obtener PARTIDAS con F_TENIDO pero sin F_APROB_TELA y que RUTA no contenga "ESTAMP"
+# PARTIDAS sin F_TENIDO y con más de x días
+def get_partidas_sin_tenido(dias):
+    return partidas_sin_tenido(get_partidas(), dias)
+
+# PARTIDAS con F_TENIDO pero sin F_APROB_TELA y que RUTA no contenga "ESTAMP"
 def get_partidas_con_tenido_sin_aprob_tela(dias):
-    conn = connect_to_db()
-    query = f"""
-        SELECT a.CoddocOrdenProduccion AS PARTIDA, 
-       DATEDIFF(DAY, a.dtFechaEmision, GETDATE()) AS DIAS,  
-       DATEDIFF(DAY, MAX(j.dtFechaHoraFin), GETDATE()) AS DIAS_TEN,  -- Última fecha de teñido
-       LEFT(f.NommaeItemInventario, 35) AS TELA, 
-       FORMAT(a.dtFechaEmision, 'dd-MM') AS F_EMISION, 
-       FORMAT(MAX(j.dtFechaHoraFin), 'dd-MM') AS F_TENIDO,  -- Última fecha de teñido
-       a.dCantidad AS KG, 
-       a.nvDocumentoReferencia AS REF, 
-       g.NommaeColor AS COLOR, 
-       LEFT(h.NommaeAnexoCliente, 15) AS Cliente,
-       a.ntEstado AS ESTADO
-FROM docOrdenProduccion a WITH (NOLOCK)
-INNER JOIN maeItemInventario f WITH (NOLOCK) ON f.IdmaeItem_Inventario = a.IdmaeItem
-INNER JOIN maeColor g WITH (NOLOCK) ON g.IdmaeColor = a.IdmaeColor
-INNER JOIN maeAnexoCliente h WITH (NOLOCK) ON h.IdmaeAnexo_Cliente = a.IdmaeAnexo_Cliente
-INNER JOIN docRecetaOrdenProduccion i ON a.IdDocumento_OrdenProduccion = i.IdDocumento_OrdenProduccion
-INNER JOIN docReceta j ON i.IdDocumento_Receta = j.IdDocumento_Receta
-INNER JOIN maeruta k ON a.IdmaeRuta = k.IdmaeRuta
-WHERE a.IdtdDocumentoForm = 138
-AND NOT a.IdDocumento_OrdenProduccion IN (461444, 452744, 459212, 463325, 471285, 471287, 471290)
-AND j.dtFechaHoraFin IS NOT NULL
-AND j.bAnulado = 0
-AND a.FechaCierreAprobado IS NULL
-AND LOWER(k.NommaeRuta) NOT LIKE '%estamp%'
-AND a.dtFechaEmision > '01-01-2025'
-AND a.IdmaeAnexo_Cliente IN (47, 49, 91, 93, 111, 1445, 2533, 2637, 4294, 4323, 4374, 4411, 4413, 4469, 5506, 6577)
-GROUP BY a.CoddocOrdenProduccion, 
-         a.dtFechaEmision, 
-         f.NommaeItemInventario, 
-         a.dCantidad, 
-         a.nvDocumentoReferencia, 
-         g.NommaeColor, 
-         h.NommaeAnexoCliente, 
-         a.ntEstado
-HAVING DATEDIFF(DAY, MAX(j.dtFechaHoraFin), GETDATE()) > {dias};
-
-        
-    """
-    df = pd.read_sql(query, conn)
-    conn.close()
-    # Redondear la columna KG a 1 decimal
-    df['KG'] = df['KG'].round(1)
-    return df
+    return partidas_con_tenido_sin_aprob_tela(get_partidas(), dias)
 
-# Consulta para obtener PARTIDAS con F_TENIDO pero sin F_APROB_TELA y que RUTA contenga "ESTAMP"
+# PARTIDAS con F_TENIDO pero sin F_APROB_TELA y que RUTA contenga "ESTAMP"
 def get_partidas_con_tenido_sin_aprob_tela_estamp(dias):
-    conn = connect_to_db()
-    query = f"""
-        SELECT a.CoddocOrdenProduccion AS PARTIDA,DATEDIFF(DAY, a.dtFechaEmision, GETDATE()) AS DIAS    , DATEDIFF(DAY, j.dtFechaHoraFin, GETDATE()) AS DIAS_TEN  , LEFT(f.NommaeItemInventario, 35) AS TELA, FORMAT(a.dtFechaEmision, 'dd-MM') AS F_EMISION,
-              FORMAT(j.dtFechaHoraFin, 'dd-MM') AS F_TENIDO, --FORMAT(a.FechaCierreAprobado, 'dd-MM') AS F_APROB_TELA, 
-              a.dCantidad AS KG, 
-               a.nvDocumentoReferencia AS REF, g.NommaeColor AS COLOR, --a.bCierreAprobado AS AP_DES, 
-               --a.bProduccionAprobado AS DESP, --a.bcerrado AS CERR, 
-               LEFT(h.NommaeAnexoCliente, 15) AS Cliente,
-               a.ntEstado AS ESTADO --, k.NommaeRuta AS RUTA
-        FROM docOrdenProduccion a WITH (NOLOCK)
-        INNER JOIN maeItemInventario f WITH (NOLOCK) ON f.IdmaeItem_Inventario = a.IdmaeItem
-        INNER JOIN maeColor g WITH (NOLOCK) ON g.IdmaeColor = a.IdmaeColor
-        INNER JOIN maeAnexoCliente h WITH (NOLOCK) ON h.IdmaeAnexo_Cliente = a.IdmaeAnexo_Cliente
-        INNER JOIN docRecetaOrdenProduccion i ON a.IdDocumento_OrdenProduccion = i.IdDocumento_OrdenProduccion
-        INNER JOIN docReceta j ON i.IdDocumento_Receta = j.IdDocumento_Receta
-        INNER JOIN maeruta k ON a.IdmaeRuta = k.IdmaeRuta
-        WHERE a.IdtdDocumentoForm = 138
-        AND NOT a.IdDocumento_OrdenProduccion IN (461444, 452744, 459212, 463325, 458803, 471285, 471287)
-        AND j.dtFechaHoraFin IS NOT NULL
-        and j.bAnulado =0
-        AND a.FechaCierreAprobado IS NULL
-        AND LOWER(k.NommaeRuta) LIKE '%estamp%'
-        AND DATEDIFF(DAY, j.dtFechaHoraFin, GETDATE()) > {dias}
-        AND a.dtFechaEmision > '01-01-2025'
-        AND a.IdmaeAnexo_Cliente IN (47, 49, 91, 93, 111, 1445, 2533, 2637, 4294, 4323, 4374, 4411, 4413, 4469, 5506, 6577)
-    """
-    df = pd.read_sql(query, conn)
-    conn.close()
-    # Redondear la columna KG a 1 decimal
-    df['KG'] = df['KG'].round(1)
-    return df
+    return partidas_con_tenido_sin_aprob_tela_estamp(get_partidas(), dias)
 
-def highlight_mofijado(row):
-    return ['background-color: yellow' if row['FLAG'] == 1 else '' for _ in row]
+# Filas a partir de las cuales no se pinta la tabla y se marca MOFIJADO con una columna nativa
+MAX_FILAS_ESTILO = 1000
+
+# Formato de columnas nativo de st.dataframe (no requiere Styler)
+COLUMN_CONFIG = {
+    "KG": st.column_config.NumberColumn("KG", format="%.1f"),
+    "FLAG": st.column_config.CheckboxColumn("MOFIJADO"),
+}
+
+def highlight_mofijado(df):
+    # Máscara de estilos calculada de una sola vez para toda la tabla (no fila por fila)
+    pintar = df['FLAG'].to_numpy() == 1
+    estilos = np.where(pintar[:, None], 'background-color: yellow', '')
+    return pd.DataFrame(np.repeat(estilos, df.shape[1], axis=1), index=df.index, columns=df.columns)
+
+def mostrar_tabla(df):
+    if 'FLAG' in df.columns and len(df) <= MAX_FILAS_ESTILO:
+        st.dataframe(df.style.apply(highlight_mofijado, axis=None), column_config=COLUMN_CONFIG, hide_index=True)
+    else:
+        st.dataframe(df, column_config=COLUMN_CONFIG, hide_index=True)
 
 # Interfaz de Streamlit
 st.title("Seguimiento de Partidas")
 
+# Los días solo vuelven a filtrar la consulta cacheada; este botón fuerza una nueva lectura
+if st.button("Recargar datos"):
+    get_partidas.clear()
+
+# Lectura de las alertas calculadas por alertaspartidas.py (sin consultar SQL Server)
+usar_alertas = st.toggle("Usar alertas precalculadas (los días son los del motor de alertas)", value=False)
+corrida = ultima_corrida() if usar_alertas else None
+if usar_alertas:
+    st.caption(f"Última corrida del motor de alertas: {corrida or 'sin corridas'}")
+sin_corridas = usar_alertas and corrida is None
+
 # Aplicar estilos personalizados con CSS
 st.markdown("""
     <style>
@@ -162,47 +106,78 @@ dias_sin_tenido = st.number_input("Días sin TEÑIR (por defecto 8)", min_value=
     #""", unsafe_allow_html=True)
 
 if st.button("Mostrar partidas no TEÑIDAS"):
-    df_sin_tenido = get_partidas_sin_tenido(dias_sin_tenido)
-
-    # Contar los registros y sumar los KG
-    total_registros = len(df_sin_tenido)
-    total_kg = df_sin_tenido['KG'].sum()
-    
-    st.write(f"TOTAL REGISTROS  :   {total_registros}")
-    st.write(f"TOTAL KG  :   {total_kg:.0f}")
+    if sin_corridas:
+        st.info("Sin corridas del motor de alertas (alertaspartidas.py)")
+    else:
+        if usar_alertas:
+            df_sin_tenido = leer_alertas_vigentes('SIN_TENIDO')
+        else:
+            df_sin_tenido = get_partidas_sin_tenido(dias_sin_tenido)
+
+        # Contar los registros y sumar los KG
+        total_registros = len(df_sin_tenido)
+        total_kg = df_sin_tenido['KG'].sum()
     
-    styled_df = df_sin_tenido.style.apply(highlight_mofijado, axis=1)
-    # Aplicar formato con un decimal a la columna KG
-    styled_df = df_sin_tenido.style.apply(highlight_mofijado, axis=1).format({"KG": "{:.1f}"})
+        st.write(f"TOTAL REGISTROS  :   {total_registros}")
+        st.write(f"TOTAL KG  :   {total_kg:.0f}")
     
-    st.write(styled_df, unsafe_allow_html=True)
+        # Resaltar partidas con ruta MOFIJADO y mostrar KG con un decimal
+        mostrar_tabla(df_sin_tenido)
     
 
 # Selección de días para la segunda consulta
 dias_con_tenido = st.number_input("Días entre TEÑIDO y el día actual (por defecto 5) Partidas que no llevan estampado", min_value=1, value=5)
 if st.button("Mostrar partidas TEÑIDAS pero no APROBADAS"):
-    df_con_tenido = get_partidas_con_tenido_sin_aprob_tela(dias_con_tenido)
-
-    # Contar los registros y sumar los KG
-    total_registros = len(df_con_tenido)
-    total_kg = df_con_tenido['KG'].sum()
+    if sin_corridas:
+        st.info("Sin corridas del motor de alertas (alertaspartidas.py)")
+    else:
+        if usar_alertas:
+            df_con_tenido = leer_alertas_vigentes('TENIDO_SIN_APROB')
+        else:
+            df_con_tenido = get_partidas_con_tenido_sin_aprob_tela(dias_con_tenido)
+
+        # Contar los registros y sumar los KG
+        total_registros = len(df_con_tenido)
+        total_kg = df_con_tenido['KG'].sum()
     
-    st.write(f"TOTAL REGISTROS  :   {total_registros}")
-    st.write(f"TOTAL KG  :   {total_kg:.0f}")
+        st.write(f"TOTAL REGISTROS  :   {total_registros}")
+        st.write(f"TOTAL KG  :   {total_kg:.0f}")
     
-    st.write(df_con_tenido)
+        mostrar_tabla(df_con_tenido)
 
 # Selección de días para la tercera consulta
 dias_con_tenido_estamp = st.number_input("Días entre TEÑIDO y el día actual (por defecto 5) Partidas que llevan estampado", min_value=1, value=20)
 if st.button("Mostrar partidas TEÑIDAS (estamp) pero no APROBADAS"):
-    df_con_tenido_estamp = get_partidas_con_tenido_sin_aprob_tela_estamp(dias_con_tenido_estamp)
-
-    # Contar los registros y sumar los KG
-    total_registros = len(df_con_tenido_estamp)
-    total_kg = df_con_tenido_estamp['KG'].sum()
+    if sin_corridas:
+        st.info("Sin corridas del motor de alertas (alertaspartidas.py)")
+    else:
+        if usar_alertas:
+            df_con_tenido_estamp = leer_alertas_vigentes('TENIDO_SIN_APROB_ESTAMP')
+        else:
+            df_con_tenido_estamp = get_partidas_con_tenido_sin_aprob_tela_estamp(dias_con_tenido_estamp)
+
+        # Contar los registros y sumar los KG
+        total_registros = len(df_con_tenido_estamp)
+        total_kg = df_con_tenido_estamp['KG'].sum()
     
-    st.write(f"TOTAL REGISTROS  :    {total_registros}")
+        st.write(f"TOTAL REGISTROS  :    {total_registros}")
     
-    st.write(f"TOTAL KG  :   {total_kg:.0f}")
+        st.write(f"TOTAL KG  :   {total_kg:.0f}")
     
-    st.write(df_con_tenido_estamp)
+        mostrar_tabla(df_con_tenido_estamp)
+
+# Reporte de tiempos: compilación vs ejecución y reutilización del plan en SQL Server
+with st.expander("Tiempos de la consulta"):
+    repeticiones = st.number_input("Repeticiones", min_value=2, max_value=10, value=3)
+    if st.button("Medir consulta"):
+        conn = connect_to_db()
+        st.dataframe(reporte_tiempos(conn, repeticiones), hide_index=True)
+        try:
+            st.write("Plan en cache:")
+            st.dataframe(uso_plan_cache(conn), hide_index=True)
+        except Exception as e:
+            st.warning(f"No se pudo leer la cache de planes: {e}")
+        conn.close()
+
+# Después de la primera pintura, cargar en segundo plano los módulos diferidos
+precargar()
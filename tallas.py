@@ -0,0 +1,15 @@
+# Orden de tallas por letras; las numéricas van de menor a mayor y el resto al final
+ORDEN_TALLAS = ['XXXS', 'XXS', 'XS', 'S', 'M', 'L', 'XL', 'XXL', '2XL', 'XXXL', '3XL', '4XL', '5XL']
+
+
+def orden_tallas(tallas):
+    """Ordena una lista de tallas: primero las de letras, luego las numéricas y al final el resto."""
+    def clave(talla):
+        t = str(talla).strip().upper()
+        if t in ORDEN_TALLAS:
+            return (0, ORDEN_TALLAS.index(t), t)
+        try:
+            return (1, float(t.replace(',', '.')), t)
+        except ValueError:
+            return (2, 0, t)
+    return sorted(tallas, key=clave)
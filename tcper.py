@@ -1,15 +1,16 @@
 import streamlit as st
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 import pandas as pd
 from datetime import datetime
 import time
-import plotly.graph_objects as go
+from carga_diferida import diferido
+webdriver = diferido("selenium.webdriver")
+By = diferido("selenium.webdriver.common.by", "By")
+WebDriverWait = diferido("selenium.webdriver.support.ui", "WebDriverWait")
+EC = diferido("selenium.webdriver.support.expected_conditions")
+Options = diferido("selenium.webdriver.chrome.options", "Options")
+ChromeDriverManager = diferido("webdriver_manager.chrome", "ChromeDriverManager")
+Service = diferido("selenium.webdriver.chrome.service", "Service")
+go = diferido("plotly.graph_objects")
 
 # Título y descripción
 st.title(" Tipo de Cambio")
@@ -1,5 +1,7 @@
 import streamlit as st
 import pandas as pd
+from exportar import boton_descarga
+from ingesta import leer_excel
 
 def transformar_excel(df):
     # Filtramos las columnas relevantes para el procesamiento
@@ -29,7 +31,7 @@ uploaded_file = st.file_uploader("Sube tu archivo Excel", type="xlsx")
 
 if uploaded_file:
     # Leer el archivo Excel
-    df = pd.read_excel(uploaded_file)
+    df = leer_excel(uploaded_file)
     
     # Transformar el Excel
     df_transformado = transformar_excel(df)
@@ -39,13 +41,4 @@ if uploaded_file:
     st.dataframe(df_transformado)
     
     # Descargar el nuevo archivo Excel
-    output_file = "transformado.xlsx"
-    df_transformado.to_excel(output_file, index=False)
-    
-    with open(output_file, "rb") as file:
-        st.download_button(
-            label="Descargar archivo transformado",
-            data=file,
-            file_name=output_file,
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
+    boton_descarga(df_transformado, "transformado.xlsx", "Descargar archivo transformado")
@@ -1,52 +1,52 @@
 import streamlit as st
-import pyodbc
-import pandas as pd
+from conciliatc import sincronizar_tc_erp, leer_tc_erp, conciliar_tc, completar_tc_sbs
+from conexiones import conectar_sqlserver
+from carga_diferida import precargar
 
 # Conexión a la base de datos usando secrets
 def get_db_connection():
-    connection = pyodbc.connect(
-        "DRIVER={ODBC Driver 17 for SQL Server};"
-        "SERVER=" + st.secrets["server"] + ";"
-        "DATABASE=" + st.secrets["database"] + ";"
-        "UID=" + st.secrets["username"] + ";"
-        "PWD=" + st.secrets["password"] + ";"
-    )
+    connection = conectar_sqlserver()
     return connection
 
 
-    
-# Función para ejecutar la consulta y obtener los resultados
+# Función para sincronizar el historial local y obtener los resultados (cacheado)
+@st.cache_data(ttl=600)
 def load_data():
-    query = """
-    SELECT [IdthTipoCambio] AS ID,
-           [IdmaeAño] AS AÑO,
-           [IdmaePeriodoContable] as P_CON,
-           [IdmaeMoneda] AS MON,
-           [dtFecha],
-           [dCompra],
-           [dVenta],
-           [IdSistemaUsuarioCreacion] AS USU,
-           [FechaCreacion],
-           [IdSistemaUsuarioModificacion] AS U_MO,
-           [FechaUltimaModificacion] AS F_MOD
-    FROM [GarmentData].[dbo].[thTipoCambio]
-    WHERE FechaCreacion > '01-10-2024'
-    """
-    
     conn = get_db_connection()
-    data = pd.read_sql(query, conn)
+    nuevos = sincronizar_tc_erp(conn)
     conn.close()
-    
-    return data
+
+    # Completar el historial SBS con las fechas del ERP que nadie consultó en cambiosbs
+    try:
+        completados, error_sbs = completar_tc_sbs(), None
+    except Exception as e:
+        completados, error_sbs = 0, str(e)
+
+    return leer_tc_erp(), conciliar_tc(), nuevos, completados, error_sbs
 
 # Interfaz de la aplicación
 st.title('Tabla TC INFORGEST')
 
-# Botón para cargar datos
-#if st.button('Cargar datos'):
-#df = load_data()
-    
+# Botón para forzar la lectura de los cambios nuevos del ERP
+if st.button('Actualizar datos'):
+    load_data.clear()
+
+df, df_conciliacion, nuevos, completados, error_sbs = load_data()
+
 # Mostrar los resultados en una tabla
-#st.write('Resultados de la consulta:')
-df = load_data()
 st.dataframe(df)
+
+# Conciliación contra el historial SBS guardado localmente
+st.subheader('Conciliación ERP vs SBS')
+st.write(f"Filas nuevas o modificadas en la última sincronización: {nuevos}")
+st.write(f"Fechas SBS completadas en la última sincronización: {completados}")
+if error_sbs:
+    st.warning(f"No se pudo completar el historial SBS: {error_sbs}")
+# Los días sin publicación de la SBS (fines de semana y feriados) no son diferencias reales
+sin_publicacion = df_conciliacion['ESTADO'] == 'SIN_PUBLICACION'
+observados = df_conciliacion[(df_conciliacion['ESTADO'] != 'OK') & ~sin_publicacion]
+st.write(f"Fechas observadas: {len(observados)} (sin publicación SBS: {int(sin_publicacion.sum())})")
+st.dataframe(observados, hide_index=True)
+
+# Después de la primera pintura, cargar en segundo plano los módulos diferidos
+precargar()